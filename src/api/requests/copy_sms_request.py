@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 class CopySmsRequest(BaseModel):
     """
@@ -7,4 +7,8 @@ class CopySmsRequest(BaseModel):
     objetivo_copy: str
     tom_de_voz: str
     publico_alvo: str
-    segmento_loja: str 
\ No newline at end of file
+    segmento_loja: str
+    modo_rapido: bool = Field(
+        default=False,
+        description="Gera prompt, variáveis e copy em uma única chamada ao LLM (menor latência)"
+    ) 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 class CopyWppRequest(BaseModel):
     """
@@ -8,4 +8,8 @@ class CopyWppRequest(BaseModel):
     tom_de_voz: str
     publico_alvo: str 
     segmento_loja: str
+    modo_rapido: bool = Field(
+        default=False,
+        description="Gera prompt, variáveis e copy em uma única chamada ao LLM (menor latência)"
+    )
 
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
 class MeetingTranscriptQA(BaseModel):
@@ -12,6 +12,14 @@ class PlanAction90dRequest(BaseModel):
     """
     company_name: str = Field(..., description="Nome do cliente")
     plan: str = Field(..., description="Plano do cliente")
+    segment: Optional[str] = Field(
+        default=None,
+        description="Segmento da loja (ex.: moda feminina), usado na pré-recuperação da base de conhecimento"
+    )
+    sectioned: Optional[bool] = Field(
+        default=None,
+        description="Gera o plano em seções paralelas a partir de um esqueleto (padrão: PLAN_SECTIONED_GENERATION)"
+    )
     commercial_transcript: str = Field(
         ...,
         description="Transcrição completa da reunião comercial"
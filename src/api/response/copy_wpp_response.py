@@ -6,4 +6,5 @@ class CopyWppResponse(BaseModel):
     """
     run_id: str
     copy_text: str
-    tempo_execucao: str 
\ No newline at end of file
+    tempo_execucao: str
+    modo_execucao: str = "padrao" 
\ No newline at end of file
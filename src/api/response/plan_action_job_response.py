@@ -0,0 +1,19 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+class PlanActionJobResponse(BaseModel):
+    """
+    Modelo de resposta com o estado de um job de geração do plano de ação de 90 dias
+    """
+    job_id: str = Field(..., description="Identificador do job")
+    status: str = Field(..., description="Estado do job: queued, running, done ou failed")
+    stage: str = Field(..., description="Etapa atual: queued, company_status, retrieval, action_plan, document ou done")
+    company_name: str = Field(..., description="Nome do cliente")
+    error: Optional[str] = Field(default=None, description="Mensagem de erro, se o job falhou")
+    created_at: float = Field(..., description="Timestamp de criação")
+    updated_at: float = Field(..., description="Timestamp da última atualização")
+    download_url: Optional[str] = Field(default=None, description="URL para baixar o DOCX quando o job termina")
+    checkpoints: List[str] = Field(
+        default=[],
+        description="Etapas concluídas com checkpoint salvo, que não são refeitas ao retomar o job"
+    )
@@ -1,10 +1,10 @@
 from fastapi import APIRouter, HTTPException, Depends
-from langchain_openai import ChatOpenAI
-import time
-from uuid import uuid4
+from fastapi.responses import StreamingResponse
 
 from src.config.settings import get_settings
 from src.config.auth import get_current_user
+from src.core.utils.sse import format_sse
+from src.config.dependencies import get_copy_sms_workflow
 from src.api.requests.copy_sms_request import CopySmsRequest
 from src.api.response.copy_sms_response import CopySmsResponse
 from src.core.workflows.copy_sms_workflow import CopySmsWorkflow
@@ -15,37 +15,61 @@ router = APIRouter(tags=["copy-sms"])
 @router.post("/generate/copy/sms", response_model=CopySmsResponse)
 async def generate_copy_sms(
     request: CopySmsRequest,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    workflow: CopySmsWorkflow = Depends(get_copy_sms_workflow)
 ):
     """
     Endpoint para gerar copy para SMS
     """
     try:
-        start_time = time.time()
         print(f"Usuário autenticado: {current_user.get('email')}")
         
-        # Criando o modelo LLM
-        llm = ChatOpenAI(
-            model=settings.OPENAI_MODEL_NAME,
-            temperature=0.7
-        )
-        
-        # Criando e executando o workflow
-        workflow = CopySmsWorkflow(llm=llm)
+        # Executando o workflow compartilhado (criado no startup da aplicação)
         result = await workflow.execute(
             objetivo_copy=request.objetivo_copy,
             tom_de_voz=request.tom_de_voz,
             publico_alvo=request.publico_alvo,
-            segmento_loja=request.segmento_loja
+            segmento_loja=request.segmento_loja,
+            modo_rapido=request.modo_rapido
         )
         
-        end_time = time.time()
-        execution_time = end_time - start_time
-        
         return CopySmsResponse(
             run_id=result["run_id"],
             copy_text=result["copy_text"],
-            tempo_execucao=result["tempo_execucao"]
+            tempo_execucao=result["tempo_execucao"],
+            modo_execucao=result["modo_execucao"]
         )
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/generate/copy/sms/stream")
+async def generate_copy_sms_stream(
+    request: CopySmsRequest,
+    current_user: dict = Depends(get_current_user),
+    workflow: CopySmsWorkflow = Depends(get_copy_sms_workflow)
+):
+    """
+    Endpoint para gerar copy para SMS com streaming (Server-Sent Events).
+    Emite um evento ao final de cada etapa e os tokens do copy final conforme são gerados.
+    """
+    print(f"Usuário autenticado: {current_user.get('email')}")
+    
+    async def event_stream():
+        try:
+            async for event in workflow.execute_stream(
+                objetivo_copy=request.objetivo_copy,
+                tom_de_voz=request.tom_de_voz,
+                publico_alvo=request.publico_alvo,
+                segmento_loja=request.segmento_loja,
+                modo_rapido=request.modo_rapido
+            ):
+                yield format_sse(event["event"], event["data"])
+        except Exception as e:
+            # Com o stream já aberto não é possível devolver 500: o erro vai como evento
+            yield format_sse("erro", {"detail": str(e)})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,6 +1,10 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import FileResponse
-from src.core.workflows.generate_action_plan_workflow import GenerateActionPlanWorkflow
+from starlette.background import BackgroundTask
+from src.config.dependencies import get_plan_action_job_runner
+from src.core.jobs.plan_action_job_runner import PlanActionJobRunner
+from src.core.jobs.plan_action_job_store import JOB_DONE
+from src.api.response.plan_action_job_response import PlanActionJobResponse
 from src.api.requests.plan_action_90d_request import PlanAction90dRequest
 from src.core.tools.markdown_to_docx import convert_markdown_to_docx
 import logging
@@ -12,62 +16,162 @@ router = APIRouter(tags=["Plan Action 90d"])
 logger = logging.getLogger(__name__)
 
 @router.post("/plan-action-90d")
-async def generate_plan_action_90d(request: PlanAction90dRequest):
-    tmp_path = None
+async def generate_plan_action_90d(
+    request: PlanAction90dRequest,
+    runner: PlanActionJobRunner = Depends(get_plan_action_job_runner)
+):
+    """
+    Gera o plano de ação de 90 dias e retorna o DOCX na própria resposta.
+
+    A execução é registrada como um job com checkpoints por etapa: em caso de falha, a resposta
+    traz o id do job (header X-Plan-Action-Job-Id) para retomá-lo em
+    POST /plan-action-90d/jobs/{job_id}/resume, sem repetir as etapas já concluídas. Em caso de
+    sucesso, o job e o DOCX são apagados assim que a resposta é enviada.
+    """
+    if not request.commercial_transcript or not request.onboarding_transcript or not request.discovery_transcript:
+        raise HTTPException(
+            status_code=400, 
+            detail="É necessário fornecer a transcrição completa de todas as três reuniões"
+        )
+
+    job_id = None
     try:
-        workflow = GenerateActionPlanWorkflow()
-        
-        if not request.commercial_transcript or not request.onboarding_transcript or not request.discovery_transcript:
-            raise HTTPException(
-                status_code=400, 
-                detail="É necessário fornecer a transcrição completa de todas as três reuniões"
-            )
-        
         # Gera a data atual no formato brasileiro
         current_date = dt.datetime.now().strftime("%d/%m/%Y")
         
-        # Executa o workflow completo
-        result = await workflow.execute(
-            company_name=request.company_name,
-            plan=request.plan,
-            commercial_transcript=request.commercial_transcript,
-            onboarding_transcript=request.onboarding_transcript,
-            discovery_transcript=request.discovery_transcript,
-            commercial_meeting=request.commercial_meeting,
-            onboarding_meeting=request.onboarding_meeting,
-            discovery_meeting=request.discovery_meeting,
-            current_date=current_date
-        )
-        
-        # Converte o markdown para DOCX
-        docx_content = convert_markdown_to_docx(result["action_plan"], request.company_name)
+        # Executa o workflow completo e converte o markdown para DOCX, gravando os checkpoints do job
+        job_id = await runner.submit(request, current_date, background=False)
+        result = await runner.run_job(job_id)
         
         # Formata o nome do arquivo removendo caracteres especiais e espaços
         filename = f"plano_acao_90d_{request.company_name.lower().replace(' ', '_')}.docx"
         
-        # Cria um arquivo temporário
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as tmp:
-            tmp.write(docx_content)
-            tmp_path = tmp.name
-        
-        # Retorna o arquivo
+        # Retorna o arquivo, indicando se o status do cliente veio do cache
         return FileResponse(
-            path=tmp_path,
+            path=result["result_path"],
             filename=filename,
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            headers={
+                "X-Company-Status-Cache": result["company_status_cache"],
+                "X-Transcript-Tokens-Saved": result["transcript_tokens_saved"],
+                "X-Plan-Action-Job-Id": job_id
+            },
+            background=BackgroundTask(runner.discard, job_id)
         )
         
     except Exception as e:
-        logger.error(f"Erro ao gerar plano de ação de 90 dias: {str(e)}")
-        # Limpa o arquivo temporário se houver erro
-        if tmp_path and os.path.exists(tmp_path):
-            os.unlink(tmp_path)
+        logger.error(f"Erro ao gerar plano de ação de 90 dias (job {job_id}): {str(e)}")
+        detail = f"Erro ao gerar plano de ação: {str(e)}"
+        if job_id:
+            detail += f". Retome a geração em /api/plan-action-90d/jobs/{job_id}/resume"
         raise HTTPException(
             status_code=500,
-            detail=f"Erro ao gerar plano de ação: {str(e)}"
+            detail=detail,
+            headers={"X-Plan-Action-Job-Id": job_id} if job_id else None
         )
     
 
+def _job_response(job: dict) -> PlanActionJobResponse:
+    download_url = None
+    if job["status"] == JOB_DONE:
+        download_url = f"/api/plan-action-90d/jobs/{job['id']}/download"
+    return PlanActionJobResponse(
+        job_id=job["id"],
+        status=job["status"],
+        stage=job["stage"],
+        company_name=job["company_name"],
+        error=job["error"],
+        created_at=job["created_at"],
+        updated_at=job["updated_at"],
+        download_url=download_url,
+        checkpoints=job.get("checkpoints", [])
+    )
+
+
+@router.post("/plan-action-90d/jobs", response_model=PlanActionJobResponse, status_code=202)
+async def submit_plan_action_90d_job(
+    request: PlanAction90dRequest,
+    runner: PlanActionJobRunner = Depends(get_plan_action_job_runner)
+):
+    """
+    Enfileira a geração do plano de ação de 90 dias e retorna imediatamente o id do job
+    """
+    if not request.commercial_transcript or not request.onboarding_transcript or not request.discovery_transcript:
+        raise HTTPException(
+            status_code=400,
+            detail="É necessário fornecer a transcrição completa de todas as três reuniões"
+        )
+
+    try:
+        current_date = dt.datetime.now().strftime("%d/%m/%Y")
+        job_id = await runner.submit(request, current_date)
+        return _job_response(await runner.get(job_id))
+    except Exception as e:
+        logger.error(f"Erro ao enfileirar plano de ação de 90 dias: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro ao enfileirar plano de ação: {str(e)}"
+        )
+
+
+@router.get("/plan-action-90d/jobs/{job_id}", response_model=PlanActionJobResponse)
+async def get_plan_action_90d_job(
+    job_id: str,
+    runner: PlanActionJobRunner = Depends(get_plan_action_job_runner)
+):
+    """
+    Retorna o estado e a etapa atual de um job do plano de ação
+    """
+    job = await runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return _job_response(job)
+
+
+@router.post("/plan-action-90d/jobs/{job_id}/resume", response_model=PlanActionJobResponse, status_code=202)
+async def resume_plan_action_90d_job(
+    job_id: str,
+    runner: PlanActionJobRunner = Depends(get_plan_action_job_runner)
+):
+    """
+    Retoma um job com falha a partir da última etapa concluída (status do cliente, contexto
+    recuperado, markdown do plano ou documento); as etapas com checkpoint não são refeitas
+    """
+    job = await runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    # A troca de status é atômica: entre retomadas concorrentes, só uma enfileira o job
+    if not await runner.resume(job_id):
+        job = await runner.get(job_id) or job
+        raise HTTPException(status_code=409, detail=f"Somente jobs com falha podem ser retomados (status: {job['status']})")
+
+    return _job_response(await runner.get(job_id))
+
+
+@router.get("/plan-action-90d/jobs/{job_id}/download")
+async def download_plan_action_90d_job(
+    job_id: str,
+    runner: PlanActionJobRunner = Depends(get_plan_action_job_runner)
+):
+    """
+    Retorna o DOCX gerado por um job concluído
+    """
+    job = await runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    if job["status"] != JOB_DONE:
+        raise HTTPException(status_code=409, detail=f"Job ainda não concluído (status: {job['status']})")
+    if not job["result_path"] or not os.path.exists(job["result_path"]):
+        raise HTTPException(status_code=410, detail="Documento do job não está mais disponível")
+
+    filename = f"plano_acao_90d_{job['company_name'].lower().replace(' ', '_')}.docx"
+    return FileResponse(
+        path=job["result_path"],
+        filename=filename,
+        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    )
+
+
 @router.get("/test-docx")
 async def test_docx():
     """
@@ -0,0 +1,108 @@
+import os
+from fastapi import Request
+from src.config.settings import get_settings
+from src.core.agents.prompt_builder_agent import PromptBuilderAgent
+from src.core.agents.variable_suggester_agent import VariableSuggesterAgent
+from src.core.agents.copywriter_agent import CopywriterAgent
+from src.core.agents.prompt_builder_sms_agent import PromptBuilderSmsAgent
+from src.core.agents.variable_suggester_sms_agent import VariableSuggesterSmsAgent
+from src.core.agents.copywriter_sms_agent import CopywriterSmsAgent
+from src.core.agents.copy_fast_agent import CopyFastAgent
+from src.core.agents.copy_fast_sms_agent import CopyFastSmsAgent
+from src.core.workflows.copy_wpp_workflow import CopyWhatsappWorkflow
+from src.core.workflows.copy_sms_workflow import CopySmsWorkflow
+from src.core.agents.company_status_agent import CompanyStatusAgent
+from src.core.agents.plan_action_90d_agent import PlanAction90dAgent
+from src.core.workflows.generate_action_plan_workflow import GenerateActionPlanWorkflow
+from src.core.tools.zoppy_knowledge_base import ZoppyKnowledgeBase
+from src.core.tools.plan_context_retriever import PlanContextRetriever
+from src.core.utils.stage_cache import create_company_status_cache, create_stage_cache
+from src.core.jobs.plan_action_job_store import PlanActionJobStore
+from src.core.jobs.plan_action_job_runner import PlanActionJobRunner
+
+
+class AgentRegistry:
+    """
+    Registro com as instâncias de agentes e workflows compartilhadas por toda a aplicação.
+
+    É construído uma única vez no startup (lifespan do FastAPI). Os agentes não guardam
+    estado entre chamadas, então as mesmas instâncias atendem requisições concorrentes.
+    """
+
+    def __init__(self):
+        # Cache compartilhado pelos estágios determinísticos (prompt builder e sugestor de variáveis)
+        self.stage_cache = create_stage_cache()
+
+        self.prompt_builder = PromptBuilderAgent(cache=self.stage_cache)
+        self.variable_suggester = VariableSuggesterAgent(cache=self.stage_cache)
+        self.copywriter = CopywriterAgent()
+        self.copy_fast = CopyFastAgent()
+
+        self.prompt_builder_sms = PromptBuilderSmsAgent(cache=self.stage_cache)
+        self.variable_suggester_sms = VariableSuggesterSmsAgent(cache=self.stage_cache)
+        self.copywriter_sms = CopywriterSmsAgent()
+        self.copy_fast_sms = CopyFastSmsAgent()
+
+        self.copy_wpp_workflow = CopyWhatsappWorkflow(
+            prompt_builder=self.prompt_builder,
+            variable_suggester=self.variable_suggester,
+            copywriter=self.copywriter,
+            fast_agent=self.copy_fast
+        )
+        self.copy_sms_workflow = CopySmsWorkflow(
+            prompt_builder=self.prompt_builder_sms,
+            variable_suggester=self.variable_suggester_sms,
+            copywriter=self.copywriter_sms,
+            fast_agent=self.copy_fast_sms
+        )
+
+        # Banco vetorial, embeddings e retriever carregados uma única vez e compartilhados (somente leitura)
+        self.knowledge_base = ZoppyKnowledgeBase().load()
+        self.company_status_agent = CompanyStatusAgent()
+        # Cache durável do status do cliente: reexecuções do plano pulam o estágio mais caro
+        self.company_status_cache = create_company_status_cache()
+        self.plan_action_90d_agent = PlanAction90dAgent(knowledge_base=self.knowledge_base)
+        self.plan_context_retriever = PlanContextRetriever(self.knowledge_base)
+        self.plan_action_workflow = GenerateActionPlanWorkflow(
+            company_status_agent=self.company_status_agent,
+            plan_action_90d_agent=self.plan_action_90d_agent,
+            plan_context_retriever=self.plan_context_retriever,
+            company_status_cache=self.company_status_cache
+        )
+
+        # Jobs do plano de ação: store durável em SQLite e pool limitado de workers
+        settings = get_settings()
+        project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+        jobs_dir = os.path.join(project_root, "data", "jobs")
+        self.plan_action_job_runner = PlanActionJobRunner(
+            workflow=self.plan_action_workflow,
+            store=PlanActionJobStore(settings.PLAN_JOB_DB_PATH or os.path.join(jobs_dir, "plan_action_jobs.sqlite3")),
+            output_dir=settings.PLAN_JOB_OUTPUT_DIR or jobs_dir,
+            workers=settings.PLAN_JOB_WORKERS,
+            retention_seconds=settings.PLAN_JOB_RETENTION_SECONDS
+        )
+
+
+def get_registry(request: Request) -> AgentRegistry:
+    """Retorna o registro criado no startup da aplicação"""
+    return request.app.state.registry
+
+
+def get_copy_wpp_workflow(request: Request) -> CopyWhatsappWorkflow:
+    """Dependência que injeta o workflow compartilhado de copy para WhatsApp"""
+    return get_registry(request).copy_wpp_workflow
+
+
+def get_copy_sms_workflow(request: Request) -> CopySmsWorkflow:
+    """Dependência que injeta o workflow compartilhado de copy para SMS"""
+    return get_registry(request).copy_sms_workflow
+
+
+def get_plan_action_workflow(request: Request) -> GenerateActionPlanWorkflow:
+    """Dependência que injeta o workflow compartilhado do plano de ação de 90 dias"""
+    return get_registry(request).plan_action_workflow
+
+
+def get_plan_action_job_runner(request: Request) -> PlanActionJobRunner:
+    """Dependência que injeta o executor de jobs do plano de ação de 90 dias"""
+    return get_registry(request).plan_action_job_runner
@@ -1,4 +1,6 @@
-from pydantic import Field
+from functools import lru_cache
+from typing import Dict
+from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -19,8 +21,104 @@ class Settings(BaseSettings):
     # LangSmith Settings
     LANGSMITH_PROJECT: str = Field(default="default", json_schema_extra={"env": "LANGSMITH_PROJECT"})
 
+    # OpenAI HTTP Client (pool compartilhado por todos os ChatOpenAI/OpenAIEmbeddings)
+    OPENAI_HTTP_MAX_CONNECTIONS: int = Field(default=100, json_schema_extra={"env": "OPENAI_HTTP_MAX_CONNECTIONS"})
+    OPENAI_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = Field(default=20, json_schema_extra={"env": "OPENAI_HTTP_MAX_KEEPALIVE_CONNECTIONS"})
+    OPENAI_HTTP_KEEPALIVE_EXPIRY: float = Field(default=60.0, json_schema_extra={"env": "OPENAI_HTTP_KEEPALIVE_EXPIRY"})
+    OPENAI_HTTP_TIMEOUT: float = Field(default=120.0, json_schema_extra={"env": "OPENAI_HTTP_TIMEOUT"})
+    OPENAI_HTTP2: bool = Field(default=False, json_schema_extra={"env": "OPENAI_HTTP2"})
+
+    # OpenAI Retry / Rate Limiting (limites client-side por modelo, opcionais: 0 = sem limite)
+    OPENAI_MAX_RETRIES: int = Field(default=8, json_schema_extra={"env": "OPENAI_MAX_RETRIES"})
+    OPENAI_RETRY_BASE_DELAY: float = Field(default=1.0, json_schema_extra={"env": "OPENAI_RETRY_BASE_DELAY"})
+    OPENAI_RETRY_MAX_DELAY: float = Field(default=60.0, json_schema_extra={"env": "OPENAI_RETRY_MAX_DELAY"})
+    OPENAI_RPM_LIMIT: int = Field(default=0, json_schema_extra={"env": "OPENAI_RPM_LIMIT"})
+    OPENAI_TPM_LIMIT: int = Field(default=0, json_schema_extra={"env": "OPENAI_TPM_LIMIT"})
+    # Limites padrão dos modelos de embeddings, que não herdam os limites dos modelos de chat
+    OPENAI_EMBEDDING_RPM_LIMIT: int = Field(default=0, json_schema_extra={"env": "OPENAI_EMBEDDING_RPM_LIMIT"})
+    OPENAI_EMBEDDING_TPM_LIMIT: int = Field(default=0, json_schema_extra={"env": "OPENAI_EMBEDDING_TPM_LIMIT"})
+    # JSON com limites específicos por modelo, ex.: {"gpt-4o": {"rpm": 5000, "tpm": 800000}}
+    OPENAI_RATE_LIMITS: Dict[str, Dict[str, int]] = Field(default_factory=dict, json_schema_extra={"env": "OPENAI_RATE_LIMITS"})
+
+    # Cache dos estágios determinísticos dos workflows de copy ("memory", "sqlite" ou "none")
+    STAGE_CACHE_BACKEND: str = Field(default="memory", json_schema_extra={"env": "STAGE_CACHE_BACKEND"})
+    STAGE_CACHE_TTL_SECONDS: float = Field(default=86400.0, json_schema_extra={"env": "STAGE_CACHE_TTL_SECONDS"})
+    STAGE_CACHE_MAX_ENTRIES: int = Field(default=1024, json_schema_extra={"env": "STAGE_CACHE_MAX_ENTRIES"})
+    STAGE_CACHE_PATH: str = Field(default="", json_schema_extra={"env": "STAGE_CACHE_PATH"})
+
+    # Jobs assíncronos do plano de ação de 90 dias
+    PLAN_JOB_WORKERS: int = Field(default=2, json_schema_extra={"env": "PLAN_JOB_WORKERS"})
+    PLAN_JOB_DB_PATH: str = Field(default="", json_schema_extra={"env": "PLAN_JOB_DB_PATH"})
+    PLAN_JOB_OUTPUT_DIR: str = Field(default="", json_schema_extra={"env": "PLAN_JOB_OUTPUT_DIR"})
+    # Tempo que jobs concluídos ou com falha (e os seus DOCX) são mantidos; 0 = indefinidamente
+    PLAN_JOB_RETENTION_SECONDS: float = Field(default=604800.0, json_schema_extra={"env": "PLAN_JOB_RETENTION_SECONDS"})
+
+    # Compressão do contexto da base de conhecimento da Zoppy ("local": rerank por embeddings; "llm": LLMChainExtractor)
+    KB_COMPRESSOR: str = Field(default="local", json_schema_extra={"env": "KB_COMPRESSOR"})
+    KB_FETCH_K: int = Field(default=5, json_schema_extra={"env": "KB_FETCH_K"})
+    KB_TOP_N: int = Field(default=3, json_schema_extra={"env": "KB_TOP_N"})
+    KB_MIN_SIMILARITY: float = Field(default=0.0, json_schema_extra={"env": "KB_MIN_SIMILARITY"})
+    KB_REDUNDANCY_THRESHOLD: float = Field(default=0.95, json_schema_extra={"env": "KB_REDUNDANCY_THRESHOLD"})
+    KB_CONTEXT_MAX_TOKENS: int = Field(default=1500, json_schema_extra={"env": "KB_CONTEXT_MAX_TOKENS"})
+    # Busca híbrida (BM25 + vetorial, fundidos por RRF) no compressor "local"
+    KB_HYBRID: bool = Field(default=True, json_schema_extra={"env": "KB_HYBRID"})
+    KB_RRF_K: int = Field(default=60, json_schema_extra={"env": "KB_RRF_K"})
+
+    # Pré-recuperação do plano de ação: consultas determinísticas à base executadas em paralelo
+    PLAN_PRERETRIEVAL_ENABLED: bool = Field(default=True, json_schema_extra={"env": "PLAN_PRERETRIEVAL_ENABLED"})
+    PLAN_PRERETRIEVAL_MAX_QUERIES: int = Field(default=8, json_schema_extra={"env": "PLAN_PRERETRIEVAL_MAX_QUERIES"})
+    PLAN_PRERETRIEVAL_MAX_TOKENS: int = Field(default=4000, json_schema_extra={"env": "PLAN_PRERETRIEVAL_MAX_TOKENS"})
+    PLAN_PRERETRIEVAL_CONCURRENCY: int = Field(default=4, json_schema_extra={"env": "PLAN_PRERETRIEVAL_CONCURRENCY"})
+
+    # Plano de ação em seções: esqueleto curto e depois abertura e fases 1-3 geradas em paralelo
+    PLAN_SECTIONED_GENERATION: bool = Field(default=False, json_schema_extra={"env": "PLAN_SECTIONED_GENERATION"})
+
+    # Chamadas de ferramenta simultâneas do agente do plano de ação, por requisição
+    PLAN_AGENT_MAX_CONCURRENT_TOOLS: int = Field(default=4, json_schema_extra={"env": "PLAN_AGENT_MAX_CONCURRENT_TOOLS"})
+
+    # Tokens por reunião das perguntas e respostas estruturadas no prompt do plano de ação (0 = sem limite)
+    PLAN_MEETING_QA_TOKEN_BUDGET: int = Field(default=1500, json_schema_extra={"env": "PLAN_MEETING_QA_TOKEN_BUDGET"})
+
+    # Normalização determinística das transcrições antes do status do cliente: none, light, standard ou aggressive
+    TRANSCRIPT_NORMALIZATION_LEVEL: str = Field(default="standard", json_schema_extra={"env": "TRANSCRIPT_NORMALIZATION_LEVEL"})
+
+    # Status do cliente: acima deste total de tokens nas transcrições, as reuniões longas são resumidas
+    # em map-reduce (trechos resumidos em paralelo por um modelo barato) antes da síntese final
+    COMPANY_STATUS_TOKEN_BUDGET: int = Field(default=24000, json_schema_extra={"env": "COMPANY_STATUS_TOKEN_BUDGET"})
+    COMPANY_STATUS_DIGEST_MODEL: str = Field(default="gpt-4o-mini", json_schema_extra={"env": "COMPANY_STATUS_DIGEST_MODEL"})
+    COMPANY_STATUS_CHUNK_TOKENS: int = Field(default=4000, gt=0, json_schema_extra={"env": "COMPANY_STATUS_CHUNK_TOKENS"})
+    COMPANY_STATUS_CHUNK_OVERLAP: int = Field(default=200, ge=0, json_schema_extra={"env": "COMPANY_STATUS_CHUNK_OVERLAP"})
+    COMPANY_STATUS_DIGEST_CONCURRENCY: int = Field(default=8, ge=1, json_schema_extra={"env": "COMPANY_STATUS_DIGEST_CONCURRENCY"})
+
+    # Cache durável (SQLite) do status do cliente, por hash do cliente, plano, transcrições e versão do prompt
+    COMPANY_STATUS_CACHE_ENABLED: bool = Field(default=True, json_schema_extra={"env": "COMPANY_STATUS_CACHE_ENABLED"})
+    COMPANY_STATUS_CACHE_PATH: str = Field(default="", json_schema_extra={"env": "COMPANY_STATUS_CACHE_PATH"})
+    COMPANY_STATUS_CACHE_TTL_SECONDS: float = Field(default=2592000.0, json_schema_extra={"env": "COMPANY_STATUS_CACHE_TTL_SECONDS"})
+
+    # Cache de embeddings (SQLite em disco + LRU em memória), compartilhado pelo indexador e pela API
+    EMBEDDING_CACHE_ENABLED: bool = Field(default=True, json_schema_extra={"env": "EMBEDDING_CACHE_ENABLED"})
+    EMBEDDING_CACHE_PATH: str = Field(default="", json_schema_extra={"env": "EMBEDDING_CACHE_PATH"})
+    EMBEDDING_CACHE_MAX_ENTRIES: int = Field(default=10000, json_schema_extra={"env": "EMBEDDING_CACHE_MAX_ENTRIES"})
+
+    # Indexação dos documentos da Zoppy: processos para carregar/dividir arquivos (0 = número de CPUs)
+    INDEX_WORKERS: int = Field(default=0, json_schema_extra={"env": "INDEX_WORKERS"})
+    # Embeddings da indexação: chunks por lote e lotes enviados em paralelo
+    INDEX_EMBED_BATCH_SIZE: int = Field(default=128, json_schema_extra={"env": "INDEX_EMBED_BATCH_SIZE"})
+    INDEX_EMBED_CONCURRENCY: int = Field(default=4, json_schema_extra={"env": "INDEX_EMBED_CONCURRENCY"})
+
     # Other Settings
     SEED: int = Field(default=42, json_schema_extra={"env": "SEED"})
 
+    @model_validator(mode="after")
+    def validate_company_status_chunks(self) -> "Settings":
+        """Falha no startup se a sobreposição não couber no pedaço do map-reduce do status do cliente"""
+        if self.COMPANY_STATUS_CHUNK_OVERLAP >= self.COMPANY_STATUS_CHUNK_TOKENS:
+            raise ValueError(
+                f"COMPANY_STATUS_CHUNK_OVERLAP ({self.COMPANY_STATUS_CHUNK_OVERLAP}) deve ser menor que "
+                f"COMPANY_STATUS_CHUNK_TOKENS ({self.COMPANY_STATUS_CHUNK_TOKENS})"
+            )
+        return self
+
+@lru_cache
 def get_settings() -> Settings:
     return Settings()
\ No newline at end of file
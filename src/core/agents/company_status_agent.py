@@ -1,86 +1,276 @@
-from langchain.agents import AgentExecutor, create_tool_calling_agent
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from typing import Dict
+import asyncio
+import logging
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from typing import Any, Dict, List
 from src.config.settings import get_settings
+from src.core.utils.openai_clients import create_chat_model
+from src.core.utils.resilience import with_resilience, estimate_tokens
+from src.core.utils.metrics import instrument_stage
+from src.core.utils.stage_cache import template_version
+from src.core.utils.tokens import count_tokens, split_by_tokens
 from src.core.prompts.company_status_prompt import COMPANY_STATUS_PROMPT
-import backoff
-import time
-from openai import RateLimitError, APIError
+from src.core.prompts.transcript_digest_prompt import (
+    TRANSCRIPT_CHUNK_PROMPT,
+    TRANSCRIPT_MEETING_REDUCE_PROMPT,
+    TRANSCRIPT_CROSS_MEETING_PROMPT
+)
+
+logger = logging.getLogger(__name__)
+
+# Variável do prompt final -> título da reunião nos resumos
+MEETINGS = {
+    "commercial_transcript": "Reunião Comercial",
+    "onboarding_transcript": "Reunião de Onboarding",
+    "discovery_transcript": "Reunião de Discovery",
+}
+
 
 class CompanyStatusAgent:
     def __init__(self):
         self.settings = get_settings()
-        self.llm = ChatOpenAI(
+        self.llm = create_chat_model(
             model="gpt-4o",
             temperature=0.2,
-            api_key=self.settings.OPENAI_API_KEY,
             seed=self.settings.SEED
         )
-        self.agent = self._create_agent()
+        # Modelo barato para resumir os trechos e consolidar os resumos das transcrições longas
+        self.digest_llm = create_chat_model(
+            model=self.settings.COMPANY_STATUS_DIGEST_MODEL,
+            temperature=0,
+            seed=self.settings.SEED
+        )
+        self.token_budget = self.settings.COMPANY_STATUS_TOKEN_BUDGET
+        self.chunk_tokens = self.settings.COMPANY_STATUS_CHUNK_TOKENS
+        self.chunk_overlap = self.settings.COMPANY_STATUS_CHUNK_OVERLAP
+        self.digest_concurrency = self.settings.COMPANY_STATUS_DIGEST_CONCURRENCY
+        # Cadeia direta prompt → modelo → parser: o agente não usa ferramentas, então não há
+        # scratchpad, parsing de ações nem logs verbosos a cada chamada
+        self.chain = self._create_chain()
+        self.consolidated_chain = self._create_consolidated_chain()
+        self.chunk_chain = self._create_digest_chain(
+            TRANSCRIPT_CHUNK_PROMPT,
+            "{meeting} do cliente {company_name} (trecho {part} de {parts}):\n\n{text}\n\nResuma o trecho:"
+        )
+        self.meeting_reduce_chain = self._create_digest_chain(
+            TRANSCRIPT_MEETING_REDUCE_PROMPT,
+            "Resumos dos trechos da {meeting} do cliente {company_name}:\n\n{text}\n\nConsolide os resumos:"
+        )
+        self.cross_meeting_chain = self._create_digest_chain(
+            TRANSCRIPT_CROSS_MEETING_PROMPT,
+            "Resumos das reuniões do cliente {company_name}:\n\n{text}\n\nCondense os resumos em até {max_tokens} tokens:"
+        )
+        # Versão do prompt para o cache do status: muda com os prompts, os modelos ou os parâmetros do map-reduce
+        self.prompt_version = template_version(
+            "\n".join([
+                COMPANY_STATUS_PROMPT,
+                TRANSCRIPT_CHUNK_PROMPT,
+                TRANSCRIPT_MEETING_REDUCE_PROMPT,
+                TRANSCRIPT_CROSS_MEETING_PROMPT
+            ]),
+            model=self.llm.model_name,
+            temperature=self.llm.temperature,
+            seed=self.settings.SEED,
+            digest_model=self.digest_llm.model_name,
+            token_budget=self.token_budget,
+            chunk_tokens=self.chunk_tokens,
+            chunk_overlap=self.chunk_overlap
+        )
 
-    def _create_agent(self):
-        """Cria o agente com o prompt configurado"""
+    def _create_chain(self):
+        """Cria a cadeia com o prompt configurado"""
         prompt = ChatPromptTemplate.from_messages([
             ("system", COMPANY_STATUS_PROMPT),
-            ("human", "Nome do Cliente: {company_name}\n\nPlano: {plan}\n\nTranscrição da Reunião Comercial: {commercial_transcript}\n\nTranscrição da Reunião de Onboarding: {onboarding_transcript}\n\nTranscrição da Reunião de Discovery: {discovery_transcript}\n\nAnalise as transcrições e gere o status detalhado do cliente:"),
-            MessagesPlaceholder(variable_name="agent_scratchpad")
+            ("human", "Nome do Cliente: {company_name}\n\nPlano: {plan}\n\nTranscrição da Reunião Comercial: {commercial_transcript}\n\nTranscrição da Reunião de Onboarding: {onboarding_transcript}\n\nTranscrição da Reunião de Discovery: {discovery_transcript}\n\nAnalise as transcrições e gere o status detalhado do cliente:")
         ])
 
-        return create_tool_calling_agent(self.llm, [], prompt)
+        return prompt | self.llm | StrOutputParser()
+
+    def _create_consolidated_chain(self):
+        """Cadeia final usada quando as três reuniões precisaram ser condensadas em um único resumo"""
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", COMPANY_STATUS_PROMPT),
+            ("human", "Nome do Cliente: {company_name}\n\nPlano: {plan}\n\nResumo consolidado das reuniões comercial, de onboarding e de discovery:\n{meetings_digest}\n\nAnalise os resumos das reuniões e gere o status detalhado do cliente:")
+        ])
+
+        return prompt | self.llm | StrOutputParser()
+
+    def _create_digest_chain(self, system_prompt: str, human_template: str):
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", system_prompt),
+            ("human", human_template)
+        ])
+
+        return prompt | self.digest_llm | StrOutputParser()
+
+    async def _run_digest(self, chain, inputs: Dict[str, Any], config: Dict[str, Any]) -> str:
+        return await with_resilience(
+            lambda: chain.ainvoke(inputs, config=config),
+            model=self.digest_llm.model_name,
+            estimated_tokens=estimate_tokens(inputs)
+        )
+
+    def _meetings_to_digest(self, transcripts: Dict[str, str]) -> List[str]:
+        """
+        Distribui o orçamento de tokens entre as reuniões, da menor para a maior: as transcrições que
+        cabem na sua parte seguem na íntegra e a sobra fica para as demais, que serão resumidas.
+        """
+        sizes = {key: count_tokens(text) for key, text in transcripts.items()}
+        if sum(sizes.values()) <= self.token_budget:
+            return []
+
+        remaining_budget = self.token_budget
+        pending = sorted(sizes, key=sizes.get)
+        to_digest = []
+        while pending:
+            share = remaining_budget // len(pending)
+            key = pending.pop(0)
+            if sizes[key] <= share:
+                remaining_budget -= sizes[key]
+            else:
+                to_digest.append(key)
+        return to_digest
+
+    async def _collapse(self, company_name: str, meeting: str, summaries: List[str], config: Dict[str, Any]) -> str:
+        """
+        Reduz os resumos dos trechos de uma reunião a um único resumo. Se os resumos não cabem em uma
+        chamada, são consolidados em grupos de até `chunk_tokens` tokens, repetindo até sobrar um.
+        """
+        async def reduce_group(group: List[str]) -> str:
+            if len(group) == 1:
+                return group[0]
+            return await self._run_digest(
+                self.meeting_reduce_chain,
+                {"meeting": meeting, "company_name": company_name, "text": "\n\n---\n\n".join(group)},
+                config
+            )
+
+        while len(summaries) > 1:
+            groups: List[List[str]] = [[]]
+            group_tokens = 0
+            for summary in summaries:
+                tokens = count_tokens(summary)
+                if groups[-1] and group_tokens + tokens > self.chunk_tokens:
+                    groups.append([])
+                    group_tokens = 0
+                groups[-1].append(summary)
+                group_tokens += tokens
+            if len(groups) == len(summaries):
+                # Cada resumo sozinho já excede o limite: consolida tudo de uma vez para garantir o término
+                groups = [summaries]
+            summaries = await asyncio.gather(*(reduce_group(group) for group in groups))
+        return summaries[0]
+
+    async def digest_transcripts(self, company_name: str, transcripts: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Map-reduce das transcrições longas com o modelo barato.
+
+        Map: cada transcrição acima da sua parte do orçamento é dividida em trechos de até
+        COMPANY_STATUS_CHUNK_TOKENS tokens, resumidos em paralelo (limitados por
+        COMPANY_STATUS_DIGEST_CONCURRENCY). Reduce: os resumos de cada reunião são consolidados e,
+        se as três reuniões juntas ainda excedem o orçamento, condensados em um único resumo.
+
+        Returns:
+            Dict[str, Any]: {"transcripts": entradas por reunião (íntegra ou resumo),
+                             "consolidated": resumo único das reuniões ou None}
+        """
+        to_digest = self._meetings_to_digest(transcripts)
+        if not to_digest:
+            return {"transcripts": dict(transcripts), "consolidated": None}
+
+        chunks = {key: split_by_tokens(transcripts[key], self.chunk_tokens, self.chunk_overlap) for key in to_digest}
+        logger.info(
+            f"Status de {company_name}: resumindo {sum(len(parts) for parts in chunks.values())} trechos "
+            f"de {len(to_digest)} transcrição(ões) acima do orçamento de {self.token_budget} tokens"
+        )
+
+        semaphore = asyncio.Semaphore(self.digest_concurrency)
+
+        async def summarize(key: str, part: int, text: str, config: Dict[str, Any]) -> str:
+            async with semaphore:
+                return await self._run_digest(
+                    self.chunk_chain,
+                    {
+                        "meeting": MEETINGS[key],
+                        "company_name": company_name,
+                        "part": part + 1,
+                        "parts": len(chunks[key]),
+                        "text": text
+                    },
+                    config
+                )
+
+        async with instrument_stage("company_status_map") as config:
+            jobs = [(key, part, text) for key in to_digest for part, text in enumerate(chunks[key])]
+            results = await asyncio.gather(*(summarize(key, part, text, config) for key, part, text in jobs))
+        summaries: Dict[str, List[str]] = {key: [] for key in to_digest}
+        for (key, _, _), summary in zip(jobs, results):
+            summaries[key].append(summary)
+
+        async with instrument_stage("company_status_reduce") as config:
+            digests = await asyncio.gather(*(
+                self._collapse(company_name, MEETINGS[key], summaries[key], config) for key in to_digest
+            ))
+            digested = dict(transcripts)
+            for key, digest in zip(to_digest, digests):
+                digested[key] = f"(resumo da transcrição original)\n{digest}"
+
+            if sum(count_tokens(text) for text in digested.values()) <= self.token_budget:
+                return {"transcripts": digested, "consolidated": None}
+
+            meetings_text = "\n\n".join(f"## {MEETINGS[key]}\n{text}" for key, text in digested.items())
+            consolidated = await self._run_digest(
+                self.cross_meeting_chain,
+                {"company_name": company_name, "text": meetings_text, "max_tokens": self.token_budget},
+                config
+            )
+        return {"transcripts": digested, "consolidated": consolidated}
 
     async def generate_company_status(self,
                                     company_name: str,
                                     plan: str,
                                     commercial_transcript: str,
                                     onboarding_transcript: str,
-                                    discovery_transcript: str) -> str:
+                                    discovery_transcript: str,
+                                    digest: bool = True) -> str:
         """
         Gera um status detalhado do cliente baseado nas transcrições das reuniões.
-        
+
+        Transcrições que, somadas, excedem COMPANY_STATUS_TOKEN_BUDGET tokens passam antes pelo
+        map-reduce de digest_transcripts; as demais seguem na íntegra em uma única chamada.
+
         Args:
             company_name: Nome do cliente
             plan: Plano do cliente
             commercial_transcript: Transcrição completa da reunião comercial
             onboarding_transcript: Transcrição completa da reunião de onboarding
             discovery_transcript: Transcrição completa da reunião de discovery
-            
+            digest: False envia as transcrições na íntegra, sem o map-reduce (caminho de chamada única)
+
         Returns:
             str: Status detalhado do cliente incluindo restrições técnicas, preferências operacionais,
                  maturidade digital, desafios específicos e recomendações de implementação
         """
-        agent_executor = AgentExecutor(
-            agent=self.agent,
-            tools=[],
-            verbose=True,
-            max_iterations=3,
-            early_stopping_method="generate",
-            handle_parsing_errors=True
-        )
-        
-        # Implementa retry para lidar com rate limits
-        @backoff.on_exception(
-            backoff.expo,
-            (RateLimitError, APIError),
-            max_tries=8,
-            factor=2,
-            jitter=backoff.full_jitter
-        )
-        async def execute_with_retry():
-            try:
-                return await agent_executor.ainvoke({
-                    "company_name": company_name,
-                    "plan": plan,
-                    "commercial_transcript": commercial_transcript,
-                    "onboarding_transcript": onboarding_transcript,
-                    "discovery_transcript": discovery_transcript
-                })
-            except (RateLimitError, APIError) as e:
-                print(f"Rate limit atingido. Aguardando antes de tentar novamente: {str(e)}")
-                time.sleep(1)  # Pausa mínima antes do backoff
-                raise
-        
-        # Executa com retry
-        result = await execute_with_retry()
-        
-        return result["output"] 
\ No newline at end of file
+        transcripts = {
+            "commercial_transcript": commercial_transcript,
+            "onboarding_transcript": onboarding_transcript,
+            "discovery_transcript": discovery_transcript
+        }
+        chain = self.chain
+        inputs = {"company_name": company_name, "plan": plan, **transcripts}
+        if digest:
+            digested = await self.digest_transcripts(company_name, transcripts)
+            if digested["consolidated"] is not None:
+                chain = self.consolidated_chain
+                inputs = {"company_name": company_name, "plan": plan, "meetings_digest": digested["consolidated"]}
+            else:
+                inputs = {"company_name": company_name, "plan": plan, **digested["transcripts"]}
+
+        async with instrument_stage("company_status") as config:
+            result = await with_resilience(
+                lambda: chain.ainvoke(inputs, config=config),
+                model=self.llm.model_name,
+                estimated_tokens=estimate_tokens(inputs)
+            )
+
+        return result
@@ -0,0 +1,56 @@
+from typing import Dict
+from pydantic import BaseModel, Field
+from src.config.settings import get_settings
+from src.core.utils.openai_clients import create_chat_model
+from src.core.utils.resilience import with_resilience, estimate_tokens
+from src.core.utils.metrics import instrument_stage
+from src.core.prompts.copy_fast_prompt import COPY_FAST_TEMPLATE
+
+
+class CopyFastOutput(BaseModel):
+    """Saída estruturada do modo rápido: o resultado das três etapas em uma única chamada"""
+    prompt_formatado: str = Field(..., description="Prompt estruturado produzido na ETAPA 1")
+    variaveis_sugeridas: str = Field(..., description="Variáveis Zoppy selecionadas na ETAPA 2, com breve justificativa")
+    copy_text: str = Field(..., description="Copy final produzida na ETAPA 3")
+
+
+class CopyFastAgent:
+    def __init__(self):
+        self.settings = get_settings()
+        self.llm = create_chat_model(
+            model="gpt-4o",
+            temperature=0.2,
+            seed=self.settings.SEED
+        )
+        self.chain = COPY_FAST_TEMPLATE | self.llm.with_structured_output(CopyFastOutput)
+
+    async def generate_all_stages(self,
+                                  objetivo_copy: str,
+                                  tom_de_voz: str,
+                                  publico_alvo: str,
+                                  segmento_loja: str) -> Dict[str, str]:
+        """
+        Gera prompt formatado, variáveis sugeridas e copy final para WhatsApp em uma única chamada.
+        
+        Args:
+            objetivo_copy: Objetivo principal da mensagem
+            tom_de_voz: Tom de voz a ser utilizado (formal, informal, etc)
+            publico_alvo: Descrição do público-alvo
+            segmento_loja: Segmento da loja (ex: moda, eletrônicos, cosméticos)
+            
+        Returns:
+            Dict[str, str]: prompt_formatado, variaveis_sugeridas e copy_text
+        """
+        inputs = {
+            "objetivo_copy": objetivo_copy,
+            "tom_de_voz": tom_de_voz,
+            "publico_alvo": publico_alvo,
+            "segmento_loja": segmento_loja
+        }
+        async with instrument_stage("copy_fast_wpp") as config:
+            result = await with_resilience(
+                lambda: self.chain.ainvoke(inputs, config=config),
+                model=self.llm.model_name,
+                estimated_tokens=estimate_tokens(inputs)
+            )
+        return result.model_dump()
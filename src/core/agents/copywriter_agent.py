@@ -1,43 +1,26 @@
-from langchain.agents import AgentExecutor, create_tool_calling_agent
-from langchain_openai import ChatOpenAI
-from typing import Dict
+from langchain_core.output_parsers import StrOutputParser
+from typing import AsyncIterator, Dict
 from src.config.settings import get_settings
+from src.core.utils.openai_clients import create_chat_model
+from src.core.utils.resilience import with_resilience, estimate_tokens, get_rate_limiter
+from src.core.utils.metrics import StageTimer, instrument_stage
 from src.core.prompts.copywriter_prompt import COPYWRITER_TEMPLATE
-import backoff
-import time
-from openai import RateLimitError, APIError
-
-# Função auxiliar com retry para operações com OpenAI
-@backoff.on_exception(
-    backoff.expo,
-    (RateLimitError, APIError),
-    max_tries=8,
-    factor=2,
-    jitter=backoff.full_jitter
-)
-def with_retry(func, *args, **kwargs):
-    """Executa uma função com retry usando backoff exponencial para erros de rate limit"""
-    try:
-        return func(*args, **kwargs)
-    except (RateLimitError, APIError) as e:
-        print(f"OpenAI API error: {str(e)}. Aguardando antes de tentar novamente...")
-        time.sleep(1)  # Pausa mínima antes do backoff
-        raise
 
 class CopywriterAgent:
     def __init__(self):
         self.settings = get_settings()
-        self.llm = ChatOpenAI(
+        self.llm = create_chat_model(
             model="gpt-4o",
             temperature=0.2,
-            api_key=self.settings.OPENAI_API_KEY,
             seed=self.settings.SEED
         )
-        self.agent = self._create_agent()
+        # Cadeia direta prompt → modelo → parser: o agente não usa ferramentas, então não há
+        # scratchpad, parsing de ações nem logs verbosos a cada chamada
+        self.chain = self._create_chain()
 
-    def _create_agent(self):
-        """Cria o agente com o prompt configurado"""
-        return create_tool_calling_agent(self.llm, [], COPYWRITER_TEMPLATE)
+    def _create_chain(self):
+        """Cria a cadeia com o prompt configurado"""
+        return COPYWRITER_TEMPLATE | self.llm | StrOutputParser()
 
     async def generate_copy(self, 
                           prompt_formatado: str,
@@ -52,32 +35,45 @@ class CopywriterAgent:
         Returns:
             str: Copy final para WhatsApp
         """
-        agent_executor = AgentExecutor(
-            agent=self.agent,
-            tools=[],
-            verbose=True,
-            max_iterations=3,
-            early_stopping_method="generate",
-            handle_parsing_errors=True
-        )
+        inputs = {
+            "prompt_formatado": prompt_formatado,
+            "variaveis_sugeridas": variaveis_sugeridas
+        }
+        async with instrument_stage("copywriter_wpp") as config:
+            result = await with_resilience(
+                lambda: self.chain.ainvoke(inputs, config=config),
+                model=self.llm.model_name,
+                estimated_tokens=estimate_tokens(inputs)
+            )
+        return result
+
+    async def astream_copy(self,
+                           prompt_formatado: str,
+                           variaveis_sugeridas: str) -> AsyncIterator[str]:
+        """
+        Gera o copy final para WhatsApp emitindo os tokens à medida que o modelo os produz.
         
-        @backoff.on_exception(
-            backoff.expo,
-            (RateLimitError, APIError),
-            max_tries=8,
-            factor=2,
-            jitter=backoff.full_jitter
-        )
-        async def execute_with_retry():
-            try:
-                return await agent_executor.ainvoke({
-                    "prompt_formatado": prompt_formatado,
-                    "variaveis_sugeridas": variaveis_sugeridas
-                })
-            except (RateLimitError, APIError) as e:
-                print(f"Rate limit atingido. Aguardando antes de tentar novamente: {str(e)}")
-                time.sleep(1)
-                raise
+        Args:
+            prompt_formatado: Prompt detalhado gerado pelo agente de prompt
+            variaveis_sugeridas: Variáveis sugeridas pelo agente de variáveis
+            
+        Yields:
+            str: Trechos (tokens) do copy final
+        """
+        inputs = {
+            "prompt_formatado": prompt_formatado,
+            "variaveis_sugeridas": variaveis_sugeridas
+        }
+        # Um stream já iniciado não pode ser repetido; aplica-se apenas o limitador de RPM/TPM
+        await get_rate_limiter(self.llm.model_name).acquire(estimate_tokens(inputs))
         
-        result = await execute_with_retry()
-        return result["output"] 
\ No newline at end of file
+        # Mede só a geração: o tempo em que o cliente lê os tokens não entra na latência da etapa
+        timer = StageTimer("copywriter_wpp")
+        try:
+            async for token in timer.iterate(self.chain.astream(inputs, config=timer.config)):
+                if token:
+                    yield token
+        except Exception:
+            timer.observe("error")
+            raise
+        timer.observe("ok")
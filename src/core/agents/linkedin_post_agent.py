@@ -2,22 +2,22 @@
 from langchain_community.tools.tavily_search import TavilySearchResults
 from langchain_community.utilities.tavily_search import TavilySearchAPIWrapper  
 from langchain.agents import AgentExecutor, create_tool_calling_agent
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from src.config.settings import get_settings
+from src.core.utils.openai_clients import create_chat_model
+from src.core.utils.resilience import with_resilience, estimate_tokens
+from src.core.utils.metrics import instrument_stage
 from src.core.utils.langsmith_helper import LangSmithHelper, FeatureType
 
 class LinkedInPostAgent:
     def __init__(self, set_project: bool = True):
         self.settings = get_settings()
         
-        # Configura o projeto LangSmith se solicitado
-        if set_project:
-            LangSmithHelper.set_project_env(FeatureType.LINKEDIN_POST)
+        # Projeto LangSmith aplicado a cada chamada (por requisição), se solicitado
+        self.feature_type = FeatureType.LINKEDIN_POST if set_project else None
             
-        self.llm = ChatOpenAI(model="gpt-4o",
-                            temperature=0.7,
-                            api_key=self.settings.OPENAI_API_KEY)
+        self.llm = create_chat_model(model="gpt-4o",
+                                     temperature=0.7)
         
         self.tools = [self._setup_tavily()]
         self.agent = self._create_agent()
@@ -57,7 +57,7 @@ class LinkedInPostAgent:
             handle_parsing_errors=True
         )
         
-        result = await agent_executor.ainvoke({
+        inputs = {
             "messages": [
                 {
                     "role": "user",
@@ -72,9 +72,12 @@ class LinkedInPostAgent:
                     """
                 }
             ]
-        })
-        
-        # Restaura o projeto LangSmith se foi alterado
-        LangSmithHelper.reset_project_env()
+        }
+        with LangSmithHelper.project_context(self.feature_type), instrument_stage("linkedin_post") as config:
+            result = await with_resilience(
+                lambda: agent_executor.ainvoke(inputs, config=config),
+                model=self.llm.model_name,
+                estimated_tokens=estimate_tokens(inputs)
+            )
         
         return result["output"]
\ No newline at end of file
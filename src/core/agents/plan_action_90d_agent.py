@@ -1,118 +1,100 @@
-from langchain.agents import AgentExecutor, create_tool_calling_agent
-from langchain_openai import ChatOpenAI
+import asyncio
+import re
+from langchain.agents import create_tool_calling_agent
+from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.documents import Document
-from langchain_chroma import Chroma
-from langchain_openai import OpenAIEmbeddings
-from langchain.tools.retriever import create_retriever_tool
-from langchain.retrievers import ContextualCompressionRetriever
-from langchain.retrievers.document_compressors import LLMChainExtractor
-from typing import List, Dict
+from typing import Any, List, Dict, Optional
 from src.config.settings import get_settings
+from src.core.utils.openai_clients import create_chat_model
+from src.core.utils.resilience import with_resilience, estimate_tokens
+from src.core.utils.metrics import instrument_stage
+from src.core.utils.agent_executor import BoundedAgentExecutor
 from src.core.prompts.plan_action_90d_prompt import PLAN_ACTION_90D_PROMPT
-import os
-import backoff
-import time
-from openai import RateLimitError, APIError
-
-# Função auxiliar com retry para operações com OpenAI
-@backoff.on_exception(
-    backoff.expo,
-    (RateLimitError, APIError),
-    max_tries=8,
-    factor=2,
-    jitter=backoff.full_jitter
-)
-def with_retry(func, *args, **kwargs):
-    """Executa uma função com retry usando backoff exponencial para erros de rate limit"""
-    try:
-        return func(*args, **kwargs)
-    except (RateLimitError, APIError) as e:
-        print(f"OpenAI API error: {str(e)}. Aguardando antes de tentar novamente...")
-        time.sleep(1)  # Pausa mínima antes do backoff
-        raise
+from src.core.prompts.plan_action_90d_sections_prompt import PLAN_OUTLINE_INSTRUCTIONS, PLAN_SECTION_INSTRUCTIONS
+from src.core.tools.meeting_qa_renderer import MeetingQARenderer
+from src.core.tools.zoppy_knowledge_base import ZoppyKnowledgeBase
+
+# Dados do cliente compartilhados pelo agente e pela geração em seções
+PLAN_CONTEXT_TEMPLATE = "Nome do Cliente: {company_name}\n\nReunião Comercial:\n{commercial_meeting}\n\nReunião de Onboarding:\n{onboarding_meeting}\n\nReunião de Discovery:\n{discovery_meeting}\n\nResumo do status do cliente: {company_status}\n\nPlano contratado: {plan}\n\nSegmento da loja: {segment}\n\nData Atual: {current_date}\n\nContexto já recuperado da base de conhecimento da Zoppy:\n{knowledge_context}"
+
+# Só o agente tem a ferramenta da base de conhecimento; as cadeias do modo em seções não
+AGENT_TOOL_HINT = "Use a ferramenta da base de conhecimento apenas para informações que não estejam no contexto já recuperado."
+
+# Seções redigidas em paralelo no modo em seções, na ordem em que são unidas no markdown final
+PLAN_SECTIONS = [
+    ("abertura", "o título '# PLANO DE AÇÃO 90 DIAS: [NOME DO CLIENTE]' seguido das seções DIAGNÓSTICO ESTRATÉGICO, CALENDÁRIO ESTRATÉGICO DO VAREJO e RESUMO EXECUTIVO, com as tabelas"),
+    ("fase_1", "a seção '## FASE 1: ESTRATÉGIA INICIAL (DIAS 1-30)'"),
+    ("fase_2", "a seção '## FASE 2: OTIMIZAÇÃO E ESCALA (DIAS 31-60)'"),
+    ("fase_3", "a seção '## FASE 3: EXPANSÃO E INOVAÇÃO (DIAS 61-90)' seguida das seções finais INDICADORES DE RESULTADOS, PLANO DE CONTINUIDADE e RECURSOS E SUPORTE"),
+]
+
+# Cercas de bloco de código e separadores que o modelo às vezes coloca nas bordas de cada seção
+_SECTION_EDGES = re.compile(r"^(\s*(```[a-z]*|---)\s*\n)+|(\n\s*(```|---)\s*)+$")
+
 
 class PlanAction90dAgent:
-    def __init__(self):
+    def __init__(self, knowledge_base: Optional[ZoppyKnowledgeBase] = None):
         self.settings = get_settings()
-        self.llm = ChatOpenAI(
+        self.llm = create_chat_model(
             model="gpt-4o",
             temperature=0.2,
-            api_key=self.settings.OPENAI_API_KEY,
             seed=self.settings.SEED
         )
         
-        # Configuração do vetor de documentos da Zoppy
-        self.tools = self._setup_tools()
+        # Base de conhecimento da Zoppy: compartilhada quando injetada (carregada no startup da API)
+        self.knowledge_base = knowledge_base or ZoppyKnowledgeBase(llm=self.llm).load()
+        self.tools = self.knowledge_base.tools
         self.agent = self._create_agent()
-
-    def _setup_tools(self):
-        """Configura as ferramentas para o agente, incluindo o retriever do banco vetorial"""
-        tools = []
-        
-        # Inicializa o retriever para consulta de documentos da Zoppy
-        try:
-            # Obtém o caminho raiz do projeto
-            project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
-            vector_db_path = os.path.join(project_root, "data", "vectorstorage")
-            print(f"Tentando acessar banco vetorial em: {vector_db_path}")
-            
-            # Garanta que o diretório exista
-            os.makedirs(vector_db_path, exist_ok=True)
-            
-            # Carrega o banco de dados vetorial existente
-            embeddings = OpenAIEmbeddings(api_key=self.settings.OPENAI_API_KEY)
-            print(f"Inicializando Chroma com path: {vector_db_path}")
-            vectordb = Chroma(
-                persist_directory=vector_db_path,
-                embedding_function=embeddings
-            )
-            
-            # Mostra estatísticas sobre o banco
-            collection = vectordb._collection
-            print(f"Número de documentos no banco vetorial: {collection.count()}")
-            
-            # Configura compressor para extrair apenas informações relevantes
-            compressor = LLMChainExtractor.from_llm(self.llm)
-            
-            # Cria um retriever com compressão contextual
-            retriever = vectordb.as_retriever(
-                search_type="similarity",
-                search_kwargs={"k": 5}  
-            )
-            compression_retriever = ContextualCompressionRetriever(
-                base_compressor=compressor,
-                base_retriever=retriever,
-                document_compressor_kwargs={"top_n": 3} 
-            )
-            
-            # Cria ferramenta de recuperação de documentos
-            retriever_tool = create_retriever_tool(
-                retriever=compression_retriever,
-                name="zoppy_knowledge_base",
-                description="Útil para buscar informações sobre a Zoppy, suas funcionalidades, integrações e melhores práticas para varejistas. Use esta ferramenta múltiplas vezes conforme necessário para obter informações detalhadas sobre diferentes aspectos da plataforma. Além de datas comemorativas, você pode usar esta ferramenta para buscar informações sobre eventos, datas especiais e sazonalidades relevantes para o segmento do cliente."
-            )
-            
-            tools.append(retriever_tool)
-            print("Ferramenta de recuperação de documentos criada com sucesso!")
-        except Exception as e:
-            print(f"Erro ao carregar o banco vetorial: {e}")
-            import traceback
-            traceback.print_exc()
-            print("Continuando sem a ferramenta de recuperação de documentos.")
-        
-        return tools
+        # Modo em seções: esqueleto curto + seções em paralelo, sem ferramentas (usa o contexto pré-recuperado)
+        self.outline_chain = self._create_plan_chain(PLAN_OUTLINE_INSTRUCTIONS)
+        self.section_chain = self._create_plan_chain(PLAN_SECTION_INSTRUCTIONS)
+        # Perguntas e respostas das reuniões em formato compacto, sem repetições e com limite de tokens
+        self.meeting_renderer = MeetingQARenderer(self.settings.PLAN_MEETING_QA_TOKEN_BUDGET)
 
     def _create_agent(self):
         """Cria o agente com o prompt e ferramentas configuradas"""
         prompt = ChatPromptTemplate.from_messages([
             ("system", PLAN_ACTION_90D_PROMPT),
-            ("human", "Nome do Cliente: {company_name}\n\nReunião Comercial: {commercial_meeting}\n\nReunião de Onboarding: {onboarding_meeting}\n\nReunião de Discovery: {discovery_meeting}\n\nResumo do status do cliente: {company_status}\n\nPlano contratado: {plan}\n\nData Atual: {current_date}\n\nGere o plano de ação para os 90 primeiros dias:"),
+            ("human", PLAN_CONTEXT_TEMPLATE + "\n\n" + AGENT_TOOL_HINT + "\n\nGere o plano de ação para os 90 primeiros dias:"),
                 MessagesPlaceholder(variable_name="agent_scratchpad")
             ])
 
         return create_tool_calling_agent(self.llm, self.tools, prompt)
 
+    def _create_plan_chain(self, instructions: str):
+        """Cadeia sem ferramentas com o mesmo prompt de sistema e os mesmos dados do cliente do agente"""
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", PLAN_ACTION_90D_PROMPT),
+            ("human", PLAN_CONTEXT_TEMPLATE + "\n\n" + instructions.strip())
+        ])
+
+        return prompt | self.llm | StrOutputParser()
+
+    def _build_inputs(self,
+                      company_name: str,
+                      plan: str,
+                      commercial_meeting: List[Dict[str, str]],
+                      onboarding_meeting: List[Dict[str, str]],
+                      discovery_meeting: List[Dict[str, str]],
+                      company_status: str,
+                      current_date: str,
+                      segment: Optional[str],
+                      knowledge_context: str) -> Dict[str, Any]:
+        meetings = self.meeting_renderer.render({
+            "commercial_meeting": commercial_meeting,
+            "onboarding_meeting": onboarding_meeting,
+            "discovery_meeting": discovery_meeting
+        })
+        return {
+            "company_name": company_name,
+            "plan": plan,
+            **meetings,
+            "company_status": company_status,
+            "current_date": current_date,
+            "segment": segment or "não informado",
+            "knowledge_context": knowledge_context or "(nenhum contexto pré-carregado)"
+        }
+
     async def generate_action_plan(self,  
                                 company_name: str,
                                 plan: str,
@@ -120,7 +102,9 @@ class PlanAction90dAgent:
                                 onboarding_meeting: List[Dict[str, str]],
                                 discovery_meeting: List[Dict[str, str]],
                                 company_status: str,
-                                current_date: str) -> str:
+                                current_date: str,
+                                segment: Optional[str] = None,
+                                knowledge_context: str = "") -> str:
         """
         Gera um plano de ação para os 90 primeiros dias do cliente.
         
@@ -132,44 +116,77 @@ class PlanAction90dAgent:
             discovery_meeting: Lista de perguntas e respostas da reunião de discovery
             company_status: Status detalhado do cliente gerado pelo CompanyStatusAgent
             current_date: Data atual
+            segment: Segmento da loja (opcional)
+            knowledge_context: Contexto da base de conhecimento obtido na pré-recuperação
             
         Returns:
             str: Plano de ação detalhado para os 90 primeiros dias
         """
-        agent_executor = AgentExecutor(
+        # Executor por requisição: as consultas paralelas de uma rodada rodam juntas, até o limite configurado
+        agent_executor = BoundedAgentExecutor(
             agent=self.agent,
             tools=self.tools,
+            max_concurrent_tools=self.settings.PLAN_AGENT_MAX_CONCURRENT_TOOLS,
             verbose=True,
             max_iterations=10,  # Permite mais iterações para múltiplas consultas
             early_stopping_method="generate",  # Permite que o agente decida quando parar
             handle_parsing_errors=True  # Lida melhor com erros de parsing
         )
         
-        # Implementa retry para lidar com rate limits
-        @backoff.on_exception(
-            backoff.expo,
-            (RateLimitError, APIError),
-            max_tries=8,
-            factor=2,
-            jitter=backoff.full_jitter
+        inputs = self._build_inputs(
+            company_name, plan, commercial_meeting, onboarding_meeting, discovery_meeting,
+            company_status, current_date, segment, knowledge_context
         )
-        async def execute_with_retry():
-            try:
-                return await agent_executor.ainvoke({
-                    "company_name": company_name,
-                    "plan": plan,
-                    "commercial_meeting": commercial_meeting,
-                    "onboarding_meeting": onboarding_meeting,
-                    "discovery_meeting": discovery_meeting,
-                    "company_status": company_status,
-                    "current_date": current_date
-                })
-            except (RateLimitError, APIError) as e:
-                print(f"Rate limit atingido. Aguardando antes de tentar novamente: {str(e)}")
-                time.sleep(1)  # Pausa mínima antes do backoff
-                raise
-        
-        # Executa com retry
-        result = await execute_with_retry()
+        async with instrument_stage("plan_action_90d") as config:
+            result = await with_resilience(
+                lambda: agent_executor.ainvoke(inputs, config=config),
+                model=self.llm.model_name,
+                estimated_tokens=estimate_tokens(inputs)
+            )
         
-        return result["output"]
\ No newline at end of file
+        return result["output"]
+
+    async def generate_action_plan_sectioned(self,
+                                             company_name: str,
+                                             plan: str,
+                                             commercial_meeting: List[Dict[str, str]],
+                                             onboarding_meeting: List[Dict[str, str]],
+                                             discovery_meeting: List[Dict[str, str]],
+                                             company_status: str,
+                                             current_date: str,
+                                             segment: Optional[str] = None,
+                                             knowledge_context: str = "") -> str:
+        """
+        Gera o plano de ação em seções: uma chamada curta produz o esqueleto (diagnóstico, datas e
+        ações de cada fase) e, a partir dele, a abertura com as tabelas de resumo e as três fases
+        são redigidas em paralelo e unidas no mesmo markdown do modo de chamada única.
+
+        A latência passa a ser a do esqueleto mais a da maior seção, em vez da geração inteira.
+        Os argumentos são os mesmos de generate_action_plan.
+
+        Returns:
+            str: Plano de ação detalhado para os 90 primeiros dias
+        """
+        inputs = self._build_inputs(
+            company_name, plan, commercial_meeting, onboarding_meeting, discovery_meeting,
+            company_status, current_date, segment, knowledge_context
+        )
+        async with instrument_stage("plan_action_90d_outline") as config:
+            outline = await with_resilience(
+                lambda: self.outline_chain.ainvoke(inputs, config=config),
+                model=self.llm.model_name,
+                estimated_tokens=estimate_tokens(inputs)
+            )
+
+        async def write_section(section: str, config: Dict[str, Any]) -> str:
+            section_inputs = {**inputs, "outline": outline, "section": section}
+            return await with_resilience(
+                lambda: self.section_chain.ainvoke(section_inputs, config=config),
+                model=self.llm.model_name,
+                estimated_tokens=estimate_tokens(section_inputs)
+            )
+
+        async with instrument_stage("plan_action_90d_sections") as config:
+            sections = await asyncio.gather(*(write_section(section, config) for _, section in PLAN_SECTIONS))
+
+        return "\n\n---\n\n".join(_SECTION_EDGES.sub("", section.strip()).strip() for section in sections)
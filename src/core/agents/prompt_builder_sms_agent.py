@@ -1,43 +1,37 @@
-from langchain.agents import AgentExecutor, create_tool_calling_agent
-from langchain_openai import ChatOpenAI
-from typing import Dict
+from langchain_core.output_parsers import StrOutputParser
+from typing import Dict, Optional
 from src.config.settings import get_settings
+from src.core.utils.openai_clients import create_chat_model
+from src.core.utils.resilience import with_resilience, estimate_tokens
+from src.core.utils.metrics import instrument_stage
+from src.core.utils.stage_cache import StageCache, build_cache_key, template_version
 from src.core.prompts.prompt_builder_sms_prompt import PROMPT_BUILDER_SMS_TEMPLATE
-import backoff
-import time
-from openai import RateLimitError, APIError
-
-# Função auxiliar com retry para operações com OpenAI
-@backoff.on_exception(
-    backoff.expo,
-    (RateLimitError, APIError),
-    max_tries=8,
-    factor=2,
-    jitter=backoff.full_jitter
-)
-def with_retry(func, *args, **kwargs):
-    """Executa uma função com retry usando backoff exponencial para erros de rate limit"""
-    try:
-        return func(*args, **kwargs)
-    except (RateLimitError, APIError) as e:
-        print(f"OpenAI API error: {str(e)}. Aguardando antes de tentar novamente...")
-        time.sleep(1)  # Pausa mínima antes do backoff
-        raise
 
 class PromptBuilderSmsAgent:
-    def __init__(self):
+    # Nome do estágio no cache (a saída depende apenas das entradas normalizadas e da versão do prompt)
+    CACHE_STAGE = "prompt_builder_sms"
+
+    def __init__(self, cache: Optional[StageCache] = None):
         self.settings = get_settings()
-        self.llm = ChatOpenAI(
+        self.cache = cache or StageCache()
+        self.llm = create_chat_model(
             model="gpt-4o",
             temperature=0.2,
-            api_key=self.settings.OPENAI_API_KEY,
             seed=self.settings.SEED
         )
-        self.agent = self._create_agent()
+        # Cadeia direta prompt → modelo → parser: o agente não usa ferramentas, então não há
+        # scratchpad, parsing de ações nem logs verbosos a cada chamada
+        self.chain = self._create_chain()
+        self.prompt_version = template_version(
+            PROMPT_BUILDER_SMS_TEMPLATE,
+            model=self.llm.model_name,
+            temperature=self.llm.temperature,
+            seed=self.settings.SEED
+        )
 
-    def _create_agent(self):
-        """Cria o agente com o prompt configurado"""
-        return create_tool_calling_agent(self.llm, [], PROMPT_BUILDER_SMS_TEMPLATE)
+    def _create_chain(self):
+        """Cria a cadeia com o prompt configurado"""
+        return PROMPT_BUILDER_SMS_TEMPLATE | self.llm | StrOutputParser()
 
     async def generate_prompt(self, 
                             objetivo_copy: str,
@@ -56,34 +50,23 @@ class PromptBuilderSmsAgent:
         Returns:
             str: Prompt detalhado para criação do copy
         """
-        agent_executor = AgentExecutor(
-            agent=self.agent,
-            tools=[],
-            verbose=True,
-            max_iterations=3,
-            early_stopping_method="generate",
-            handle_parsing_errors=True
-        )
+        inputs = {
+            "objetivo_copy": objetivo_copy,
+            "tom_de_voz": tom_de_voz,
+            "publico_alvo": publico_alvo,
+            "segmento_loja": segmento_loja
+        }
+        cache_key = build_cache_key(self.prompt_version, **inputs)
+        cached = await self.cache.get(self.CACHE_STAGE, cache_key)
+        if cached is not None:
+            return cached
         
-        @backoff.on_exception(
-            backoff.expo,
-            (RateLimitError, APIError),
-            max_tries=8,
-            factor=2,
-            jitter=backoff.full_jitter
-        )
-        async def execute_with_retry():
-            try:
-                return await agent_executor.ainvoke({
-                    "objetivo_copy": objetivo_copy,
-                    "tom_de_voz": tom_de_voz,
-                    "publico_alvo": publico_alvo,
-                    "segmento_loja": segmento_loja
-                })
-            except (RateLimitError, APIError) as e:
-                print(f"Rate limit atingido. Aguardando antes de tentar novamente: {str(e)}")
-                time.sleep(1)
-                raise
+        async with instrument_stage("prompt_builder_sms") as config:
+            result = await with_resilience(
+                lambda: self.chain.ainvoke(inputs, config=config),
+                model=self.llm.model_name,
+                estimated_tokens=estimate_tokens(inputs)
+            )
         
-        result = await execute_with_retry()
-        return result["output"] 
\ No newline at end of file
+        await self.cache.set(self.CACHE_STAGE, cache_key, result)
+        return result 
\ No newline at end of file
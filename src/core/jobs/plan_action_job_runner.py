@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+from src.api.requests.plan_action_90d_request import PlanAction90dRequest
+from src.core.jobs.plan_action_job_store import (
+    PlanActionJobStore, JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED
+)
+from src.core.tools.markdown_to_docx import convert_markdown_to_docx
+from src.core.utils.metrics import instrument_stage
+from src.core.workflows.generate_action_plan_workflow import GenerateActionPlanWorkflow
+
+logger = logging.getLogger(__name__)
+
+# Intervalo entre as limpezas dos jobs antigos (retenção)
+CLEANUP_INTERVAL_SECONDS = 3600
+
+
+class PlanActionJobRunner:
+    """
+    Pool limitado de workers assíncronos que executa os jobs do plano de ação de 90 dias.
+
+    Os jobs são lidos de uma fila em memória e o estado é persistido no PlanActionJobStore;
+    no startup, jobs em background que não terminaram antes de um restart são recolocados na
+    fila, e os síncronos (cujo cliente já desconectou) ficam como falha, retomáveis sob demanda.
+    Cada etapa concluída grava um checkpoint, então reexecuções (restart ou retomada de um job
+    com falha) continuam da última etapa concluída.
+
+    Jobs concluídos ou com falha, e os seus DOCX, são apagados após `retention_seconds`
+    (0 = mantidos indefinidamente). Todo acesso ao store roda em thread (asyncio.to_thread).
+    """
+
+    def __init__(self, workflow: GenerateActionPlanWorkflow, store: PlanActionJobStore,
+                 output_dir: str, workers: int = 2, retention_seconds: float = 0):
+        self.workflow = workflow
+        self.store = store
+        self.output_dir = output_dir
+        self.workers = workers
+        self.retention_seconds = retention_seconds
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        os.makedirs(output_dir, exist_ok=True)
+
+    async def start(self) -> None:
+        """Inicia os workers, recoloca na fila os jobs pendentes e agenda a limpeza dos antigos"""
+        interrupted = await asyncio.to_thread(
+            self.store.fail_interrupted, "Geração interrompida por um restart da API"
+        )
+        if interrupted:
+            logger.info(f"{interrupted} job(s) síncrono(s) do plano de ação interrompido(s) marcado(s) como falha")
+        for job_id in await asyncio.to_thread(self.store.list_unfinished):
+            logger.info(f"Retomando job pendente do plano de ação: {job_id}")
+            await asyncio.to_thread(self.store.update, job_id, status=JOB_QUEUED, stage=JOB_QUEUED)
+            self._queue.put_nowait(job_id)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        if self.retention_seconds > 0:
+            self._tasks.append(asyncio.create_task(self._cleanup_loop()))
+
+    async def stop(self) -> None:
+        """Cancela os workers; jobs em execução voltam para a fila no próximo startup"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, request: PlanAction90dRequest, current_date: str, background: bool = True) -> str:
+        """
+        Registra um novo job e, se for em background, o enfileira.
+
+        Args:
+            request: Requisição de geração do plano de ação
+            current_date: Data de referência do plano (dd/mm/aaaa)
+            background: False para jobs executados pelo próprio chamador com run_job (rota síncrona)
+
+        Returns:
+            str: Id do job
+        """
+        job_id = await asyncio.to_thread(
+            self.store.create, request.company_name, request.model_dump(), current_date, background
+        )
+        if background:
+            self._queue.put_nowait(job_id)
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def resume(self, job_id: str) -> bool:
+        """
+        Recoloca na fila um job com falha; as etapas com checkpoint não são executadas de novo.
+
+        Returns:
+            bool: False se o job não estava com falha (ex.: já retomado por outra chamada)
+        """
+        if not await asyncio.to_thread(self.store.requeue_failed, job_id):
+            return False
+        self._queue.put_nowait(job_id)
+        return True
+
+    async def discard(self, job_id: str) -> None:
+        """Apaga o job, os seus checkpoints e o DOCX (ex.: depois de entregue pela rota síncrona)"""
+        result_path = await asyncio.to_thread(self.store.delete, job_id)
+        if result_path:
+            await asyncio.to_thread(self._remove_file, result_path)
+
+    async def cleanup(self) -> int:
+        """Apaga os jobs concluídos ou com falha mais antigos que a retenção; retorna quantos DOCX removeu"""
+        older_than = time.time() - self.retention_seconds
+        paths = await asyncio.to_thread(self.store.purge_finished, older_than)
+        for path in paths:
+            await asyncio.to_thread(self._remove_file, path)
+        return len(paths)
+
+    async def _cleanup_loop(self) -> None:
+        while True:
+            try:
+                removed = await self.cleanup()
+                if removed:
+                    logger.info(f"Limpeza dos jobs do plano de ação: {removed} documento(s) removido(s)")
+            except Exception as e:
+                logger.error(f"Erro na limpeza dos jobs do plano de ação: {str(e)}")
+            await asyncio.sleep(min(CLEANUP_INTERVAL_SECONDS, self.retention_seconds))
+
+    @staticmethod
+    def _remove_file(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def queue_size(self) -> int:
+        return self._queue.qsize()
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self.run_job(job_id)
+            except Exception as e:
+                logger.error(f"Erro no job {job_id} do plano de ação (worker {worker_id}): {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def run_job(self, job_id: str) -> Dict[str, str]:
+        """
+        Executa um job a partir da última etapa com checkpoint e grava o DOCX no diretório de saída.
+        Em caso de falha marca o job como failed (mantendo os checkpoints) e propaga a exceção.
+
+        Se a execução for cancelada (ex.: cliente da rota síncrona desconectou), um job síncrono
+        também é marcado como failed, para poder ser retomado; um job em background continua
+        pendente e volta para a fila no próximo startup.
+
+        Returns:
+            Dict[str, str]: Resultado do workflow acrescido de result_path (caminho do DOCX)
+        """
+        try:
+            return await self._run_job(job_id)
+        except asyncio.CancelledError:
+            # shield: a atualização termina mesmo que o cancelamento se repita
+            await asyncio.shield(asyncio.to_thread(
+                self.store.fail_interrupted, "Geração interrompida: a requisição foi cancelada", job_id
+            ))
+            raise
+        except Exception as e:
+            await asyncio.to_thread(self.store.update, job_id, status=JOB_FAILED, error=str(e))
+            raise
+
+    async def _run_job(self, job_id: str) -> Dict[str, str]:
+        job = await self.get(job_id)
+        if job is None:
+            raise KeyError(f"Job {job_id} não encontrado")
+        request = PlanAction90dRequest.model_validate(job["request"])
+        checkpoints = await asyncio.to_thread(self.store.get_checkpoints, job_id)
+        if checkpoints:
+            logger.info(f"Job {job_id} do plano de ação retomado com checkpoints: {', '.join(checkpoints)}")
+        await asyncio.to_thread(self.store.update, job_id, status=JOB_RUNNING, error=None)
+
+        async def on_stage(stage: str) -> None:
+            await asyncio.to_thread(self.store.update, job_id, stage=stage)
+
+        async def on_checkpoint(stage: str, value: str) -> None:
+            await asyncio.to_thread(self.store.save_checkpoint, job_id, stage, value)
+
+        result = await self.workflow.execute(
+            company_name=request.company_name,
+            plan=request.plan,
+            segment=request.segment,
+            sectioned=request.sectioned,
+            commercial_transcript=request.commercial_transcript,
+            onboarding_transcript=request.onboarding_transcript,
+            discovery_transcript=request.discovery_transcript,
+            commercial_meeting=request.commercial_meeting,
+            onboarding_meeting=request.onboarding_meeting,
+            discovery_meeting=request.discovery_meeting,
+            current_date=job["reference_date"],
+            on_stage=on_stage,
+            checkpoints=checkpoints,
+            on_checkpoint=on_checkpoint
+        )
+
+        # Documento já renderizado em uma execução anterior: só falta marcar o job como concluído
+        result_path = checkpoints.get("document")
+        if not result_path or not os.path.exists(result_path):
+            # A conversão para DOCX é CPU-bound: roda em thread para não travar o event loop
+            await on_stage("document")
+            async with instrument_stage("markdown_to_docx"):
+                docx_content = await asyncio.to_thread(
+                    convert_markdown_to_docx, result["action_plan"], request.company_name
+                )
+            result_path = os.path.join(self.output_dir, f"{job_id}.docx")
+            await asyncio.to_thread(self._write_file, result_path, docx_content)
+            await on_checkpoint("document", result_path)
+
+        await asyncio.to_thread(
+            self.store.update, job_id, status=JOB_DONE, stage=JOB_DONE, result_path=result_path
+        )
+        return {**result, "result_path": result_path}
+
+    @staticmethod
+    def _write_file(path: str, content: bytes) -> None:
+        with open(path, "wb") as f:
+            f.write(content)
@@ -0,0 +1,178 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+# Estados possíveis de um job
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+class PlanActionJobStore:
+    """
+    Armazenamento durável (SQLite) dos jobs de geração do plano de ação de 90 dias.
+
+    Guarda a requisição original, o estado, a etapa atual, o caminho do DOCX gerado e os
+    checkpoints de cada etapa concluída (status do cliente, contexto recuperado, markdown do plano),
+    permitindo retomar jobs pendentes ou com falha a partir da última etapa concluída e servir
+    resultados após um restart da API.
+
+    Jobs com `background = 0` são os da rota síncrona, que tem um cliente aguardando a resposta:
+    não são recolocados na fila no startup, apenas marcados como falha para uma retomada explícita.
+
+    Os métodos usam sqlite3 síncrono; no event loop devem ser chamados via asyncio.to_thread.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS plan_action_jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, stage TEXT NOT NULL, "
+                "company_name TEXT NOT NULL, request_json TEXT NOT NULL, reference_date TEXT NOT NULL, "
+                "result_path TEXT, error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS plan_action_checkpoints ("
+                "job_id TEXT NOT NULL, stage TEXT NOT NULL, value TEXT NOT NULL, created_at REAL NOT NULL, "
+                "PRIMARY KEY (job_id, stage))"
+            )
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(plan_action_jobs)")}
+            if "background" not in columns:
+                self._conn.execute("ALTER TABLE plan_action_jobs ADD COLUMN background INTEGER NOT NULL DEFAULT 1")
+
+    def create(self, company_name: str, request_payload: Dict[str, Any], current_date: str,
+               background: bool = True) -> str:
+        """Registra um novo job na fila e retorna o seu id"""
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO plan_action_jobs (id, status, stage, company_name, request_json, reference_date, "
+                "background, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, JOB_QUEUED, JOB_QUEUED, company_name, json.dumps(request_payload, ensure_ascii=False),
+                 current_date, int(background), now, now)
+            )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM plan_action_jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            stages = self._conn.execute(
+                "SELECT stage FROM plan_action_checkpoints WHERE job_id = ? ORDER BY created_at", (job_id,)
+            ).fetchall()
+        job = self._to_dict(row)
+        job["checkpoints"] = [stage["stage"] for stage in stages]
+        return job
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        """Atualiza campos do job (status, stage, result_path, error)"""
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE plan_action_jobs SET {assignments} WHERE id = ?",
+                (*fields.values(), job_id)
+            )
+
+    def requeue_failed(self, job_id: str) -> bool:
+        """
+        Recoloca um job com falha na fila, de forma atômica (compare-and-set no status): entre
+        chamadas concorrentes, só uma recebe True. O job passa a rodar em background.
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE plan_action_jobs SET status = ?, error = NULL, background = 1, updated_at = ? "
+                "WHERE id = ? AND status = ?",
+                (JOB_QUEUED, time.time(), job_id, JOB_FAILED)
+            )
+        return cursor.rowcount == 1
+
+    def save_checkpoint(self, job_id: str, stage: str, value: str) -> None:
+        """Grava (ou substitui) a saída de uma etapa concluída do job"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO plan_action_checkpoints (job_id, stage, value, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (job_id, stage, value, time.time())
+            )
+
+    def get_checkpoints(self, job_id: str) -> Dict[str, str]:
+        """Saídas das etapas já concluídas do job, por etapa"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT stage, value FROM plan_action_checkpoints WHERE job_id = ?", (job_id,)
+            ).fetchall()
+        return {row["stage"]: row["value"] for row in rows}
+
+    def list_unfinished(self) -> List[str]:
+        """Ids dos jobs em background que não terminaram (na fila ou interrompidos durante a execução)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM plan_action_jobs WHERE background = 1 AND status IN (?, ?) ORDER BY created_at",
+                (JOB_QUEUED, JOB_RUNNING)
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def fail_interrupted(self, error: str, job_id: Optional[str] = None) -> int:
+        """
+        Marca como falha os jobs síncronos que não terminaram (cliente já desconectado), todos ou só
+        `job_id`; jobs em background não são alterados. Retorna quantos foram marcados.
+        """
+        query = ("UPDATE plan_action_jobs SET status = ?, error = ?, updated_at = ? "
+                 "WHERE background = 0 AND status IN (?, ?)")
+        params = [JOB_FAILED, error, time.time(), JOB_QUEUED, JOB_RUNNING]
+        if job_id is not None:
+            query += " AND id = ?"
+            params.append(job_id)
+        with self._lock, self._conn:
+            cursor = self._conn.execute(query, params)
+        return cursor.rowcount
+
+    def delete(self, job_id: str) -> Optional[str]:
+        """Remove o job e os seus checkpoints; retorna o caminho do DOCX (a ser apagado pelo chamador)"""
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT result_path FROM plan_action_jobs WHERE id = ?", (job_id,)).fetchone()
+            self._conn.execute("DELETE FROM plan_action_checkpoints WHERE job_id = ?", (job_id,))
+            self._conn.execute("DELETE FROM plan_action_jobs WHERE id = ?", (job_id,))
+        return row["result_path"] if row is not None else None
+
+    def purge_finished(self, older_than: float) -> List[str]:
+        """
+        Remove os jobs concluídos ou com falha sem atualização desde `older_than` (timestamp) e os
+        seus checkpoints.
+
+        Returns:
+            List[str]: Caminhos dos DOCX dos jobs removidos, a serem apagados pelo chamador
+        """
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT id, result_path FROM plan_action_jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (JOB_DONE, JOB_FAILED, older_than)
+            ).fetchall()
+            job_ids = [(row["id"],) for row in rows]
+            self._conn.executemany("DELETE FROM plan_action_checkpoints WHERE job_id = ?", job_ids)
+            self._conn.executemany("DELETE FROM plan_action_jobs WHERE id = ?", job_ids)
+        return [row["result_path"] for row in rows if row["result_path"]]
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["request"] = json.loads(job.pop("request_json"))
+        return job
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
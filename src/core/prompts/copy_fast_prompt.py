@@ -0,0 +1,74 @@
+from langchain_core.prompts import ChatPromptTemplate
+from src.core.prompts.prompt_builder_prompt import PROMPT_BUILDER_TEMPLATE
+from src.core.prompts.variable_suggester_prompt import VARIABLE_SUGGESTER_TEMPLATE
+from src.core.prompts.copywriter_prompt import COPYWRITER_TEMPLATE
+from src.core.prompts.prompt_builder_sms_prompt import PROMPT_BUILDER_SMS_TEMPLATE
+from src.core.prompts.variable_suggester_sms_prompt import VARIABLE_SUGGESTER_SMS_TEMPLATE
+from src.core.prompts.copywriter_sms_prompt import COPYWRITER_SMS_TEMPLATE
+
+# Referências usadas no lugar das saídas das etapas anteriores, que no modo rápido
+# são produzidas na mesma resposta
+_PROMPT_FORMATADO_REF = "(o prompt estruturado que você produziu na ETAPA 1)"
+_VARIAVEIS_SUGERIDAS_REF = "(as variáveis que você selecionou na ETAPA 2)"
+
+
+def _system_text(template: ChatPromptTemplate) -> str:
+    return template.messages[0].prompt.template
+
+
+def _human_text(template: ChatPromptTemplate) -> str:
+    return template.messages[1].prompt.template
+
+
+def build_copy_fast_template(prompt_builder: ChatPromptTemplate,
+                             variable_suggester: ChatPromptTemplate,
+                             copywriter: ChatPromptTemplate,
+                             canal: str) -> ChatPromptTemplate:
+    """
+    Funde os prompts das três etapas do workflow de copy em um único prompt.
+
+    Os textos originais são reaproveitados sem alteração; apenas as referências às saídas das
+    etapas anteriores são trocadas por instruções, já que tudo é gerado em uma só chamada.
+    """
+    system = f"""Você executa, em uma única resposta, as três etapas do pipeline de copy para {canal} da Zoppy, assumindo um papel por etapa.
+
+## ETAPA 1 — ESTRUTURAÇÃO DO PROMPT
+{_system_text(prompt_builder)}
+
+## ETAPA 2 — SUGESTÃO DE VARIÁVEIS
+{_system_text(variable_suggester)}
+
+## ETAPA 3 — COPYWRITING
+{_system_text(copywriter)}
+
+Preencha cada campo da resposta estruturada com o resultado da etapa correspondente."""
+
+    human = f"""## ETAPA 1 — ESTRUTURAÇÃO DO PROMPT (campo prompt_formatado)
+{_human_text(prompt_builder)}
+
+## ETAPA 2 — SUGESTÃO DE VARIÁVEIS (campo variaveis_sugeridas)
+{_human_text(variable_suggester).replace("{prompt_formatado}", _PROMPT_FORMATADO_REF)}
+
+## ETAPA 3 — COPYWRITING (campo copy_text)
+{_human_text(copywriter).replace("{prompt_formatado}", _PROMPT_FORMATADO_REF).replace("{variaveis_sugeridas}", _VARIAVEIS_SUGERIDAS_REF)}"""
+
+    # O system prompt não tem variáveis: as chaves literais precisam ser escapadas
+    return ChatPromptTemplate.from_messages([
+        ("system", system.replace("{", "{{").replace("}", "}}")),
+        ("human", human)
+    ])
+
+
+COPY_FAST_TEMPLATE = build_copy_fast_template(
+    PROMPT_BUILDER_TEMPLATE,
+    VARIABLE_SUGGESTER_TEMPLATE,
+    COPYWRITER_TEMPLATE,
+    canal="WhatsApp"
+)
+
+COPY_FAST_SMS_TEMPLATE = build_copy_fast_template(
+    PROMPT_BUILDER_SMS_TEMPLATE,
+    VARIABLE_SUGGESTER_SMS_TEMPLATE,
+    COPYWRITER_SMS_TEMPLATE,
+    canal="SMS"
+)
@@ -1,4 +1,4 @@
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.prompts import ChatPromptTemplate
 
 COPYWRITER_TEMPLATE = ChatPromptTemplate.from_messages([
     ("system", """Você é um Especialista em copywriting para WhatsApp com foco em conversão.
@@ -32,6 +32,5 @@ REGRAS:
 - Inclua apenas as variáveis sugeridas pelo agente
 - O único link que você pode usar é o [store_url]
 
-Sua copy final deve ser persuasiva, curta e eficaz, focada em gerar conversão e engajamento."""),
-    MessagesPlaceholder(variable_name="agent_scratchpad")
+Sua copy final deve ser persuasiva, curta e eficaz, focada em gerar conversão e engajamento.""")
 ]) 
\ No newline at end of file
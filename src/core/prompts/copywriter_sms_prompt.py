@@ -1,4 +1,4 @@
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.prompts import ChatPromptTemplate
 
 COPYWRITER_SMS_TEMPLATE = ChatPromptTemplate.from_messages([
     ("system", """Você é um Especialista em copywriting para SMS com foco em conversão.
@@ -32,6 +32,5 @@ REGRAS:
 - Se incluir link, utilize [store_url]
 - Para códigos de desconto, destaque com aspas, ex: use "DESCONTO10"
 
-Sua copy final deve ser direta, persuasiva e eficaz, adequada às limitações do formato SMS."""),
-    MessagesPlaceholder(variable_name="agent_scratchpad")
+Sua copy final deve ser direta, persuasiva e eficaz, adequada às limitações do formato SMS.""")
 ]) 
\ No newline at end of file
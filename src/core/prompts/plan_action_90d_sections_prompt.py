@@ -0,0 +1,36 @@
+PLAN_OUTLINE_INSTRUCTIONS = """
+Antes do plano completo, gere apenas o ESQUELETO do plano de ação, que será usado como referência comum para redigir cada seção em paralelo. Seja breve (no máximo 700 tokens) e use exatamente esta estrutura:
+
+## DIAGNÓSTICO RESUMIDO
+[3 a 5 tópicos curtos com o perfil do negócio, desafios e objetivos para os 90 dias]
+
+## DATAS DA JANELA
+[Uma linha por data comemorativa relevante dentro dos 90 dias: DD/MM - Evento - Fase (1, 2 ou 3) - prazo de preparação]
+
+## FASE 1 (DIAS 1-30)
+- Objetivo: [uma frase]
+- Ações: [lista numerada de títulos curtos de ações, com prazo e dependências técnicas]
+
+## FASE 2 (DIAS 31-60)
+- Objetivo: [uma frase]
+- Ações: [lista numerada de títulos curtos de ações, com prazo e dependências técnicas]
+
+## FASE 3 (DIAS 61-90)
+- Objetivo: [uma frase]
+- Ações: [lista numerada de títulos curtos de ações, com prazo e dependências técnicas]
+
+Respeite as restrições do status do cliente, o plano contratado e a sequência obrigatória de configurações antes de campanhas.
+"""
+
+PLAN_SECTION_INSTRUCTIONS = """
+Esqueleto do plano, já definido e compartilhado por todas as seções:
+{outline}
+
+O plano está sendo redigido em partes paralelas a partir deste esqueleto. Redija SOMENTE {section}, seguindo exatamente a estrutura correspondente do modelo do plano de ação.
+
+Regras:
+- Mantenha os objetivos, ações, prazos e datas do esqueleto; detalhe-os, sem contradizê-los
+- Não escreva as demais seções nem textos de introdução ou conclusão
+- Não use blocos de código nem separadores (---) no início ou no fim
+- Comece diretamente pelo título da seção
+"""
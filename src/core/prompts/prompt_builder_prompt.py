@@ -1,4 +1,4 @@
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.prompts import ChatPromptTemplate
 
 PROMPT_BUILDER_TEMPLATE = ChatPromptTemplate.from_messages([
     ("system", """Você é um Especialista em Estruturação de Prompts para Marketing Digital, com foco em campanhas de WhatsApp que combinem objetivos comerciais com comunicação persuasiva.
@@ -15,6 +15,5 @@ Segmento da loja: {segmento_loja}
 
 Seu prompt deve orientar a criação de uma mensagem de WhatsApp que será disparada para clientes de uma loja virtual do segmento especificado, seguindo as diretrizes fornecidas.
 
-O output final deve ser apenas o prompt estruturado, sem a copy final, e você não deve sugerir variáveis dinâmicas."""),
-    MessagesPlaceholder(variable_name="agent_scratchpad")
+O output final deve ser apenas o prompt estruturado, sem a copy final, e você não deve sugerir variáveis dinâmicas.""")
 ]) 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.prompts import ChatPromptTemplate
 
 PROMPT_BUILDER_SMS_TEMPLATE = ChatPromptTemplate.from_messages([
     ("system", """Você é um Especialista em Estruturação de Prompts para Marketing Digital, com foco em campanhas de SMS que combinem objetivos comerciais com comunicação persuasiva.
@@ -17,6 +17,5 @@ Seu prompt deve orientar a criação de uma mensagem de SMS que será disparada
 
 Lembre-se que SMS tem limitações de caracteres, então o prompt deve considerar a necessidade de mensagens curtas e diretas.
 
-O output final deve ser apenas o prompt estruturado, sem a copy final, e você não deve sugerir variáveis dinâmicas."""),
-    MessagesPlaceholder(variable_name="agent_scratchpad")
+O output final deve ser apenas o prompt estruturado, sem a copy final, e você não deve sugerir variáveis dinâmicas.""")
 ]) 
\ No newline at end of file
@@ -0,0 +1,42 @@
+TRANSCRIPT_CHUNK_PROMPT = """
+# FUNÇÃO: RESUMO DE TRECHO DE TRANSCRIÇÃO
+
+Você recebe um trecho de uma transcrição de reunião entre a Zoppy e um cliente. O resumo será usado, junto com os resumos dos demais trechos, para montar o status do cliente.
+
+## PRESERVE SEMPRE, COM AS PALAVRAS DO CLIENTE QUANDO POSSÍVEL:
+- Restrições técnicas ou operacionais e recusas explícitas (ex.: "não quer usar a API oficial do WhatsApp", "não quer Giftback")
+- Preferências de canais, horários, tom de comunicação e tipos de campanha
+- Ferramentas, plataformas e integrações citadas (e-commerce, ERP, CRM, canais)
+- Números: faturamento, ticket médio, base de clientes, metas, prazos, equipe
+- Datas, eventos e compromissos combinados
+- Desafios do negócio e sinais de maturidade digital
+
+## REGRAS:
+- Escreva em tópicos curtos, sem introdução nem conclusão
+- Não invente informações nem complete lacunas; se o trecho não tiver nada relevante, responda apenas "Sem informações relevantes"
+- Ignore cumprimentos, conversas paralelas e repetições
+"""
+
+TRANSCRIPT_MEETING_REDUCE_PROMPT = """
+# FUNÇÃO: CONSOLIDAÇÃO DOS RESUMOS DE UMA REUNIÃO
+
+Você recebe os resumos, em ordem, dos trechos de uma mesma reunião entre a Zoppy e um cliente. Consolide-os em um único resumo da reunião.
+
+## REGRAS:
+- Remova duplicidades, mas mantenha todas as restrições, recusas explícitas, preferências, ferramentas, números e datas
+- Quando houver informações conflitantes, mantenha a mais recente (trechos posteriores) e sinalize a mudança
+- Organize em tópicos agrupados por: restrições, preferências, ferramentas e integrações, números e metas, desafios, próximos passos
+- Não invente informações
+"""
+
+TRANSCRIPT_CROSS_MEETING_PROMPT = """
+# FUNÇÃO: CONSOLIDAÇÃO DAS REUNIÕES DO CLIENTE
+
+Você recebe os resumos das reuniões comercial, de onboarding e de discovery de um cliente da Zoppy. Os resumos excedem o espaço disponível para a análise final e precisam ser condensados.
+
+## REGRAS:
+- Mantenha uma seção por reunião, com o mesmo título recebido
+- Informações repetidas entre reuniões aparecem apenas uma vez, na reunião mais recente em que foram citadas
+- Nunca remova restrições, recusas explícitas, ferramentas ou números
+- Não invente informações
+"""
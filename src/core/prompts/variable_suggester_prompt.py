@@ -1,4 +1,4 @@
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.prompts import ChatPromptTemplate
 
 VARIABLE_SUGGESTER_TEMPLATE = ChatPromptTemplate.from_messages([
     ("system", """Você é um Especialista em personalização de mensagens com variáveis Zoppy.
@@ -39,6 +39,5 @@ EMPRESA
 
 Liste apenas as variáveis mais relevantes para este contexto, com breve justificativa para cada escolha.
 Você só pode sugerir variáveis disponíveis na lista acima.
-Em hipótese alguma, você deve criar variáveis novas ou criar exemplos de copys."""),
-    MessagesPlaceholder(variable_name="agent_scratchpad")
+Em hipótese alguma, você deve criar variáveis novas ou criar exemplos de copys.""")
 ]) 
\ No newline at end of file
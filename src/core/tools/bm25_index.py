@@ -0,0 +1,134 @@
+import json
+import math
+import os
+import re
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from langchain_core.documents import Document
+
+BM25_FILENAME = "bm25_index.json"
+BM25_VERSION = 1
+
+_TOKEN = re.compile(r"\w+")
+
+# Palavras muito frequentes em português que não ajudam a diferenciar os chunks
+STOPWORDS = frozenset("""
+a ao aos as com como da das de do dos e em entre era essa esse esta este eu foi ha isso isto ja
+la mais mas me mesmo muito na nao nas nem no nos o os ou para pela pelas pelo pelos por qual
+quando que se sem ser seu seus sua suas so tambem te tem um uma umas uns voce
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Minúsculas, sem acentos e sem stopwords: "Intermediário" e "intermediario" viram o mesmo termo"""
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    normalized = "".join(char for char in normalized if not unicodedata.combining(char))
+    return [token for token in _TOKEN.findall(normalized) if len(token) > 1 and token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Índice invertido BM25 em Python puro, persistido em JSON ao lado do banco vetorial.
+
+    Usa os mesmos ids de chunk do Chroma, então é atualizado de forma incremental pelo indexador
+    (add/remove) e permite combinar os resultados léxicos com os da busca vetorial.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        # termo -> {id do chunk: frequência do termo no chunk}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self.documents: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add(self, doc_id: str, text: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        if doc_id in self.doc_lengths:
+            self.remove(doc_id)
+        terms = tokenize(text)
+        for term, frequency in Counter(terms).items():
+            self.postings.setdefault(term, {})[doc_id] = frequency
+        self.doc_lengths[doc_id] = len(terms)
+        self.documents[doc_id] = (text, metadata or {})
+        self._total_length += len(terms)
+
+    def add_documents(self, ids: Iterable[str], documents: Iterable[Document]) -> None:
+        for doc_id, document in zip(ids, documents):
+            self.add(doc_id, document.page_content, document.metadata)
+
+    def remove(self, doc_id: str) -> None:
+        length = self.doc_lengths.pop(doc_id, None)
+        if length is None:
+            return
+        text, _ = self.documents.pop(doc_id)
+        for term in set(tokenize(text)):
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self.postings[term]
+        self._total_length -= length
+
+    def remove_many(self, ids: Iterable[str]) -> None:
+        for doc_id in ids:
+            self.remove(doc_id)
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Retorna até `k` pares (id do chunk, score BM25) em ordem decrescente de score"""
+        total_docs = len(self.doc_lengths)
+        if total_docs == 0:
+            return []
+        average_length = self._total_length / total_docs or 1.0
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+    def get_document(self, doc_id: str) -> Optional[Document]:
+        entry = self.documents.get(doc_id)
+        if entry is None:
+            return None
+        return Document(page_content=entry[0], metadata=dict(entry[1]))
+
+    def save(self, path: str) -> None:
+        """Grava o índice de forma atômica (arquivo temporário + rename)"""
+        data = {
+            "version": BM25_VERSION,
+            "k1": self.k1,
+            "b": self.b,
+            "postings": self.postings,
+            "doc_lengths": self.doc_lengths,
+            "documents": {doc_id: {"text": text, "metadata": metadata}
+                          for doc_id, (text, metadata) in self.documents.items()},
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["BM25Index"]:
+        """Lê o índice salvo (None se não existir ou for de outra versão)"""
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != BM25_VERSION:
+            return None
+        index = cls(k1=data["k1"], b=data["b"])
+        index.postings = data["postings"]
+        index.doc_lengths = data["doc_lengths"]
+        index.documents = {doc_id: (entry["text"], entry["metadata"]) for doc_id, entry in data["documents"].items()}
+        index._total_length = sum(index.doc_lengths.values())
+        return index
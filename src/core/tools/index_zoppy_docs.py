@@ -1,9 +1,15 @@
 # src/core/tools/index_zoppy_docs.py
 import os
+import asyncio
 import glob
+import hashlib
+import json
 import logging
 import random
-from typing import List, Optional
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
 from langchain_community.document_loaders import (
     DirectoryLoader, 
     TextLoader, 
@@ -15,19 +21,102 @@ from langchain_community.document_loaders import (
 )
 
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings
 from langchain_chroma import Chroma
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from src.config.settings import get_settings
+from src.core.tools.bm25_index import BM25_FILENAME, BM25Index
+from src.core.utils.openai_clients import close_async_http_client, create_embeddings
+from src.core.utils.resilience import with_resilience
+from src.core.utils.tokens import count_tokens
 
 logger = logging.getLogger(__name__)
 
+MANIFEST_FILENAME = "index_manifest.json"
+MANIFEST_VERSION = 1
+
+# Mapeamento de extensões de arquivo para loaders
+LOADERS_MAP = {
+    ".txt": TextLoader,
+    ".md": TextLoader,
+    ".pdf": PyPDFLoader,
+    ".csv": CSVLoader,
+    ".docx": Docx2txtLoader
+}
+
+
+def file_sha256(file_path: str) -> str:
+    """Hash SHA-256 do conteúdo de um arquivo"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_id(file_key: str, file_hash: str, index: int) -> str:
+    """Id determinístico do chunk: mesmo arquivo com o mesmo conteúdo gera sempre os mesmos ids"""
+    return hashlib.sha256(f"{file_key}:{file_hash}:{index}".encode("utf-8")).hexdigest()
+
+
+def load_file(file_path: str) -> List[Document]:
+    """Carrega um único arquivo com o loader correspondente à sua extensão"""
+    loader_cls = LOADERS_MAP[os.path.splitext(file_path)[1].lower()]
+    return loader_cls(file_path).load()
+
+
+def split_into_chunks(documents: List[Document], chunk_size: int, chunk_overlap: int) -> List[Document]:
+    """Divide documentos em chunks para indexação"""
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+    )
+    return text_splitter.split_documents(documents)
+
+
+def load_and_split(file_path: str, chunk_size: int, chunk_overlap: int) -> List[Document]:
+    """Carrega e divide um arquivo. Função de módulo para poder rodar nos processos do pool"""
+    return split_into_chunks(load_file(file_path), chunk_size, chunk_overlap)
+
+
+@dataclass
+class IndexDiff:
+    """Resumo de uma execução da indexação incremental"""
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    chunks_added: int = 0
+    chunks_deleted: int = 0
+    rebuilt: bool = False
+    chunks_embedded: int = 0
+    tokens_embedded: int = 0
+    embed_seconds: float = 0.0
+
+    def summary(self) -> str:
+        throughput = ""
+        if self.embed_seconds > 0:
+            throughput = (
+                f" | embeddings: {self.chunks_embedded / self.embed_seconds:.1f} chunks/s, "
+                f"{self.tokens_embedded / self.embed_seconds:.0f} tokens/s"
+            )
+        return (
+            f"{len(self.added)} novos, {len(self.changed)} alterados, {len(self.removed)} removidos, "
+            f"{len(self.unchanged)} inalterados, {len(self.failed)} com erro | "
+            f"chunks: +{self.chunks_added} -{self.chunks_deleted}"
+            + throughput
+            + (" | índice reconstruído" if self.rebuilt else "")
+        )
+
+
 class ZoppyDocsIndexer:
     """
     Classe para indexar documentos da Zoppy e criar um banco de dados vetorial
     para consulta pelo agente de plano de ação de 90 dias.
     """
-    def __init__(self, vector_store_path: Optional[str] = None):
+    def __init__(self, vector_store_path: Optional[str] = None, workers: Optional[int] = None,
+                 embed_batch_size: Optional[int] = None, embed_concurrency: Optional[int] = None):
         self.settings = get_settings()
         
         # Configura o seed para reprodutibilidade
@@ -37,6 +126,7 @@ class ZoppyDocsIndexer:
         
         # Obtém o caminho raiz do projeto (2 níveis acima do arquivo atual)
         project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
+        self.project_root = project_root
         
         self.docs_directories = [
             # Diretórios com documentação da Zoppy a serem indexados
@@ -54,57 +144,59 @@ class ZoppyDocsIndexer:
         
         self.chunk_size = 1000
         self.chunk_overlap = 200
+
+        # Processos usados para carregar e dividir arquivos (1 = sem pool, no próprio processo)
+        self.workers = workers or self.settings.INDEX_WORKERS or os.cpu_count() or 1
+
+        # Envio dos chunks para embedding: tamanho do lote e lotes simultâneos
+        self.embed_batch_size = embed_batch_size or self.settings.INDEX_EMBED_BATCH_SIZE
+        self.embed_concurrency = embed_concurrency or self.settings.INDEX_EMBED_CONCURRENCY
         
         logger.info(f"Project root: {project_root}")
         logger.info(f"Diretórios de documentos configurados: {self.docs_directories}")
         logger.info(f"Vector DB path: {self.vector_db_path}")
 
-    def load_documents(self) -> List[Document]:
+    def discover_files(self) -> Dict[str, str]:
         """
-        Carrega documentos de múltiplos diretórios e formatos.
-        
+        Lista os arquivos suportados nos diretórios de documentação.
+
         Returns:
-            List[Document]: Lista de documentos carregados
+            Dict[str, str]: Chave do arquivo no manifesto (caminho relativo ao projeto) -> caminho absoluto
         """
-        documents = []
-        
-        # Mapeamento de extensões de arquivo para loaders
-        loaders_map = {
-            ".txt": TextLoader,
-            ".md": TextLoader,
-            ".pdf": PyPDFLoader,
-            ".csv": CSVLoader,
-            ".docx": Docx2txtLoader
-        }
-        
+        files: Dict[str, str] = {}
         for directory in self.docs_directories:
             logger.info(f"Verificando diretório: {directory}")
             if not os.path.exists(directory):
                 logger.warning(f"Diretório {directory} não encontrado. Caminho atual: {os.getcwd()}")
                 continue
-                
-            logger.info(f"Carregando documentos do diretório: {directory}")
-            
-            # Carregar documentos de cada tipo de arquivo
-            for ext, loader_cls in loaders_map.items():
+
+            for ext in LOADERS_MAP:
                 file_pattern = os.path.join(directory, f"**/*{ext}")
-                logger.info(f"Buscando arquivos com padrão: {file_pattern}")
-                files = glob.glob(file_pattern, recursive=True)
-                
-                if not files:
-                    logger.info(f"Nenhum arquivo {ext} encontrado em {directory}")
-                    continue
-                    
-                logger.info(f"Arquivos {ext} encontrados: {files}")
-                for file_path in files:
-                    try:
-                        loader = loader_cls(file_path)
-                        docs = loader.load()
-                        logger.info(f"Carregado: {file_path} - {len(docs)} documentos")
-                        documents.extend(docs)
-                    except Exception as e:
-                        logger.error(f"Erro ao carregar {file_path}: {str(e)}")
-                        logger.exception(e)
+                for file_path in glob.glob(file_pattern, recursive=True):
+                    files[os.path.relpath(file_path, self.project_root)] = file_path
+        logger.info(f"Arquivos encontrados: {len(files)}")
+        return dict(sorted(files.items()))
+
+    def load_file(self, file_path: str) -> List[Document]:
+        """Carrega um único arquivo com o loader correspondente à sua extensão"""
+        docs = load_file(file_path)
+        logger.info(f"Carregado: {file_path} - {len(docs)} documentos")
+        return docs
+
+    def load_documents(self) -> List[Document]:
+        """
+        Carrega documentos de múltiplos diretórios e formatos.
+        
+        Returns:
+            List[Document]: Lista de documentos carregados
+        """
+        documents = []
+        for file_path in self.discover_files().values():
+            try:
+                documents.extend(self.load_file(file_path))
+            except Exception as e:
+                logger.error(f"Erro ao carregar {file_path}: {str(e)}")
+                logger.exception(e)
         
         if not documents:
             logger.warning("Nenhum documento foi carregado! Verifique se os arquivos existem nos diretórios configurados.")
@@ -123,66 +215,315 @@ class ZoppyDocsIndexer:
         Returns:
             List[Document]: Lista de documentos divididos
         """
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-        )
-        
-        split_docs = text_splitter.split_documents(documents)
+        split_docs = split_into_chunks(documents, self.chunk_size, self.chunk_overlap)
         logger.info(f"Documentos divididos em {len(split_docs)} chunks")
         return split_docs
 
-    def create_vector_db(self, documents: List[Document]) -> Chroma:
+    def iter_load_and_split(self, files: Dict[str, str]) -> Iterator[Tuple[str, List[Document], Optional[Exception]]]:
         """
-        Cria ou atualiza o banco de dados vetorial com os documentos.
-        
+        Carrega e divide os arquivos em paralelo num pool de processos.
+
+        Os resultados são entregues na ordem em que terminam. No máximo `2 * workers` arquivos ficam
+        em processamento ao mesmo tempo, o que limita a memória com corpora grandes. Um erro em um
+        arquivo não interrompe os demais: é devolvido junto com a chave do arquivo.
+
         Args:
-            documents: Lista de documentos a serem indexados
-            
+            files: Chave do arquivo no manifesto -> caminho absoluto
+
+        Yields:
+            Tuple[str, List[Document], Optional[Exception]]: Chave do arquivo, chunks e erro (se houver)
+        """
+        total = len(files)
+        if total == 0:
+            return
+        pending = iter(files.items())
+        start = time.perf_counter()
+        done = 0
+
+        def report(file_key: str, chunks: List[Document], error: Optional[Exception]) -> None:
+            rate = done / max(time.perf_counter() - start, 1e-9)
+            status = f"erro: {error}" if error is not None else f"{len(chunks)} chunks"
+            logger.info(f"[{done}/{total}] {file_key} - {status} ({rate:.1f} arquivos/s)")
+
+        if self.workers <= 1:
+            for file_key, file_path in pending:
+                try:
+                    chunks, error = load_and_split(file_path, self.chunk_size, self.chunk_overlap), None
+                except Exception as e:
+                    chunks, error = [], e
+                done += 1
+                report(file_key, chunks, error)
+                yield file_key, chunks, error
+            return
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            in_flight: Dict[Future, str] = {}
+
+            def submit_next() -> None:
+                item = next(pending, None)
+                if item is not None:
+                    in_flight[pool.submit(load_and_split, item[1], self.chunk_size, self.chunk_overlap)] = item[0]
+
+            for _ in range(self.workers * 2):
+                submit_next()
+            while in_flight:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    file_key = in_flight.pop(future)
+                    try:
+                        chunks, error = future.result(), None
+                    except Exception as e:
+                        chunks, error = [], e
+                    done += 1
+                    report(file_key, chunks, error)
+                    submit_next()
+                    yield file_key, chunks, error
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.vector_db_path, MANIFEST_FILENAME)
+
+    def load_manifest(self) -> Optional[Dict]:
+        """Lê o manifesto da última indexação (None se não existir ou for de outra versão)"""
+        if not os.path.exists(self.manifest_path):
+            return None
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") != MANIFEST_VERSION:
+            return None
+        return manifest
+
+    def save_manifest(self, manifest: Dict) -> None:
+        """Grava o manifesto de forma atômica (arquivo temporário + rename)"""
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    @property
+    def bm25_path(self) -> str:
+        return os.path.join(self.vector_db_path, BM25_FILENAME)
+
+    def load_bm25(self, vectordb: Chroma, manifest: Dict) -> BM25Index:
+        """
+        Carrega o índice BM25 e confere se cobre exatamente os chunks do manifesto. Se estiver
+        ausente ou dessincronizado (ex.: execução interrompida), é reconstruído a partir do Chroma,
+        sem novas chamadas de embedding.
+        """
+        expected = {doc_id for entry in manifest["files"].values() for doc_id in entry["chunk_ids"]}
+        bm25 = BM25Index.load(self.bm25_path)
+        if bm25 is not None and set(bm25.doc_lengths) == expected:
+            return bm25
+
+        logger.info("Reconstruindo o índice BM25 a partir do banco vetorial")
+        bm25 = BM25Index()
+        if expected:
+            result = vectordb._collection.get(ids=sorted(expected), include=["documents", "metadatas"])
+            metadatas = result["metadatas"] or [None] * len(result["ids"])
+            for doc_id, text, metadata in zip(result["ids"], result["documents"], metadatas):
+                bm25.add(doc_id, text, metadata)
+        bm25.save(self.bm25_path)
+        return bm25
+
+    def _new_manifest(self) -> Dict:
+        return {
+            "version": MANIFEST_VERSION,
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "files": {}
+        }
+
+    def open_vector_db(self) -> Chroma:
+        """
+        Abre (ou cria) o banco de dados vetorial persistido.
+        
         Returns:
             Chroma: Instância do banco de dados vetorial
         """
-        logger.info(f"Criando banco de dados vetorial em: {self.vector_db_path}")
-        
         # Criar diretório para o banco vetorial se não existir
         os.makedirs(self.vector_db_path, exist_ok=True)
-        
-        # Inicializar embeddings da OpenAI
-        embeddings = OpenAIEmbeddings(api_key=self.settings.OPENAI_API_KEY)
-        
-        # Criar ou atualizar o banco vetorial
-        vectordb = Chroma.from_documents(
-            documents=documents,
-            embedding=embeddings,
-            persist_directory=self.vector_db_path
+        # O cache de embeddings é o checkpoint dos lotes já processados: sempre ligado na indexação
+        return Chroma(
+            persist_directory=self.vector_db_path,
+            embedding_function=create_embeddings(use_cache=True, max_retries=0)
         )
-        
-        logger.info(f"Banco de dados vetorial criado com {len(documents)} documentos")
-        
-        return vectordb
 
-    def index_documents(self) -> None:
+    async def embed_texts(self, embeddings: Embeddings, texts: List[str], diff: IndexDiff) -> None:
         """
-        Processo completo de indexação: carrega, divide e cria o banco vetorial.
+        Gera os embeddings dos textos em lotes de `embed_batch_size`, com até `embed_concurrency`
+        lotes simultâneos, passando pelo rate limiter (RPM/TPM) do modelo de embeddings, separado dos
+        modelos de chat, e pelo retry de `with_resilience`.
+
+        Cada lote concluído é gravado no cache de embeddings, que funciona como checkpoint: se a
+        execução for interrompida, a próxima só envia à API os lotes que ainda não foram processados.
         """
+        model = getattr(getattr(embeddings, "underlying", embeddings), "model", "embeddings")
+        batches = [texts[i:i + self.embed_batch_size] for i in range(0, len(texts), self.embed_batch_size)]
+        semaphore = asyncio.Semaphore(self.embed_concurrency)
+        start = time.perf_counter()
+        completed = 0
+
+        async def embed_batch(batch: List[str]) -> None:
+            nonlocal completed
+            tokens = sum(count_tokens(text) for text in batch)
+            async with semaphore:
+                await with_resilience(lambda: embeddings.aembed_documents(batch), model=model, estimated_tokens=tokens)
+            completed += 1
+            diff.chunks_embedded += len(batch)
+            diff.tokens_embedded += tokens
+            elapsed = time.perf_counter() - start
+            logger.info(
+                f"Embeddings: lote {completed}/{len(batches)} - "
+                f"{diff.chunks_embedded / max(diff.embed_seconds + elapsed, 1e-9):.1f} chunks/s, "
+                f"{diff.tokens_embedded / max(diff.embed_seconds + elapsed, 1e-9):.0f} tokens/s"
+            )
+
         try:
-            # Carregar documentos
-            documents = self.load_documents()
-            if not documents:
-                logger.warning("Nenhum documento encontrado para indexação")
-                return
-            
-            # Dividir documentos em chunks
-            split_documents = self.split_documents(documents)
-            
-            # Criar banco de dados vetorial
-            self.create_vector_db(split_documents)
-            
-            logger.info("Indexação de documentos concluída com sucesso")
-            
+            await asyncio.gather(*(embed_batch(batch) for batch in batches))
+        finally:
+            diff.embed_seconds += time.perf_counter() - start
+
+    def _write_files(self, loop: asyncio.AbstractEventLoop, vectordb: Chroma, bm25: BM25Index,
+                     files: List[Tuple[str, List[Document]]], hashes: Dict[str, str], manifest: Dict,
+                     diff: IndexDiff) -> None:
+        """Embeda em lotes os chunks de um grupo de arquivos e grava cada arquivo no Chroma, no BM25 e no manifesto"""
+        indexed: Dict[str, Dict] = manifest["files"]
+        try:
+            texts = [chunk.page_content for _, chunks in files for chunk in chunks]
+            if texts:
+                loop.run_until_complete(self.embed_texts(vectordb.embeddings, texts, diff))
+        except Exception as e:
+            # Os lotes concluídos já estão no cache; os arquivos do grupo são tentados de novo na próxima execução
+            logger.error(f"Erro ao gerar embeddings: {str(e)}")
+            logger.exception(e)
+            diff.failed.extend(file_key for file_key, _ in files)
+            return
+
+        for file_key, chunks in files:
+            try:
+                previous = indexed.get(file_key)
+                ids = [chunk_id(file_key, hashes[file_key], i) for i in range(len(chunks))]
+                # Remove a versão anterior só depois de carregar a nova com sucesso
+                if previous is not None and previous["chunk_ids"]:
+                    vectordb.delete(ids=previous["chunk_ids"])
+                    bm25.remove_many(previous["chunk_ids"])
+                    diff.chunks_deleted += len(previous["chunk_ids"])
+                if chunks:
+                    # Os embeddings já estão no cache: aqui não há chamadas à API
+                    vectordb.add_documents(chunks, ids=ids)
+                    bm25.add_documents(ids, chunks)
+                diff.chunks_added += len(chunks)
+                (diff.changed if previous is not None else diff.added).append(file_key)
+
+                # Manifesto gravado a cada arquivo: uma execução interrompida retoma do ponto em que parou
+                indexed[file_key] = {"sha256": hashes[file_key], "chunk_ids": ids}
+                self.save_manifest(manifest)
+            except Exception as e:
+                logger.error(f"Erro ao indexar {file_key}: {str(e)}")
+                logger.exception(e)
+                diff.failed.append(file_key)
+        bm25.save(self.bm25_path)
+
+    def index_documents(self, rebuild: bool = False) -> IndexDiff:
+        """
+        Indexação incremental e idempotente.
+
+        Compara o hash de cada arquivo com o manifesto da última execução: apenas arquivos novos ou
+        alterados são carregados, divididos e enviados para embedding; os chunks de arquivos alterados
+        ou removidos são apagados do Chroma. Os ids dos chunks são determinísticos, então repetir a
+        execução não duplica chunks.
+
+        O índice é reconstruído do zero quando `rebuild` é informado, quando a coleção tem chunks mas
+        não há manifesto (índice criado pela versão antiga, com duplicatas) ou quando o chunking mudou.
+
+        O índice BM25 da busca híbrida é mantido junto, com os mesmos ids de chunk do Chroma.
+
+        Args:
+            rebuild: Apaga a coleção e reindexa todos os arquivos
+
+        Returns:
+            IndexDiff: Resumo das alterações aplicadas
+        """
+        # Um único event loop para todos os grupos de arquivos: o cliente HTTP assíncrono compartilhado
+        # fica preso ao loop em que abriu as conexões, então um asyncio.run por grupo falharia a partir
+        # do segundo ("Event loop is closed") e só avançaria depois dos retries
+        loop = asyncio.new_event_loop()
+        try:
+            diff = IndexDiff()
+            vectordb = self.open_vector_db()
+            manifest = self.load_manifest()
+
+            chunking_changed = manifest is not None and (
+                manifest.get("chunk_size") != self.chunk_size or manifest.get("chunk_overlap") != self.chunk_overlap
+            )
+            if rebuild or chunking_changed or (manifest is None and vectordb._collection.count() > 0):
+                logger.info("Reconstruindo o banco vetorial do zero")
+                vectordb.reset_collection()
+                manifest = None
+                diff.rebuilt = True
+            if manifest is None:
+                manifest = self._new_manifest()
+                self.save_manifest(manifest)
+
+            indexed: Dict[str, Dict] = manifest["files"]
+            bm25 = self.load_bm25(vectordb, manifest)
+            current = self.discover_files()
+
+            for file_key in sorted(set(indexed) - set(current)):
+                chunk_ids = indexed[file_key]["chunk_ids"]
+                if chunk_ids:
+                    vectordb.delete(ids=chunk_ids)
+                    bm25.remove_many(chunk_ids)
+                diff.chunks_deleted += len(chunk_ids)
+                diff.removed.append(file_key)
+                del indexed[file_key]
+                self.save_manifest(manifest)
+            if diff.removed:
+                bm25.save(self.bm25_path)
+
+            # Hash de todos os arquivos (barato) para decidir o que precisa ser reprocessado
+            to_process: Dict[str, str] = {}
+            hashes: Dict[str, str] = {}
+            for file_key, file_path in current.items():
+                try:
+                    hashes[file_key] = file_sha256(file_path)
+                except OSError as e:
+                    logger.error(f"Erro ao ler {file_path}: {str(e)}")
+                    diff.failed.append(file_key)
+                    continue
+                previous = indexed.get(file_key)
+                if previous is not None and previous["sha256"] == hashes[file_key]:
+                    diff.unchanged.append(file_key)
+                else:
+                    to_process[file_key] = file_path
+
+            # Carregamento e divisão em paralelo; embeddings em lotes e escrita no Chroma neste processo.
+            # Os arquivos são agrupados até somar o suficiente para ocupar todos os lotes simultâneos.
+            window: List[Tuple[str, List[Document]]] = []
+            window_chunks = 0
+            for file_key, chunks, error in self.iter_load_and_split(to_process):
+                if error is not None:
+                    # Mantém os chunks anteriores do arquivo; ele será tentado de novo na próxima execução
+                    logger.error(f"Erro ao indexar {to_process[file_key]}: {str(error)}")
+                    diff.failed.append(file_key)
+                    continue
+                window.append((file_key, chunks))
+                window_chunks += len(chunks)
+                if window_chunks >= self.embed_batch_size * self.embed_concurrency:
+                    self._write_files(loop, vectordb, bm25, window, hashes, manifest, diff)
+                    window, window_chunks = [], 0
+            if window:
+                self._write_files(loop, vectordb, bm25, window, hashes, manifest, diff)
+
+            logger.info(f"Indexação de documentos concluída: {diff.summary()}")
+            return diff
+
         except Exception as e:
             logger.error(f"Erro durante a indexação: {str(e)}")
             raise
+        finally:
+            loop.run_until_complete(close_async_http_client())
+            loop.close()
 
 def main():
     """Função principal para executar a indexação via linha de comando"""
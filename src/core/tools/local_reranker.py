@@ -0,0 +1,178 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from langchain_chroma import Chroma
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from src.core.tools.bm25_index import BM25Index
+from src.core.utils.tokens import count_tokens, truncate_to_tokens
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """
+    Combina rankings (ex.: vetorial e BM25) pela Reciprocal Rank Fusion: score = Σ 1 / (k + posição).
+
+    Só usa as posições, então não depende da escala dos scores de cada busca.
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for position, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + position)
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+
+def rerank_documents(query_embedding: Sequence[float],
+                     candidates: List[Tuple[Document, Sequence[float]]],
+                     top_n: int = 3,
+                     min_similarity: float = 0.0,
+                     redundancy_threshold: float = 0.95,
+                     max_tokens: int = 1500,
+                     fused_scores: Optional[Sequence[float]] = None) -> List[Document]:
+    """
+    Reordena e comprime os documentos candidatos sem chamar o LLM.
+
+    1. Ordena pela similaridade de cosseno com a consulta (ou por `fused_scores`, quando a busca é
+       híbrida) e descarta os abaixo de `min_similarity`;
+    2. Descarta documentos quase duplicados de outro já selecionado (cosseno > `redundancy_threshold`);
+    3. Mantém no máximo `top_n` documentos dentro de um orçamento total de `max_tokens`, cortando
+       o último documento para caber no orçamento restante.
+
+    Args:
+        query_embedding: Embedding da consulta
+        candidates: Pares (documento, embedding do documento)
+        top_n: Número máximo de documentos retornados
+        min_similarity: Similaridade mínima com a consulta
+        redundancy_threshold: Similaridade a partir da qual dois documentos são considerados redundantes
+        max_tokens: Orçamento total de tokens do contexto retornado
+        fused_scores: Scores da fusão híbrida (RRF) de cada candidato, usados na ordenação
+
+    Returns:
+        List[Document]: Documentos selecionados, com a similaridade em metadata["relevance_score"]
+    """
+    if not candidates:
+        return []
+
+    query = _normalize(np.asarray(query_embedding, dtype=np.float32))
+    doc_vectors = _normalize(np.asarray([embedding for _, embedding in candidates], dtype=np.float32))
+    similarities = doc_vectors @ query
+
+    selected: List[Document] = []
+    selected_vectors: List[np.ndarray] = []
+    remaining_tokens = max_tokens
+    ranking_scores = similarities if fused_scores is None else np.asarray(fused_scores, dtype=np.float32)
+    for index in np.argsort(-ranking_scores, kind="stable"):
+        if len(selected) >= top_n or remaining_tokens <= 0:
+            break
+        score = float(similarities[index])
+        if score < min_similarity:
+            continue
+        vector = doc_vectors[index]
+        if any(float(vector @ other) > redundancy_threshold for other in selected_vectors):
+            continue
+
+        document = candidates[index][0]
+        content = document.page_content
+        tokens = count_tokens(content)
+        if tokens > remaining_tokens:
+            content = truncate_to_tokens(content, remaining_tokens)
+            tokens = remaining_tokens
+        remaining_tokens -= tokens
+
+        metadata = {**document.metadata, "relevance_score": round(score, 4)}
+        if fused_scores is not None:
+            metadata["rrf_score"] = round(float(fused_scores[index]), 6)
+        selected.append(Document(page_content=content, metadata=metadata))
+        selected_vectors.append(vector)
+    return selected
+
+
+class LocalRerankRetriever(BaseRetriever):
+    """
+    Retriever do Chroma com rerank local (similaridade, redundância e orçamento de tokens).
+
+    Substitui o ContextualCompressionRetriever com LLMChainExtractor: a única chamada externa é o
+    embedding da consulta; os embeddings dos documentos vêm do próprio Chroma.
+
+    Com `bm25` informado, a busca é híbrida: os `fetch_k` melhores da busca vetorial e da busca
+    léxica (BM25) são combinados por Reciprocal Rank Fusion antes do rerank, o que favorece termos
+    exatos (nomes de integrações, planos, datas comemorativas) que a similaridade semântica perde.
+    """
+    vectordb: Chroma
+    bm25: Optional[BM25Index] = None
+    fetch_k: int = 5
+    top_n: int = 3
+    min_similarity: float = 0.0
+    redundancy_threshold: float = 0.95
+    max_tokens: int = 1500
+    rrf_k: int = 60
+
+    def _vector_candidates(self, query_embedding: List[float]) -> Dict[str, Tuple[Document, Any]]:
+        result = self.vectordb._collection.query(
+            query_embeddings=[query_embedding],
+            n_results=self.fetch_k,
+            include=["documents", "metadatas", "embeddings"]
+        )
+        ids = result["ids"][0] if result["ids"] else []
+        documents = result["documents"][0] if result["documents"] else []
+        metadatas = result["metadatas"][0] if result["metadatas"] else [None] * len(documents)
+        embeddings = result["embeddings"][0] if result["embeddings"] is not None else []
+        # Dicionário na ordem do ranking vetorial
+        return {
+            doc_id: (Document(page_content=text, metadata=metadata or {}), embedding)
+            for doc_id, text, metadata, embedding in zip(ids, documents, metadatas, embeddings)
+        }
+
+    def _query_candidates(self, query: str,
+                          query_embedding: List[float]) -> Tuple[List[Tuple[Document, Any]], Optional[List[float]]]:
+        """Candidatos ao rerank e, na busca híbrida, os scores RRF de cada um"""
+        vector_candidates = self._vector_candidates(query_embedding)
+        if self.bm25 is None or len(self.bm25) == 0:
+            return list(vector_candidates.values()), None
+
+        lexical_ids = [doc_id for doc_id, _ in self.bm25.search(query, k=self.fetch_k)]
+        fused = reciprocal_rank_fusion([list(vector_candidates), lexical_ids], k=self.rrf_k)
+
+        # Os resultados só do BM25 precisam dos embeddings guardados no Chroma para o rerank
+        missing = [doc_id for doc_id, _ in fused if doc_id not in vector_candidates]
+        if missing:
+            result = self.vectordb._collection.get(ids=missing, include=["documents", "metadatas", "embeddings"])
+            metadatas = result["metadatas"] or [None] * len(result["ids"])
+            for doc_id, text, metadata, embedding in zip(result["ids"], result["documents"], metadatas, result["embeddings"]):
+                vector_candidates[doc_id] = (Document(page_content=text, metadata=metadata or {}), embedding)
+
+        candidates, scores = [], []
+        for doc_id, score in fused:
+            if doc_id in vector_candidates:
+                candidates.append(vector_candidates[doc_id])
+                scores.append(score)
+        return candidates, scores
+
+    def _rerank(self, query: str, query_embedding: List[float]) -> List[Document]:
+        candidates, fused_scores = self._query_candidates(query, query_embedding)
+        return rerank_documents(
+            query_embedding,
+            candidates,
+            top_n=self.top_n,
+            min_similarity=self.min_similarity,
+            redundancy_threshold=self.redundancy_threshold,
+            max_tokens=self.max_tokens,
+            fused_scores=fused_scores
+        )
+
+    def _get_relevant_documents(self, query: str, *,
+                                run_manager: Optional[CallbackManagerForRetrieverRun] = None) -> List[Document]:
+        query_embedding = self.vectordb.embeddings.embed_query(query)
+        return self._rerank(query, query_embedding)
+
+    async def _aget_relevant_documents(self, query: str, *,
+                                       run_manager: Optional[AsyncCallbackManagerForRetrieverRun] = None) -> List[Document]:
+        query_embedding = await self.vectordb.embeddings.aembed_query(query)
+        # A consulta ao Chroma, o BM25 e o rerank são CPU/disco: rodam fora do event loop
+        return await asyncio.to_thread(self._rerank, query, query_embedding)
@@ -0,0 +1,129 @@
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from src.core.utils.tokens import count_tokens, truncate_to_tokens
+
+# Variável do prompt do plano -> título da reunião, na ordem em que as reuniões acontecem
+MEETING_SECTIONS = {
+    "commercial_meeting": "Reunião Comercial",
+    "onboarding_meeting": "Reunião de Onboarding",
+    "discovery_meeting": "Reunião de Discovery",
+}
+
+EMPTY_SECTION = "(sem perguntas e respostas registradas)"
+# Resposta mínima mantida por pergunta antes de começar a omitir perguntas do fim da seção
+MIN_ANSWER_TOKENS = 24
+# Folga para diferenças de tokenização ao juntar os itens cortados
+RESERVED_TOKENS = 8
+
+# Numeração no início da pergunta ("1.", "2)", "3 -"): descartada, pois muda entre as reuniões
+_NUMBERING = re.compile(r"^\s*\d+\s*[.)\-–]\s*")
+_PUNCT = re.compile(r"[^\w\s]+")
+
+QA = Tuple[str, str]
+
+
+def _pair(item: Any) -> QA:
+    """Aceita MeetingTranscriptQA (ou qualquer objeto com question/answer) e dicionários"""
+    if isinstance(item, dict):
+        question, answer = item.get("question"), item.get("answer")
+    else:
+        question, answer = getattr(item, "question", None), getattr(item, "answer", None)
+    return _NUMBERING.sub("", " ".join(str(question or "").split())), " ".join(str(answer or "").split())
+
+
+def _key(text: str) -> str:
+    return " ".join(_PUNCT.sub(" ", text.casefold()).split())
+
+
+def _render_item(question: str, answer: str) -> str:
+    return f"P: {question}\nR: {answer}"
+
+
+class MeetingQARenderer:
+    """
+    Serializa as perguntas e respostas estruturadas das reuniões (commercial_meeting,
+    onboarding_meeting e discovery_meeting) para o prompt do plano de ação em um formato
+    compacto e determinístico ("P: ..." / "R: ..."), em vez do repr das listas de modelos
+    pydantic, com aspas, chaves question=/answer= e escapes.
+
+    - Perguntas sem resposta são descartadas
+    - Uma pergunta já respondida igual em uma reunião anterior (ou na mesma) não é repetida;
+      se a resposta mudou, a nova resposta é mantida
+    - Cada reunião respeita `token_budget` tokens (0 = sem limite): as respostas longas são
+      cortadas primeiro, dividindo o orçamento igualmente entre elas; se nem assim couber, as
+      últimas perguntas da seção são omitidas
+    """
+
+    def __init__(self, token_budget: int = 0):
+        self.token_budget = token_budget
+
+    def render(self, meetings: Dict[str, Optional[Iterable[Any]]]) -> Dict[str, str]:
+        """
+        Args:
+            meetings: Variável do prompt (ex.: "commercial_meeting") -> lista de perguntas e respostas,
+                na ordem cronológica das reuniões
+
+        Returns:
+            Dict[str, str]: Texto compacto de cada reunião, com as mesmas chaves
+        """
+        answered: Dict[str, str] = {}
+        rendered = {}
+        for section, items in meetings.items():
+            pairs: List[QA] = []
+            repeated = 0
+            for question, answer in map(_pair, items or []):
+                if not question or not answer:
+                    continue
+                key, answer_key = _key(question), _key(answer)
+                if answered.get(key) == answer_key:
+                    repeated += 1
+                    continue
+                answered[key] = answer_key
+                pairs.append((question, answer))
+            rendered[section] = self._render_section(pairs, repeated)
+        return rendered
+
+    def _render_section(self, pairs: List[QA], repeated: int) -> str:
+        if not pairs and not repeated:
+            return EMPTY_SECTION
+        notes = []
+        if repeated:
+            notes.append(f"({repeated} pergunta(s) com a mesma resposta de antes omitida(s))")
+
+        text = "\n".join([_render_item(question, answer) for question, answer in pairs] + notes)
+        if self.token_budget <= 0 or count_tokens(text) <= self.token_budget:
+            return text
+
+        def omitted_note(count: int) -> str:
+            return f"({count} pergunta(s) omitida(s) pelo limite de tokens da seção)"
+
+        # Custo fixo de cada pergunta (linha "P:", prefixo "R:", quebra de linha e reticências), que não é cortado
+        fixed = [count_tokens(_render_item(question, "")) + 2 for question, _ in pairs]
+        budget = self.token_budget - sum(count_tokens(note) + 1 for note in notes) - RESERVED_TOKENS
+        omitted = 0
+        while pairs and sum(fixed) + MIN_ANSWER_TOKENS * len(pairs) > budget:
+            pairs, fixed = pairs[:-1], fixed[:-1]
+            omitted += 1
+            if omitted == 1:
+                budget -= count_tokens(omitted_note(len(fixed) + 1)) + 1
+        if omitted:
+            notes.append(omitted_note(omitted))
+
+        # Distribui o orçamento das respostas da menor para a maior: as que cabem na sua parte
+        # seguem inteiras e a sobra fica para as demais, que são cortadas
+        answer_tokens = [count_tokens(answer) for _, answer in pairs]
+        remaining = budget - sum(fixed)
+        limits: Dict[int, int] = {}
+        pending = sorted(range(len(pairs)), key=lambda i: (answer_tokens[i], i))
+        while pending:
+            share = remaining // len(pending)
+            index = pending.pop(0)
+            limits[index] = min(answer_tokens[index], share)
+            remaining -= limits[index]
+
+        lines = []
+        for index, (question, answer) in enumerate(pairs):
+            if limits[index] < answer_tokens[index]:
+                answer = truncate_to_tokens(answer, limits[index]).rstrip() + "…"
+            lines.append(_render_item(question, answer))
+        return truncate_to_tokens("\n".join(lines + notes), self.token_budget)
@@ -0,0 +1,232 @@
+import asyncio
+import datetime as dt
+import hashlib
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from langchain_core.documents import Document
+from src.config.settings import get_settings
+from src.core.tools.bm25_index import tokenize
+from src.core.tools.zoppy_knowledge_base import ZoppyKnowledgeBase
+from src.core.utils.tokens import count_tokens, truncate_to_tokens
+
+logger = logging.getLogger(__name__)
+
+PLAN_WINDOW_DAYS = 90
+
+# Datas comemorativas fixas do varejo brasileiro (dia, mês, nome)
+FIXED_DATES = [
+    (1, 1, "Ano Novo"),
+    (8, 3, "Dia Internacional da Mulher"),
+    (15, 3, "Dia do Consumidor"),
+    (12, 6, "Dia dos Namorados"),
+    (15, 9, "Dia do Cliente"),
+    (12, 10, "Dia das Crianças"),
+    (25, 12, "Natal"),
+]
+
+# Funcionalidades e integrações da Zoppy procuradas no status do cliente (termos normalizados, consulta)
+FEATURE_QUERIES = [
+    (("giftback",), "Giftback: configuração, reativação e boas práticas"),
+    (("cashback",), "Cashback e Giftback na Zoppy: como configurar"),
+    (("carrinho abandonado",), "Recuperação de carrinho abandonado na Zoppy"),
+    (("whatsapp",), "Configuração da API oficial do WhatsApp e campanhas por WhatsApp"),
+    (("sms",), "Campanhas de SMS na Zoppy"),
+    (("email", "mail"), "Campanhas e templates de e-mail na Zoppy"),
+    (("indique ganhe",), "Programa Indique e Ganhe da Zoppy"),
+    (("reativacao", "inativos"), "Reativação de clientes inativos na Zoppy"),
+    (("segmentacao",), "Segmentação de clientes na Zoppy"),
+    (("pos venda",), "Fluxos de pós-venda na Zoppy"),
+    (("aniversario",), "Automação de mensagens de aniversário"),
+    (("fidelidade",), "Programa de fidelidade na Zoppy"),
+    (("vtex",), "Integração da Zoppy com VTEX"),
+    (("nuvemshop",), "Integração da Zoppy com Nuvemshop"),
+    (("shopify",), "Integração da Zoppy com Shopify"),
+    (("tray",), "Integração da Zoppy com Tray"),
+    (("linx",), "Integração da Zoppy com Linx"),
+    (("bling",), "Integração da Zoppy com Bling"),
+]
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> dt.date:
+    """n-ésimo dia da semana do mês (weekday: 0 = segunda ... 6 = domingo)"""
+    first = dt.date(year, month, 1)
+    return first + dt.timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+
+def _easter(year: int) -> dt.date:
+    """Domingo de Páscoa (algoritmo de Meeus/Jones/Butcher)"""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return dt.date(year, month, day + 1)
+
+
+def commemorative_dates(year: int) -> List[Tuple[dt.date, str]]:
+    """Datas comemorativas relevantes para o varejo em um ano, incluindo as móveis"""
+    easter = _easter(year)
+    dates = [(dt.date(year, month, day), name) for day, month, name in FIXED_DATES]
+    dates += [
+        (easter - dt.timedelta(days=47), "Carnaval"),
+        (easter, "Páscoa"),
+        (_nth_weekday(year, 5, 6, 2), "Dia das Mães"),
+        (_nth_weekday(year, 8, 6, 2), "Dia dos Pais"),
+        # Sexta-feira seguinte à quarta quinta-feira de novembro
+        (_nth_weekday(year, 11, 3, 4) + dt.timedelta(days=1), "Black Friday"),
+    ]
+    return sorted(dates)
+
+
+def dates_in_window(start: dt.date, days: int = PLAN_WINDOW_DAYS) -> List[Tuple[dt.date, str]]:
+    """Datas comemorativas entre `start` e `start + days`"""
+    end = start + dt.timedelta(days=days)
+    return [
+        (date, name)
+        for year in range(start.year, end.year + 1)
+        for date, name in commemorative_dates(year)
+        if start <= date <= end
+    ]
+
+
+def parse_current_date(current_date: str) -> dt.date:
+    """Converte a data atual (dd/mm/aaaa) usada pelo workflow; em caso de formato inválido usa hoje"""
+    try:
+        return dt.datetime.strptime(current_date, "%d/%m/%Y").date()
+    except (TypeError, ValueError):
+        return dt.date.today()
+
+
+def build_queries(company_status: str,
+                  plan: str,
+                  segment: Optional[str],
+                  current_date: str,
+                  max_queries: int = 8) -> List[str]:
+    """
+    Deriva de forma determinística as consultas à base de conhecimento para o plano de ação:
+    plano contratado, segmento, datas comemorativas da janela de 90 dias e funcionalidades
+    citadas no status do cliente. A ordem define a prioridade quando há corte por `max_queries`.
+    """
+    segment_text = segment.strip() if segment and segment.strip() else "varejo"
+    queries = [
+        f"Funcionalidades, limites e prioridades do plano {plan} da Zoppy",
+        "Configuração inicial da Zoppy: integrações e canais de comunicação (WhatsApp API, e-mail, SMS)",
+    ]
+    if segment and segment.strip():
+        queries.append(f"Boas práticas e campanhas da Zoppy para o segmento {segment_text}")
+
+    for date, name in dates_in_window(parse_current_date(current_date)):
+        queries.append(f"Campanhas de {name} ({date.strftime('%d/%m')}) para o segmento {segment_text}")
+
+    status = " " + " ".join(tokenize(company_status or "")) + " "
+    for terms, query in FEATURE_QUERIES:
+        if any(f" {term} " in status for term in terms):
+            queries.append(query)
+
+    unique = list(dict.fromkeys(queries))
+    return unique[:max_queries]
+
+
+def _fingerprint(text: str) -> str:
+    return hashlib.sha256(re.sub(r"\s+", " ", text).strip().lower().encode("utf-8")).hexdigest()
+
+
+class PlanContextRetriever:
+    """
+    Pré-recuperação do plano de ação: executa em paralelo um conjunto determinístico de consultas
+    à base de conhecimento e monta um contexto deduplicado e limitado em tokens para o prompt.
+
+    Substitui as rodadas sequenciais de chamadas da ferramenta pelo agente; a ferramenta continua
+    disponível para consultas complementares.
+    """
+
+    def __init__(self,
+                 knowledge_base: ZoppyKnowledgeBase,
+                 max_queries: Optional[int] = None,
+                 max_tokens: Optional[int] = None,
+                 concurrency: Optional[int] = None):
+        settings = get_settings()
+        self.knowledge_base = knowledge_base
+        self.enabled = settings.PLAN_PRERETRIEVAL_ENABLED
+        self.max_queries = max_queries or settings.PLAN_PRERETRIEVAL_MAX_QUERIES
+        self.max_tokens = max_tokens or settings.PLAN_PRERETRIEVAL_MAX_TOKENS
+        self.concurrency = concurrency or settings.PLAN_PRERETRIEVAL_CONCURRENCY
+
+    async def _run_queries(self, queries: List[str], config: Optional[Dict[str, Any]]) -> List[List[Document]]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(query: str) -> List[Document]:
+            async with semaphore:
+                try:
+                    return await self.knowledge_base.retriever.ainvoke(query, config=config)
+                except Exception as e:
+                    # Uma consulta com erro não impede as demais: o agente ainda pode usar a ferramenta
+                    logger.warning(f"Erro na pré-recuperação da consulta '{query}': {e}")
+                    return []
+
+        return await asyncio.gather(*(run(query) for query in queries))
+
+    def format_context(self, queries: List[str], results: List[List[Document]]) -> str:
+        """
+        Deduplica os trechos e monta o contexto dentro do orçamento de tokens. Os trechos são
+        intercalados entre as consultas (1º de cada consulta, depois 2º...), para que o corte pelo
+        orçamento não elimine consultas inteiras.
+        """
+        seen = set()
+        selected: Dict[int, List[str]] = {}
+        remaining = self.max_tokens
+        for rank in range(max((len(documents) for documents in results), default=0)):
+            for query_index, documents in enumerate(results):
+                if rank >= len(documents) or remaining <= 0:
+                    continue
+                content = documents[rank].page_content.strip()
+                fingerprint = _fingerprint(content)
+                if not content or fingerprint in seen:
+                    continue
+                seen.add(fingerprint)
+                tokens = count_tokens(content)
+                if tokens > remaining:
+                    content = truncate_to_tokens(content, remaining)
+                    tokens = remaining
+                remaining -= tokens
+                selected.setdefault(query_index, []).append(content)
+
+        sections = []
+        for query_index in sorted(selected):
+            passages = "\n\n".join(selected[query_index])
+            sections.append(f"### {queries[query_index]}\n{passages}")
+        return "\n\n".join(sections)
+
+    async def retrieve(self,
+                       company_status: str,
+                       plan: str,
+                       segment: Optional[str],
+                       current_date: str,
+                       config: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Executa a pré-recuperação.
+
+        Args:
+            company_status: Status do cliente gerado pelo CompanyStatusAgent
+            plan: Plano contratado
+            segment: Segmento da loja (opcional)
+            current_date: Data atual (dd/mm/aaaa), início da janela de 90 dias
+            config: Configuração do LangChain (callbacks de instrumentação)
+
+        Returns:
+            str: Contexto formatado para o prompt (vazio se a base não estiver disponível)
+        """
+        if not self.enabled or not self.knowledge_base.loaded:
+            return ""
+        queries = build_queries(company_status, plan, segment, current_date, self.max_queries)
+        results = await self._run_queries(queries, config)
+        context = self.format_context(queries, results)
+        logger.info(
+            f"Pré-recuperação: {len(queries)} consultas, "
+            f"{sum(len(documents) for documents in results)} trechos, {count_tokens(context)} tokens no contexto"
+        )
+        return context
@@ -0,0 +1,213 @@
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from src.core.utils.tokens import count_tokens
+
+# Níveis de agressividade, do mais conservador ao mais agressivo
+LEVEL_NONE = "none"
+LEVEL_LIGHT = "light"
+LEVEL_STANDARD = "standard"
+LEVEL_AGGRESSIVE = "aggressive"
+LEVELS = (LEVEL_NONE, LEVEL_LIGHT, LEVEL_STANDARD, LEVEL_AGGRESSIVE)
+
+_TIME = r"\d{1,2}:\d{2}(?::\d{2})?(?:[.,]\d{1,3})?"
+# Linha de tempo de legendas (WebVTT/SRT): 00:00:01.000 --> 00:00:04.000
+_CUE_TIMING = re.compile(rf"^\s*{_TIME}\s*-->\s*{_TIME}.*$")
+# Marca de tempo no início da fala: [00:01:02], (01:02), 00:01:02 -
+_LEADING_TIME = re.compile(rf"^\s*[\[(]?{_TIME}[\])]?\s*[-–]?\s*")
+# Nome do falante: até 5 palavras, opcionalmente seguidas da empresa entre parênteses ("Ana (Loja X)")
+_SPEAKER = r"(?P<speaker>[^\W\d_][\w.'\-]*(?: [\w.'\-]+){0,4}?(?: \([^()\d:]{1,40}\))?)"
+# "Nome: fala" ou "Nome (00:01:02): fala"
+_SPEAKER_TURN = re.compile(rf"^{_SPEAKER}\s*(?:[\[(]?{_TIME}[\])]?)?\s*:\s+(?P<text>.+)$")
+# Cabeçalho de fala em linha própria, com a fala nas linhas seguintes: "Nome  00:01:02"
+_SPEAKER_HEADER = re.compile(rf"^{_SPEAKER}\s+[\[(]?{_TIME}[\])]?$")
+
+# Vícios de linguagem que não carregam informação
+_FILLERS = re.compile(
+    r"(?<!\w)(?:n[ée]|ahn+|ãh+|hã+|h[uü]m+|hmm+|uh+|éh+|é{2,}|tipo assim|então assim|sabe\?)(?!\w)[,.]?\s*",
+    re.IGNORECASE
+)
+# Palavra ou expressão curta repetida em sequência: "eu eu acho", "a gente a gente vai" -> "eu acho", "a gente vai"
+_REPEATED_WORD = re.compile(r"(?<!\w)((?:[^\W\d_]+\s+){0,2}[^\W\d_]+)(?:\s+\1)+(?!\w)", re.IGNORECASE)
+_WORD = re.compile(r"[^\W\d_]+")
+_PUNCT = re.compile(r"[^\w\s]+")
+_SPACE_BEFORE_PUNCT = re.compile(r"\s+([,.;:!?])")
+_REPEATED_PUNCT = re.compile(r"([,;])(?:\s*[,;])+")
+
+_GREETINGS = re.compile(
+    r"(?<!\w)(?:bom dia|boa tarde|boa noite|oi+|ol[áa]|tudo bem|tudo bom|tudo certo|tudo joia|beleza|"
+    r"prazer|muito prazer|obrigad[oa]|valeu|tchau|at[ée] mais|at[ée] logo|e a[íi]|pessoal|gente)(?!\w)",
+    re.IGNORECASE
+)
+# Respostas curtas de acompanhamento ("ok", "uhum"), descartadas quando não respondem a uma pergunta
+_BACKCHANNEL = re.compile(
+    r"^(?:ok(?:ay)?|sim|certo|entendi|aham|uhum|hum|t[áa]|t[áa] bom|perfeito|claro|legal|show|isso|exato|beleza)[.!]*$",
+    re.IGNORECASE
+)
+
+Turn = Tuple[Optional[str], str]
+
+
+@dataclass
+class NormalizationResult:
+    """Transcrição normalizada e a contagem de tokens antes e depois"""
+    text: str
+    tokens_before: int
+    tokens_after: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+    @property
+    def reduction(self) -> float:
+        return self.tokens_saved / self.tokens_before if self.tokens_before else 0.0
+
+
+def _clean(text: str) -> str:
+    text = unicodedata.normalize("NFC", text).replace("\u00a0", " ").replace("\u200b", "")
+    return " ".join(text.split())
+
+
+def _fold(text: str) -> str:
+    return " ".join(_PUNCT.sub(" ", text.casefold()).split())
+
+
+def _is_greeting(text: str) -> bool:
+    # Falas longas nunca são só saudação: evita rodar a regex em toda a transcrição
+    return len(text) <= 80 and not _fold(_GREETINGS.sub(" ", text))
+
+
+def parse_turns(text: str) -> List[Turn]:
+    """
+    Converte a transcrição bruta em falas (falante, texto), removendo cabeçalho e tempos de
+    legendas (WebVTT/SRT), índices de legenda e marcas de tempo. Linhas sem falante identificado
+    herdam o falante do cabeçalho anterior ("Nome  00:01:02"), quando houver.
+    """
+    lines = text.splitlines()
+    turns: List[Turn] = []
+    speaker: Optional[str] = None
+    for i, raw in enumerate(lines):
+        line = _clean(raw)
+        if not line or line == "WEBVTT" or _CUE_TIMING.match(line):
+            continue
+        # Índice numérico de legenda: só é descartado quando a próxima linha é o tempo da legenda
+        if line.isdigit() and i + 1 < len(lines) and _CUE_TIMING.match(lines[i + 1]):
+            continue
+        header = _SPEAKER_HEADER.match(line)
+        if header:
+            speaker = header.group("speaker")
+            continue
+        line = _LEADING_TIME.sub("", line)
+        match = _SPEAKER_TURN.match(line)
+        if match:
+            turns.append((match.group("speaker"), match.group("text").strip()))
+        elif line:
+            turns.append((speaker, line))
+    return turns
+
+
+def _compact_text(text: str) -> str:
+    text = _FILLERS.sub("", text)
+    # A regex de repetição é a etapa mais cara: só roda quando alguma palavra se repete a até 3
+    # posições de distância, condição necessária para uma expressão de 1 a 3 palavras repetida
+    words = _WORD.findall(text.casefold())
+    if any(any(map(str.__eq__, words, words[k:])) for k in (1, 2, 3)):
+        text = _REPEATED_WORD.sub(r"\1", text)
+    text = _REPEATED_PUNCT.sub(r"\1", text)
+    text = _SPACE_BEFORE_PUNCT.sub(r"\1", text)
+    text = " ".join(text.split()).strip(" ,;")
+    return text[:1].upper() + text[1:] if text else text
+
+
+class TranscriptNormalizer:
+    """
+    Pré-processamento determinístico (Python puro, sem LLM) das transcrições das reuniões.
+
+    Níveis:
+        none: transcrição inalterada
+        light: normaliza unicode e espaços, remove marcas de tempo, tempos/índices de legenda e
+            linhas repetidas em sequência
+        standard: light + remove vícios de linguagem e palavras repetidas, mantém só a primeira
+            saudação de cada tipo por falante e junta falas seguidas do mesmo falante
+        aggressive: standard + remove todas as saudações, respostas curtas ("ok", "uhum") que não
+            respondem a uma pergunta e falas repetidas em qualquer ponto, e abrevia os falantes
+            (S1, S2...) com uma legenda no início
+    """
+
+    def __init__(self, level: str = LEVEL_STANDARD):
+        if level not in LEVELS:
+            raise ValueError(f"Nível de normalização inválido: {level} (use um de {', '.join(LEVELS)})")
+        self.level = level
+
+    def normalize(self, text: str) -> str:
+        if self.level == LEVEL_NONE or not text:
+            return text
+        turns = self._filter(parse_turns(text))
+        return self._render(turns)
+
+    def normalize_with_report(self, text: str) -> NormalizationResult:
+        """Normaliza e conta os tokens (tiktoken) antes e depois"""
+        normalized = self.normalize(text)
+        return NormalizationResult(
+            text=normalized,
+            tokens_before=count_tokens(text or ""),
+            tokens_after=count_tokens(normalized or "")
+        )
+
+    def _filter(self, turns: List[Turn]) -> List[Turn]:
+        standard = self.level in (LEVEL_STANDARD, LEVEL_AGGRESSIVE)
+        aggressive = self.level == LEVEL_AGGRESSIVE
+        result: List[Turn] = []
+        seen_utterances = set()
+        seen_greetings = set()
+        previous: Turn = (None, "")
+        for speaker, text in turns:
+            if standard:
+                text = _compact_text(text)
+            if not text:
+                continue
+            if (speaker, text) == previous:
+                continue
+            if standard and _is_greeting(text):
+                # Por falante: a resposta do cliente ao "bom dia" do consultor também é mantida
+                greeting = (speaker, _fold(text))
+                if aggressive or greeting in seen_greetings:
+                    continue
+                seen_greetings.add(greeting)
+            if aggressive:
+                folded = _fold(text)
+                if _BACKCHANNEL.match(text) and not previous[1].endswith("?"):
+                    continue
+                if len(folded) > 20:
+                    if folded in seen_utterances:
+                        continue
+                    seen_utterances.add(folded)
+            if standard and result and result[-1][0] == speaker and speaker is not None:
+                joined = result[-1][1]
+                separator = " " if joined[-1:] in ".!?" else ". "
+                result[-1] = (speaker, joined + separator + text)
+            else:
+                result.append((speaker, text))
+            previous = (speaker, text)
+        return result
+
+    def _render(self, turns: List[Turn]) -> str:
+        aliases: Dict[str, str] = {}
+        if self.level == LEVEL_AGGRESSIVE:
+            # Só abrevia quem fala mais de uma vez ("Observação: ..." isolada não vira participante)
+            counts = Counter(speaker for speaker, _ in turns if speaker is not None)
+            for speaker, _ in turns:
+                if counts.get(speaker, 0) > 1 and speaker not in aliases:
+                    aliases[speaker] = f"S{len(aliases) + 1}"
+        lines = []
+        if aliases:
+            lines.append("Participantes: " + "; ".join(f"{alias} = {speaker}" for speaker, alias in aliases.items()))
+        for speaker, text in turns:
+            if speaker is None:
+                lines.append(text)
+            else:
+                lines.append(f"{aliases.get(speaker, speaker)}: {text}")
+        return "\n".join(lines)
@@ -0,0 +1,150 @@
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+from langchain_chroma import Chroma
+from langchain.retrievers import ContextualCompressionRetriever
+from langchain.retrievers.document_compressors import LLMChainExtractor
+from langchain.tools.retriever import create_retriever_tool
+from langchain_core.language_models import BaseChatModel
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.tools import BaseTool
+from src.config.settings import get_settings
+from src.core.utils.openai_clients import create_chat_model, create_embeddings
+from src.core.tools.bm25_index import BM25_FILENAME, BM25Index
+from src.core.tools.local_reranker import LocalRerankRetriever
+
+logger = logging.getLogger(__name__)
+
+TOOL_NAME = "zoppy_knowledge_base"
+TOOL_DESCRIPTION = "Útil para buscar informações sobre a Zoppy, suas funcionalidades, integrações e melhores práticas para varejistas. Use esta ferramenta múltiplas vezes conforme necessário para obter informações detalhadas sobre diferentes aspectos da plataforma; consultas independentes podem ser feitas na mesma rodada, pois são executadas em paralelo. Além de datas comemorativas, você pode usar esta ferramenta para buscar informações sobre eventos, datas especiais e sazonalidades relevantes para o segmento do cliente."
+
+
+class ZoppyKnowledgeBase:
+    """
+    Base de conhecimento da Zoppy (Chroma + embeddings + retriever com compressão contextual).
+
+    É carregada uma única vez no startup e compartilhada, somente para leitura, por todas as
+    requisições do plano de ação, evitando reabrir o banco vetorial do disco a cada chamada.
+    """
+
+    def __init__(self,
+                 vector_db_path: Optional[str] = None,
+                 llm: Optional[BaseChatModel] = None,
+                 compressor: Optional[str] = None):
+        self.settings = get_settings()
+        # "local" (rerank por embeddings, sem chamadas ao LLM) ou "llm" (LLMChainExtractor)
+        self.compressor = (compressor or self.settings.KB_COMPRESSOR).lower()
+        project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
+        self.vector_db_path = vector_db_path or os.path.join(project_root, "data", "vectorstorage")
+        self.llm = llm or create_chat_model(
+            model="gpt-4o",
+            temperature=0.2,
+            seed=self.settings.SEED
+        )
+        self.vectordb: Optional[Chroma] = None
+        self.bm25: Optional[BM25Index] = None
+        self.retriever: Optional[BaseRetriever] = None
+        self.retriever_tool: Optional[BaseTool] = None
+        self.document_count = 0
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.retriever_tool is not None
+
+    @property
+    def tools(self) -> List[BaseTool]:
+        """Ferramentas a serem entregues ao agente (vazia se o banco vetorial não carregou)"""
+        return [self.retriever_tool] if self.retriever_tool is not None else []
+
+    def load(self) -> "ZoppyKnowledgeBase":
+        """Abre o banco vetorial e monta o retriever. Falhas são registradas e o agente segue sem a ferramenta."""
+        start = time.perf_counter()
+        try:
+            os.makedirs(self.vector_db_path, exist_ok=True)
+            logger.info(f"Carregando banco vetorial em: {self.vector_db_path}")
+
+            self.vectordb = Chroma(
+                persist_directory=self.vector_db_path,
+                embedding_function=create_embeddings()
+            )
+            self.document_count = self.vectordb._collection.count()
+            logger.info(f"Número de documentos no banco vetorial: {self.document_count}")
+
+            if self.settings.KB_HYBRID:
+                self.bm25 = BM25Index.load(os.path.join(self.vector_db_path, BM25_FILENAME))
+                if self.bm25 is None:
+                    logger.warning("Índice BM25 não encontrado; execute a indexação para habilitar a busca híbrida")
+
+            self.retriever = self._create_retriever()
+            self.retriever_tool = create_retriever_tool(
+                retriever=self.retriever,
+                name=TOOL_NAME,
+                description=TOOL_DESCRIPTION
+            )
+            self.error = None
+        except Exception as e:
+            logger.exception(f"Erro ao carregar o banco vetorial: {e}. Continuando sem a ferramenta de recuperação de documentos.")
+            self.error = str(e)
+        self.load_seconds = round(time.perf_counter() - start, 4)
+        return self
+
+    def _create_retriever(self) -> BaseRetriever:
+        """Cria o retriever conforme o compressor configurado"""
+        if self.compressor == "llm":
+            # Compressor original: extrai com o LLM apenas os trechos relevantes de cada um dos
+            # KB_FETCH_K documentos (k=5, uma chamada por documento). KB_TOP_N vale só para o "local",
+            # para que este modo continue sendo a referência do benchmark e o comportamento anterior
+            compressor = LLMChainExtractor.from_llm(self.llm)
+            retriever = self.vectordb.as_retriever(
+                search_type="similarity",
+                search_kwargs={"k": self.settings.KB_FETCH_K}
+            )
+            return ContextualCompressionRetriever(
+                base_compressor=compressor,
+                base_retriever=retriever
+            )
+        if self.compressor != "local":
+            raise ValueError(f"KB_COMPRESSOR inválido: {self.compressor} (use 'local' ou 'llm')")
+
+        return LocalRerankRetriever(
+            vectordb=self.vectordb,
+            bm25=self.bm25,
+            rrf_k=self.settings.KB_RRF_K,
+            fetch_k=self.settings.KB_FETCH_K,
+            top_n=self.settings.KB_TOP_N,
+            min_similarity=self.settings.KB_MIN_SIMILARITY,
+            redundancy_threshold=self.settings.KB_REDUNDANCY_THRESHOLD,
+            max_tokens=self.settings.KB_CONTEXT_MAX_TOKENS
+        )
+
+    async def warm_up(self, query: str = "Zoppy funcionalidades") -> None:
+        """
+        Executa uma busca de similaridade no boot para carregar o índice do Chroma em memória e
+        aquecer a conexão com a API de embeddings antes da primeira requisição.
+        """
+        if self.vectordb is None or self.document_count == 0:
+            return
+        start = time.perf_counter()
+        try:
+            await self.vectordb.asimilarity_search(query, k=1)
+            self.warmup_seconds = round(time.perf_counter() - start, 4)
+            logger.info(f"Warm-up do banco vetorial concluído em {self.warmup_seconds}s")
+        except Exception as e:
+            logger.warning(f"Falha no warm-up do banco vetorial: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Estado da base de conhecimento, exposto no endpoint de readiness"""
+        return {
+            "loaded": self.loaded,
+            "compressor": self.compressor,
+            "document_count": self.document_count,
+            "bm25_documents": len(self.bm25) if self.bm25 is not None else None,
+            "vector_db_path": self.vector_db_path,
+            "load_seconds": self.load_seconds,
+            "warmup_seconds": self.warmup_seconds,
+            "error": self.error,
+        }
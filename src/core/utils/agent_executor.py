@@ -0,0 +1,40 @@
+import asyncio
+import time
+from typing import Dict, Optional
+from langchain.agents import AgentExecutor
+from langchain_core.agents import AgentAction, AgentStep
+from langchain_core.callbacks import AsyncCallbackManagerForChainRun
+from langchain_core.tools import BaseTool
+from pydantic import PrivateAttr
+from src.core.utils.metrics import TOOL_DURATION
+
+
+class BoundedAgentExecutor(AgentExecutor):
+    """
+    AgentExecutor que limita as chamadas de ferramenta simultâneas e mede a latência de cada uma.
+
+    No caminho assíncrono, o AgentExecutor já executa com asyncio.gather as várias chamadas de
+    ferramenta que o modelo emite numa mesma rodada. Como o executor é criado a cada requisição,
+    o semáforo desta instância limita a concorrência por requisição (`max_concurrent_tools`),
+    sem que uma requisição com muitas consultas ocupe todo o pool de conexões das demais.
+    """
+    max_concurrent_tools: int = 4
+    _semaphore: Optional[asyncio.Semaphore] = PrivateAttr(default=None)
+
+    async def _aperform_agent_action(self,
+                                     name_to_tool_map: Dict[str, BaseTool],
+                                     color_mapping: Dict[str, str],
+                                     agent_action: AgentAction,
+                                     run_manager: Optional[AsyncCallbackManagerForChainRun] = None) -> AgentStep:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(max(1, self.max_concurrent_tools))
+        async with self._semaphore:
+            start = time.perf_counter()
+            status = "ok"
+            try:
+                return await super()._aperform_agent_action(name_to_tool_map, color_mapping, agent_action, run_manager)
+            except BaseException:
+                status = "error"
+                raise
+            finally:
+                TOOL_DURATION.observe(time.perf_counter() - start, tool=agent_action.tool, status=status)
@@ -0,0 +1,177 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from src.config.settings import get_settings
+from src.core.utils.metrics import REGISTRY
+
+EMBEDDING_CACHE_LOOKUPS = REGISTRY.counter(
+    "zoppy_embedding_cache_lookups_total",
+    "Consultas ao cache de embeddings por origem (memória, disco ou API)",
+    ["result"]
+)
+
+
+def embedding_cache_key(namespace: str, text: str) -> str:
+    """Chave do cache: hash do conteúdo do texto e do modelo/dimensão que gerou o embedding"""
+    return hashlib.sha256(f"{namespace}\x00{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Cache de embeddings em duas camadas: LRU em memória na frente de um SQLite em disco.
+
+    O SQLite (modo WAL) pode ser compartilhado entre processos, de modo que o indexador e a API
+    reaproveitam os mesmos vetores. Os vetores são guardados como float32.
+    """
+
+    def __init__(self, path: str, max_memory_entries: int = 10000):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, vector BLOB NOT NULL, created_at REAL NOT NULL)"
+            )
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        """Retorna os vetores encontrados (memória primeiro, depois disco)"""
+        found: Dict[str, List[float]] = {}
+        missing: List[str] = []
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+                else:
+                    missing.append(key)
+        EMBEDDING_CACHE_LOOKUPS.inc(len(found), result="memory")
+
+        if missing:
+            rows = []
+            with self._lock:
+                # Limite de variáveis do SQLite: consulta em lotes
+                for start in range(0, len(missing), 500):
+                    batch = missing[start:start + 500]
+                    placeholders = ",".join("?" * len(batch))
+                    rows.extend(self._conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                    ).fetchall())
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32).tolist()
+                    found[key] = vector
+                    self._remember(key, vector)
+            EMBEDDING_CACHE_LOOKUPS.inc(len(rows), result="disk")
+            EMBEDDING_CACHE_LOOKUPS.inc(len(missing) - len(rows), result="miss")
+        return found
+
+    def set_many(self, items: Dict[str, List[float]]) -> None:
+        now = time.time()
+        rows = [(key, np.asarray(vector, dtype=np.float32).tobytes(), now) for key, vector in items.items()]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, created_at) VALUES (?, ?, ?)", rows
+            )
+            for key, vector in items.items():
+                self._remember(key, list(vector))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            disk_entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            memory_entries = len(self._memory)
+        return {
+            "path": self.path,
+            "memory_entries": memory_entries,
+            "disk_entries": disk_entries,
+            "memory_hits": EMBEDDING_CACHE_LOOKUPS.value(result="memory"),
+            "disk_hits": EMBEDDING_CACHE_LOOKUPS.value(result="disk"),
+            "misses": EMBEDDING_CACHE_LOOKUPS.value(result="miss"),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings que consultam o EmbeddingCache antes de chamar o modelo.
+
+    Apenas os textos ausentes do cache (deduplicados) são enviados à API, então reindexar documentos
+    inalterados ou repetir consultas frequentes não gera chamadas de embedding.
+    """
+
+    def __init__(self, underlying: Embeddings, cache: EmbeddingCache, namespace: str):
+        self.underlying = underlying
+        self.cache = cache
+        self.namespace = namespace
+
+    def _split(self, texts: List[str]):
+        keys = [embedding_cache_key(self.namespace, text) for text in texts]
+        found = self.cache.get_many(set(keys))
+        # Textos ausentes, sem repetição, na ordem em que aparecem
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        return keys, found, missing
+
+    def _store(self, found: Dict[str, List[float]], missing: Dict[str, str], vectors: List[List[float]]) -> None:
+        new_items = dict(zip(missing.keys(), vectors))
+        self.cache.set_many(new_items)
+        found.update(new_items)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, missing = self._split(texts)
+        if missing:
+            self._store(found, missing, self.underlying.embed_documents(list(missing.values())))
+        return [found[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, missing = await asyncio.to_thread(self._split, texts)
+        if missing:
+            vectors = await self.underlying.aembed_documents(list(missing.values()))
+            await asyncio.to_thread(self._store, found, missing, vectors)
+        return [found[key] for key in keys]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Retorna o cache de embeddings do processo (criado na primeira chamada)"""
+    global _embedding_cache
+    with _embedding_cache_lock:
+        if _embedding_cache is None:
+            settings = get_settings()
+            path = settings.EMBEDDING_CACHE_PATH
+            if not path:
+                project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
+                path = os.path.join(project_root, "data", "cache", "embeddings.sqlite3")
+            _embedding_cache = EmbeddingCache(path, max_memory_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES)
+        return _embedding_cache
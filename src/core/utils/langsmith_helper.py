@@ -1,7 +1,8 @@
 from src.config.settings import get_settings
+from contextlib import contextmanager
 from enum import Enum
-import os
-import re
+from typing import Iterator, Optional
+from langsmith.run_helpers import tracing_context
 
 class FeatureType(Enum):
     COPY_WPP = "copy_wpp"
@@ -42,30 +43,25 @@ class LangSmithHelper:
         return base_project
     
     @staticmethod
-    def set_project_env(feature_type: FeatureType) -> None:
+    @contextmanager
+    def project_context(feature_type: Optional[FeatureType]) -> Iterator[Optional[str]]:
         """
-        Define a variável de ambiente LANGSMITH_PROJECT para a feature específica.
-        Isso afetará todos os agentes subsequentes criados.
+        Direciona os traces do LangSmith para o projeto da feature dentro do bloco.
         
-        Args:
-            feature_type: Tipo de feature
-        """
-        project_name = LangSmithHelper.get_project_name(feature_type)
+        O projeto é guardado em uma contextvar (tracing_context do langsmith), ou seja, vale apenas
+        para a requisição/task atual: requisições concorrentes de features diferentes são atribuídas
+        ao projeto correto sem alterar os.environ.
         
-        # Configura tanto LANGSMITH_PROJECT quanto LANGCHAIN_PROJECT para compatibilidade
-        os.environ["LANGSMITH_PROJECT"] = project_name
-        os.environ["LANGCHAIN_PROJECT"] = project_name
-        
-        print(f"Projeto do LangSmith definido para: {project_name}")
-        
-    @staticmethod
-    def reset_project_env() -> None:
-        """
-        Redefine a variável de ambiente LANGSMITH_PROJECT para o valor padrão.
+        Args:
+            feature_type: Tipo de feature (None mantém o projeto padrão)
+            
+        Yields:
+            Optional[str]: Nome do projeto em uso no bloco
         """
-        settings = get_settings()
-        base_project = settings.LANGSMITH_PROJECT
+        if feature_type is None:
+            yield None
+            return
         
-        # Redefine as variáveis de ambiente para o projeto base
-        os.environ["LANGSMITH_PROJECT"] = base_project
-        os.environ["LANGCHAIN_PROJECT"] = base_project 
\ No newline at end of file
+        project_name = LangSmithHelper.get_project_name(feature_type)
+        with tracing_context(project_name=project_name):
+            yield project_name
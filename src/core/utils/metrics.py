@@ -0,0 +1,375 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+# Buckets pensados para chamadas de LLM (de dezenas de ms até alguns minutos)
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+
+LabelValues = Tuple[str, ...]
+T = TypeVar("T")
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base das métricas: nome, descrição, labels e lock (valores também são atualizados a partir de threads)"""
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class _ValueMetric(_Metric):
+    """
+    Métrica com um valor por combinação de labels. Se `collect` for informado, os valores são
+    lidos no momento da coleta (útil para expor contadores mantidos por outros módulos).
+    """
+
+    def __init__(self, *args, collect: Optional[Callable[[], Dict[LabelValues, float]]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+        self._collect = collect
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        if self._collect is not None:
+            items = list(self._collect().items())
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Counter(_ValueMetric):
+    type_name = "counter"
+
+
+class Gauge(_ValueMetric):
+    type_name = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, *args, buckets: Iterable[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # Por combinação de labels: contagem por bucket (não cumulativa), soma e total
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, totals = self._values.setdefault(key, ([0] * len(self.buckets), [0.0, 0.0]))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            totals[0] += value
+            totals[1] += 1
+
+    def count(self, **labels: Any) -> int:
+        entry = self._values.get(self._key(labels))
+        return int(entry[1][1]) if entry else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), list(totals)) for key, (counts, totals) in self._values.items()]
+        lines = []
+        for key, counts, (total_sum, total_count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total_sum)}")
+            lines.append(f"{self.name}_count{labels} {_format_value(total_count)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Conjunto de métricas da aplicação, renderizado no formato texto do Prometheus"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Métrica já registrada: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                collect: Optional[Callable[[], Dict[LabelValues, float]]] = None) -> Counter:
+        return self.register(Counter(name, documentation, labelnames, collect=collect))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+              collect: Optional[Callable[[], Dict[LabelValues, float]]] = None) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, collect=collect))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets=buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_DURATION = REGISTRY.histogram(
+    "zoppy_stage_duration_seconds",
+    "Latência de cada etapa dos agentes e workflows",
+    ["stage", "status"]
+)
+STAGE_IN_FLIGHT = REGISTRY.gauge(
+    "zoppy_stage_in_flight",
+    "Etapas em execução no momento",
+    ["stage"]
+)
+LLM_TOKENS = REGISTRY.counter(
+    "zoppy_llm_tokens_total",
+    "Tokens consumidos por agente e modelo (prompt, completion e cached)",
+    ["agent", "model", "type"]
+)
+LLM_CALLS = REGISTRY.counter(
+    "zoppy_llm_calls_total",
+    "Chamadas ao LLM por agente e modelo",
+    ["agent", "model"]
+)
+OPENAI_RETRIES = REGISTRY.counter(
+    "zoppy_openai_retries_total",
+    "Novas tentativas de chamadas à OpenAI por modelo e tipo de erro",
+    ["model", "error"]
+)
+OPENAI_RATE_LIMITED = REGISTRY.counter(
+    "zoppy_openai_rate_limited_total",
+    "Respostas 429 (rate limit) recebidas da OpenAI por modelo",
+    ["model"]
+)
+TOOL_DURATION = REGISTRY.histogram(
+    "zoppy_agent_tool_duration_seconds",
+    "Latência de cada chamada de ferramenta dos agentes",
+    ["tool", "status"]
+)
+TRANSCRIPT_TOKENS = REGISTRY.counter(
+    "zoppy_transcript_tokens_total",
+    "Tokens das transcrições antes (raw) e depois (normalized) da normalização, por nível",
+    ["level", "type"]
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    "zoppy_http_requests_in_flight",
+    "Requisições HTTP da API em andamento por rota",
+    ["method", "route"]
+)
+
+
+class TokenUsageCallbackHandler(BaseCallbackHandler):
+    """
+    Callback do LangChain que contabiliza tokens por agente e modelo e a latência das
+    consultas aos retrievers (ex.: Chroma) disparadas pelo agente.
+    """
+    # Só atualiza contadores: pode rodar no próprio event loop, sem passar por thread
+    run_inline = True
+
+    def __init__(self, agent: str):
+        self.agent = agent
+        self._retriever_starts: Dict[UUID, float] = {}
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        llm_output = response.llm_output or {}
+        recorded = False
+        # Uma lista de gerações por prompt (chamadas em lote). Com n > 1, as gerações de um mesmo
+        # prompt vêm de uma única requisição e repetem o usage dela: conta-se uma vez por prompt
+        for generations in response.generations:
+            messages = [getattr(generation, "message", None) for generation in generations]
+            messages = [message for message in messages if message is not None]
+            if not messages:
+                continue
+            metadata = getattr(messages[0], "response_metadata", None) or {}
+            model = metadata.get("model_name") or llm_output.get("model_name") or "unknown"
+            LLM_CALLS.inc(agent=self.agent, model=model)
+            usage = next((message.usage_metadata for message in messages
+                          if getattr(message, "usage_metadata", None)), None)
+            if usage:
+                cached = (usage.get("input_token_details") or {}).get("cache_read", 0)
+                self._record(model, usage.get("input_tokens", 0), usage.get("output_tokens", 0), cached)
+                recorded = True
+        if recorded:
+            return
+        # Sem usage_metadata nas mensagens: recorre ao token_usage agregado do llm_output
+        token_usage = llm_output.get("token_usage") or {}
+        if token_usage:
+            cached = (token_usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0)
+            self._record(
+                llm_output.get("model_name") or "unknown",
+                token_usage.get("prompt_tokens", 0),
+                token_usage.get("completion_tokens", 0),
+                cached or 0
+            )
+
+    def _record(self, model: str, prompt: int, completion: int, cached: int) -> None:
+        LLM_TOKENS.inc(prompt, agent=self.agent, model=model, type="prompt")
+        LLM_TOKENS.inc(completion, agent=self.agent, model=model, type="completion")
+        LLM_TOKENS.inc(cached, agent=self.agent, model=model, type="cached")
+
+    def on_retriever_start(self, serialized: Dict[str, Any], query: str, *, run_id: UUID, **kwargs: Any) -> None:
+        self._retriever_starts[run_id] = time.perf_counter()
+
+    def on_retriever_end(self, documents: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._observe_retriever(run_id, "ok")
+
+    def on_retriever_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._observe_retriever(run_id, "error")
+
+    def _observe_retriever(self, run_id: UUID, status: str) -> None:
+        start = self._retriever_starts.pop(run_id, None)
+        if start is not None:
+            STAGE_DURATION.observe(time.perf_counter() - start, stage="retrieval", status=status)
+
+
+class instrument_stage:
+    """
+    Hook único de instrumentação usado por agentes e workflows.
+
+    Mede a latência da etapa (histograma por stage/status), mantém o gauge de etapas em andamento
+    e expõe em `config` a configuração do LangChain com o callback de contagem de tokens, a ser
+    repassada ao `ainvoke`/`astream` da cadeia. Funciona com `with` e `async with`:
+
+        async with instrument_stage("copywriter") as config:
+            result = await self.chain.ainvoke(inputs, config=config)
+    """
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.config = {"callbacks": [TokenUsageCallbackHandler(stage)]}
+        self._start = 0.0
+
+    def __enter__(self) -> Dict[str, Any]:
+        STAGE_IN_FLIGHT.inc(stage=self.stage)
+        self._start = time.perf_counter()
+        return self.config
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        status = "ok" if exc_type is None else "error"
+        STAGE_DURATION.observe(time.perf_counter() - self._start, stage=self.stage, status=status)
+        STAGE_IN_FLIGHT.dec(stage=self.stage)
+
+    async def __aenter__(self) -> Dict[str, Any]:
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.__exit__(exc_type, exc, tb)
+
+
+class StageTimer:
+    """
+    Instrumentação de etapas que emitem resultados em streaming (geradores assíncronos).
+
+    Diferente de instrument_stage, não fica aberto entre os yields: só o tempo dentro de
+    `measure()` (e a espera por cada item em `iterate()`) conta para a latência, e não o tempo em
+    que o gerador aguarda o cliente consumir os eventos. O contexto opcional (ex.: projeto do
+    LangSmith) também é aberto e fechado a cada trecho, sem atravessar um yield. O total é
+    registrado no histograma uma única vez, por `observe()`:
+
+        timer = StageTimer("copywriter")
+        async for token in timer.iterate(self.chain.astream(inputs, config=timer.config)):
+            yield token
+        timer.observe("ok")
+    """
+
+    def __init__(self, stage: str, context: Optional[Callable[[], ContextManager[Any]]] = None):
+        self.stage = stage
+        self.config = {"callbacks": [TokenUsageCallbackHandler(stage)]}
+        self.elapsed = 0.0
+        self._context = context
+
+    @contextmanager
+    def measure(self) -> Iterator[Dict[str, Any]]:
+        STAGE_IN_FLIGHT.inc(stage=self.stage)
+        start = time.perf_counter()
+        try:
+            if self._context is None:
+                yield self.config
+            else:
+                with self._context():
+                    yield self.config
+        finally:
+            self.elapsed += time.perf_counter() - start
+            STAGE_IN_FLIGHT.dec(stage=self.stage)
+
+    async def iterate(self, stream: AsyncIterator[T]) -> AsyncIterator[T]:
+        """Repassa os itens do stream medindo apenas a espera por cada um"""
+        iterator = stream.__aiter__()
+        try:
+            while True:
+                with self.measure():
+                    try:
+                        item = await iterator.__anext__()
+                    except StopAsyncIteration:
+                        return
+                yield item
+        finally:
+            aclose = getattr(iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    def observe(self, status: str) -> None:
+        STAGE_DURATION.observe(self.elapsed, stage=self.stage, status=status)
+
+
+def render_metrics() -> str:
+    """Retorna todas as métricas no formato de exposição texto do Prometheus"""
+    return REGISTRY.render()
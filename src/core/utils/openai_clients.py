@@ -0,0 +1,354 @@
+import logging
+import threading
+from typing import Dict, Optional
+import httpx
+from langchain_core.embeddings import Embeddings
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from src.config.settings import get_settings
+from src.core.utils.embedding_cache import CachedEmbeddings, get_embedding_cache
+from src.core.utils.metrics import REGISTRY
+from src.core.utils.resilience import (
+    record_usage_from_response,
+    should_record_usage,
+    update_rate_limits_from_response,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class _PoolStats:
+    """Contadores de uso do pool HTTP, alimentados pelos transportes de contagem abaixo"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests_total = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def on_request(self) -> None:
+        with self._lock:
+            self.requests_total += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def on_response(self) -> None:
+        with self._lock:
+            self.in_flight = max(self.in_flight - 1, 0)
+
+
+class _CountingAsyncStream(httpx.AsyncByteStream):
+    """Corpo da resposta que só dá a requisição por encerrada quando é fechado (lido até o fim ou abortado)"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, stats: _PoolStats):
+        self.stream = stream
+        self.stats = stats
+        self._closed = False
+
+    async def __aiter__(self):
+        async for chunk in self.stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self.stream.aclose()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self.stats.on_response()
+
+
+class _CountingStream(httpx.SyncByteStream):
+    """Versão síncrona de _CountingAsyncStream"""
+
+    def __init__(self, stream: httpx.SyncByteStream, stats: _PoolStats):
+        self.stream = stream
+        self.stats = stats
+        self._closed = False
+
+    def __iter__(self):
+        yield from self.stream
+
+    def close(self) -> None:
+        try:
+            self.stream.close()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self.stats.on_response()
+
+
+class _CountingAsyncTransport(httpx.AsyncBaseTransport):
+    """
+    Envolve o transporte do httpx para contar as requisições em andamento. Ao contrário dos event
+    hooks (o de resposta não roda em timeouts e erros de conexão), cobre toda saída: a contagem é
+    encerrada no erro ou, com resposta, quando o corpo é fechado, de modo que respostas em
+    streaming (ex.: tokens do copywriter) continuam contadas até o último chunk.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, stats: _PoolStats):
+        self.transport = transport
+        self.stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.stats.on_request()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except BaseException:
+            self.stats.on_response()
+            raise
+        response.stream = _CountingAsyncStream(response.stream, self.stats)
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+class _CountingTransport(httpx.BaseTransport):
+    """Versão síncrona de _CountingAsyncTransport"""
+
+    def __init__(self, transport: httpx.BaseTransport, stats: _PoolStats):
+        self.transport = transport
+        self.stats = stats
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.stats.on_request()
+        try:
+            response = self.transport.handle_request(request)
+        except BaseException:
+            self.stats.on_response()
+            raise
+        response.stream = _CountingStream(response.stream, self.stats)
+        return response
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+def _track_rate_limits(response: httpx.Response) -> None:
+    """Repassa os headers x-ratelimit-* ao limitador do modelo chamado"""
+    try:
+        update_rate_limits_from_response(response.request.content, response.headers)
+    except httpx.RequestNotRead:
+        pass
+
+
+async def _track_usage(response: httpx.Response) -> None:
+    """Repassa o usage real da resposta ao limitador de TPM (lê o corpo, que o SDK leria de qualquer forma)"""
+    try:
+        if response.status_code == 200 and should_record_usage(response.request.content):
+            record_usage_from_response(await response.aread())
+    except httpx.RequestNotRead:
+        pass
+
+
+_async_client: Optional[httpx.AsyncClient] = None
+_sync_client: Optional[httpx.Client] = None
+_async_stats = _PoolStats()
+_sync_stats = _PoolStats()
+_client_lock = threading.Lock()
+
+
+def _http2_enabled() -> bool:
+    """HTTP/2 depende do pacote opcional h2 (httpx[http2])"""
+    if not get_settings().OPENAI_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("OPENAI_HTTP2 habilitado, mas o pacote 'h2' não está instalado. Usando HTTP/1.1.")
+        return False
+    return True
+
+
+def _transport_kwargs() -> Dict:
+    """Pool de conexões (limites e HTTP/2): fica no transporte, que o cliente não cria quando recebe um"""
+    settings = get_settings()
+    return {
+        "http2": _http2_enabled(),
+        "limits": httpx.Limits(
+            max_connections=settings.OPENAI_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.OPENAI_HTTP_KEEPALIVE_EXPIRY,
+        ),
+    }
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(get_settings().OPENAI_HTTP_TIMEOUT, connect=10.0)
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Retorna o httpx.AsyncClient compartilhado por todas as chamadas assíncronas à OpenAI.
+
+    Um único pool mantém as conexões TLS aquecidas entre os estágios dos workflows.
+    """
+    global _async_client
+    with _client_lock:
+        if _async_client is None or _async_client.is_closed:
+            async def on_response(response):
+                _track_rate_limits(response)
+                await _track_usage(response)
+
+            _async_client = httpx.AsyncClient(
+                transport=_CountingAsyncTransport(httpx.AsyncHTTPTransport(**_transport_kwargs()), _async_stats),
+                timeout=_timeout(),
+                event_hooks={"response": [on_response]}
+            )
+        return _async_client
+
+
+def get_sync_http_client() -> httpx.Client:
+    """Retorna o httpx.Client compartilhado pelas chamadas síncronas (ex.: embeddings usados pelo Chroma)"""
+    global _sync_client
+    with _client_lock:
+        if _sync_client is None or _sync_client.is_closed:
+            _sync_client = httpx.Client(
+                transport=_CountingTransport(httpx.HTTPTransport(**_transport_kwargs()), _sync_stats),
+                timeout=_timeout()
+            )
+        return _sync_client
+
+
+def _connection_stats(client) -> Dict[str, int]:
+    """
+    Lê o estado das conexões do pool do httpcore. Usa atributos internos do httpx/httpcore
+    (testado com httpx 0.28 e httpcore 1.0): se mudarem, as métricas do pool ficam zeradas em vez
+    de quebrar o endpoint de saúde.
+    """
+    try:
+        connections = list(client._transport.transport._pool.connections)
+        idle = sum(1 for connection in connections if connection.is_idle())
+    except Exception:
+        return {"connections": 0, "idle_connections": 0, "active_connections": 0}
+    return {
+        "connections": len(connections),
+        "idle_connections": idle,
+        "active_connections": len(connections) - idle,
+    }
+
+
+def get_http_pool_stats() -> Dict[str, Dict]:
+    """
+    Retorna métricas de utilização dos pools HTTP compartilhados.
+
+    Returns:
+        Dict[str, Dict]: Métricas dos clientes "async" e "sync"
+    """
+    settings = get_settings()
+    stats = {}
+    for name, client, counters in (("async", _async_client, _async_stats), ("sync", _sync_client, _sync_stats)):
+        pool = _connection_stats(client)
+        stats[name] = {
+            **pool,
+            "max_connections": settings.OPENAI_HTTP_MAX_CONNECTIONS,
+            "utilization": round(pool["active_connections"] / settings.OPENAI_HTTP_MAX_CONNECTIONS, 4),
+            "requests_total": counters.requests_total,
+            "in_flight": counters.in_flight,
+            "max_in_flight": counters.max_in_flight,
+        }
+    stats["http2"] = _http2_enabled()
+    return stats
+
+
+def _collect_pool_in_flight() -> Dict:
+    return {("async",): _async_stats.in_flight, ("sync",): _sync_stats.in_flight}
+
+
+def _collect_pool_requests() -> Dict:
+    return {("async",): _async_stats.requests_total, ("sync",): _sync_stats.requests_total}
+
+
+REGISTRY.gauge(
+    "zoppy_openai_requests_in_flight",
+    "Requisições à OpenAI em andamento no pool HTTP compartilhado",
+    ["client"],
+    collect=_collect_pool_in_flight
+)
+REGISTRY.counter(
+    "zoppy_openai_requests_total",
+    "Total de requisições enviadas à OpenAI pelo pool HTTP compartilhado",
+    ["client"],
+    collect=_collect_pool_requests
+)
+
+
+async def close_async_http_client() -> None:
+    """
+    Fecha o cliente assíncrono compartilhado no event loop atual. As conexões do pool pertencem ao
+    loop em que foram abertas: quem roda o próprio loop (ex.: indexação pela linha de comando) deve
+    fechá-lo antes de encerrar o loop; o próximo get_async_http_client cria um cliente novo.
+    """
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+
+async def close_http_clients() -> None:
+    """Fecha os clientes compartilhados (chamado no shutdown da aplicação)"""
+    global _sync_client
+    await close_async_http_client()
+    if _sync_client is not None:
+        _sync_client.close()
+        _sync_client = None
+
+
+def create_chat_model(model: str, temperature: float, seed: Optional[int] = None, **kwargs) -> ChatOpenAI:
+    """
+    Cria um ChatOpenAI que utiliza o pool HTTP compartilhado.
+
+    Args:
+        model: Nome do modelo
+        temperature: Temperatura de amostragem
+        seed: Seed para reprodutibilidade (opcional)
+        **kwargs: Parâmetros adicionais repassados ao ChatOpenAI
+
+    Returns:
+        ChatOpenAI: Modelo configurado
+    """
+    settings = get_settings()
+    if seed is not None:
+        kwargs["seed"] = seed
+    # Os retries ficam a cargo de src.core.utils.resilience, para não multiplicar tentativas
+    kwargs.setdefault("max_retries", 0)
+    # Inclui o uso de tokens também nas respostas em streaming (contabilizado em /metrics)
+    kwargs.setdefault("stream_usage", True)
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        api_key=settings.OPENAI_API_KEY,
+        http_client=get_sync_http_client(),
+        http_async_client=get_async_http_client(),
+        **kwargs
+    )
+
+
+def create_embeddings(use_cache: Optional[bool] = None, **kwargs) -> Embeddings:
+    """
+    Cria um OpenAIEmbeddings que utiliza o pool HTTP compartilhado.
+
+    Com o cache habilitado (EMBEDDING_CACHE_ENABLED), o modelo é envolvido por CachedEmbeddings,
+    que consulta o cache em disco antes de chamar a API.
+
+    Args:
+        use_cache: Força o uso (ou não) do cache de embeddings; por padrão segue a configuração
+        **kwargs: Parâmetros adicionais repassados ao OpenAIEmbeddings
+
+    Returns:
+        Embeddings: Modelo de embeddings configurado
+    """
+    settings = get_settings()
+    embeddings = OpenAIEmbeddings(
+        api_key=settings.OPENAI_API_KEY,
+        http_client=get_sync_http_client(),
+        http_async_client=get_async_http_client(),
+        **kwargs
+    )
+    if use_cache is None:
+        use_cache = settings.EMBEDDING_CACHE_ENABLED
+    if not use_cache:
+        return embeddings
+    # O namespace separa vetores de modelos/dimensões diferentes para o mesmo texto
+    namespace = f"{embeddings.model}:{embeddings.dimensions or 'default'}"
+    return CachedEmbeddings(embeddings, get_embedding_cache(), namespace=namespace)
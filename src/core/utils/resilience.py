@@ -0,0 +1,296 @@
+import asyncio
+import contextvars
+import logging
+import random
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, TypeVar
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+from src.config.settings import get_settings
+from src.core.utils.metrics import OPENAI_RATE_LIMITED, OPENAI_RETRIES
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Erros transitórios que justificam uma nova tentativa. Erros 4xx (exceto 429) não são repetidos.
+RETRYABLE_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_MODEL_IN_BODY = re.compile(rb'"model"\s*:\s*"([^"]+)"')
+_STREAM_IN_BODY = re.compile(rb'"stream"\s*:\s*true')
+_TOTAL_TOKENS_IN_BODY = re.compile(rb'"total_tokens"\s*:\s*(\d+)')
+
+# Tokens reais (campo usage) das respostas recebidas durante a chamada em andamento de with_resilience
+_usage_tracker: contextvars.ContextVar[Optional[List[int]]] = contextvars.ContextVar("usage_tracker", default=None)
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """
+    Converte os valores de reset da OpenAI ("20ms", "1s", "6m0s", "1h2m3.5s") para segundos.
+
+    Args:
+        value: Valor do header x-ratelimit-reset-*
+
+    Returns:
+        Optional[float]: Duração em segundos, ou None se o valor for inválido
+    """
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    multipliers = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * multipliers[unit] for amount, unit in parts)
+
+
+class TokenBucket:
+    """Token bucket assíncrono: a espera é feita com asyncio.sleep, sem bloquear o event loop"""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+        self._updated_at = now
+
+    async def acquire(self, amount: float = 1) -> None:
+        """Aguarda até haver `amount` tokens disponíveis e os consome"""
+        amount = min(amount, self.capacity)
+        while True:
+            async with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._blocked_until and self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = max(self._blocked_until - now, (amount - self.tokens) / self.refill_per_second)
+            await asyncio.sleep(wait)
+
+    def block_for(self, seconds: float) -> None:
+        """Esvazia o bucket e bloqueia novas aquisições pelo tempo informado pelo servidor"""
+        now = time.monotonic()
+        self.tokens = 0
+        self._updated_at = now
+        self._blocked_until = max(self._blocked_until, now + seconds)
+
+
+class ModelRateLimiter:
+    """Limitador client-side de requisições (RPM) e tokens (TPM) para um modelo"""
+
+    def __init__(self, model: str, rpm: int, tpm: int):
+        self.model = model
+        # Limite <= 0 desliga o bucket correspondente (sem limite client-side)
+        self.requests = TokenBucket(rpm, rpm / 60) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm, tpm / 60) if tpm > 0 else None
+
+    async def acquire(self, estimated_tokens: int) -> None:
+        if self.requests is not None:
+            await self.requests.acquire(1)
+        if self.tokens is not None:
+            await self.tokens.acquire(estimated_tokens)
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """
+        Ajusta o bucket de TPM com o consumo real informado pela OpenAI: cobra os tokens que a
+        estimativa não cobriu (ex.: a resposta gerada) ou devolve o que foi reservado a mais.
+        """
+        if self.tokens is None:
+            return
+        bucket = self.tokens
+        bucket._refill(time.monotonic())
+        bucket.tokens = min(bucket.capacity, bucket.tokens + estimated_tokens - actual_tokens)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Sincroniza o limitador com os headers x-ratelimit-* retornados pela OpenAI"""
+        for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+            if bucket is None:
+                continue
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            reset = parse_reset_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+            if remaining is None or reset is None:
+                continue
+            try:
+                remaining_value = float(remaining)
+            except ValueError:
+                continue
+            if remaining_value <= 0:
+                bucket.block_for(reset)
+            else:
+                # O servidor é a fonte da verdade: o saldo sobe ou desce conforme o header
+                bucket._refill(time.monotonic())
+                bucket.tokens = min(bucket.capacity, remaining_value)
+
+
+_rate_limiters: Dict[str, ModelRateLimiter] = {}
+
+
+def is_embedding_model(model: str) -> bool:
+    """Indica se o modelo é de embeddings (ex.: text-embedding-3-small), que tem limites próprios na OpenAI"""
+    return "embedding" in model
+
+
+def get_rate_limiter(model: str) -> ModelRateLimiter:
+    """
+    Retorna o limitador compartilhado do modelo, criando-o na primeira chamada.
+
+    O limite client-side é opcional: sem OPENAI_RATE_LIMITS para o modelo nem
+    OPENAI_RPM_LIMIT/OPENAI_TPM_LIMIT, o limitador não segura nenhuma chamada e os 429 da
+    OpenAI ficam a cargo do retry. Os limites globais valem só para os modelos de chat: os de
+    embeddings usam OPENAI_EMBEDDING_RPM_LIMIT/OPENAI_EMBEDDING_TPM_LIMIT.
+    """
+    limiter = _rate_limiters.get(model)
+    if limiter is None:
+        settings = get_settings()
+        limits = settings.OPENAI_RATE_LIMITS.get(model, {})
+        if is_embedding_model(model):
+            default_rpm, default_tpm = settings.OPENAI_EMBEDDING_RPM_LIMIT, settings.OPENAI_EMBEDDING_TPM_LIMIT
+        else:
+            default_rpm, default_tpm = settings.OPENAI_RPM_LIMIT, settings.OPENAI_TPM_LIMIT
+        limiter = ModelRateLimiter(
+            model,
+            rpm=limits.get("rpm", default_rpm),
+            tpm=limits.get("tpm", default_tpm)
+        )
+        _rate_limiters[model] = limiter
+    return limiter
+
+
+def update_rate_limits_from_response(request_body: bytes, headers: Mapping[str, str]) -> None:
+    """
+    Atualiza o limitador do modelo a partir de uma resposta HTTP da OpenAI.
+
+    Chamado pelo event hook do cliente HTTP compartilhado, inclusive para respostas de sucesso.
+    """
+    if "x-ratelimit-remaining-requests" not in headers:
+        return
+    match = _MODEL_IN_BODY.search(request_body or b"")
+    if not match:
+        return
+    model = match.group(1).decode()
+    # Os headers trazem o modelo resolvido (ex.: gpt-4o-2024-08-06); o limite é aplicado ao nome pedido
+    if model in _rate_limiters:
+        _rate_limiters[model].update_from_headers(headers)
+
+
+def should_record_usage(request_body: bytes) -> bool:
+    """Indica se vale ler o corpo da resposta para reconciliar o TPM (chamada não streaming com limite de TPM)"""
+    return _usage_tracker.get() is not None and not _STREAM_IN_BODY.search(request_body or b"")
+
+
+def record_usage_from_response(response_body: bytes) -> None:
+    """
+    Registra o total de tokens (campo usage) de uma resposta da OpenAI na chamada em andamento
+    de `with_resilience`, que reconcilia o limitador de TPM ao final.
+
+    Chamado pelo event hook do cliente HTTP compartilhado; respostas em streaming não são lidas
+    e ficam apenas com a estimativa do prompt, corrigida pelos headers x-ratelimit-*.
+    """
+    tracker = _usage_tracker.get()
+    if tracker is None:
+        return
+    match = _TOTAL_TOKENS_IN_BODY.search(response_body or b"")
+    if match:
+        tracker.append(int(match.group(1)))
+
+
+def compute_retry_delay(error: Exception, attempt: int) -> float:
+    """
+    Calcula o tempo de espera antes da próxima tentativa.
+
+    Prioriza os headers do servidor (retry-after-ms, retry-after e x-ratelimit-reset-*) e, na
+    ausência deles, usa backoff exponencial com full jitter.
+    """
+    settings = get_settings()
+    response = getattr(error, "response", None)
+    headers = response.headers if response is not None else {}
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = parse_reset_duration(headers.get("retry-after"))
+    if retry_after is not None:
+        return retry_after
+
+    resets = [
+        parse_reset_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+        for kind in ("requests", "tokens")
+    ]
+    resets = [reset for reset in resets if reset]
+    if isinstance(error, RateLimitError) and resets:
+        return max(resets) + random.uniform(0, settings.OPENAI_RETRY_BASE_DELAY)
+
+    ceiling = min(settings.OPENAI_RETRY_MAX_DELAY, settings.OPENAI_RETRY_BASE_DELAY * 2 ** attempt)
+    return random.uniform(0, ceiling)
+
+
+def estimate_tokens(inputs: Dict[str, Any]) -> int:
+    """
+    Estimativa barata (≈4 caracteres por token) dos tokens de prompt de uma chamada.
+
+    Só o prompt é reservado antes da chamada; a resposta é cobrada depois, pelo `usage` real.
+    """
+    prompt_chars = sum(len(str(value)) for value in inputs.values())
+    return prompt_chars // 4
+
+
+async def with_resilience(func: Callable[[], Awaitable[T]],
+                          model: str,
+                          estimated_tokens: int = 1000,
+                          max_tries: Optional[int] = None) -> T:
+    """
+    Executa uma chamada assíncrona à OpenAI com rate limiting e retry sem bloquear o event loop.
+
+    Args:
+        func: Função sem argumentos que retorna a coroutine a ser executada
+        model: Modelo usado, para aplicar o limitador de RPM/TPM correspondente
+        estimated_tokens: Estimativa dos tokens de prompt, reservada antes da chamada e
+            reconciliada depois com o consumo real
+        max_tries: Número máximo de tentativas (padrão: OPENAI_MAX_RETRIES)
+
+    Returns:
+        O resultado da coroutine
+    """
+    max_tries = max_tries or get_settings().OPENAI_MAX_RETRIES
+    limiter = get_rate_limiter(model)
+
+    for attempt in range(max_tries):
+        await limiter.acquire(estimated_tokens)
+        usage: Optional[List[int]] = [] if limiter.tokens is not None else None
+        tracker_token = _usage_tracker.set(usage)
+        try:
+            result = await func()
+            if usage:
+                limiter.reconcile(estimated_tokens, sum(usage))
+            return result
+        except RETRYABLE_ERRORS as e:
+            if isinstance(e, RateLimitError):
+                OPENAI_RATE_LIMITED.inc(model=model)
+            if attempt == max_tries - 1:
+                raise
+            OPENAI_RETRIES.inc(model=model, error=type(e).__name__)
+            response = getattr(e, "response", None)
+            if response is not None:
+                limiter.update_from_headers(response.headers)
+            delay = compute_retry_delay(e, attempt)
+            logger.warning(
+                f"Erro transitório da OpenAI ({type(e).__name__}) no modelo {model}. "
+                f"Tentativa {attempt + 1}/{max_tries}, aguardando {delay:.2f}s: {str(e)}"
+            )
+            await asyncio.sleep(delay)
+        finally:
+            _usage_tracker.reset(tracker_token)
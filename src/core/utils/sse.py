@@ -0,0 +1,16 @@
+import json
+from typing import Any, Dict
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """
+    Formata um evento no padrão Server-Sent Events.
+
+    Args:
+        event: Nome do evento
+        data: Payload serializado como JSON na linha "data"
+
+    Returns:
+        str: Evento pronto para ser enviado ao cliente
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -0,0 +1,211 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional
+from src.config.settings import get_settings
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_input(value: str) -> str:
+    """Normaliza uma entrada textual para compor a chave do cache (unicode, caixa e espaços)"""
+    value = unicodedata.normalize("NFC", str(value))
+    return _WHITESPACE.sub(" ", value).strip().casefold()
+
+
+def template_version(template, **params) -> str:
+    """
+    Gera a versão de um prompt a partir do seu conteúdo e dos parâmetros do modelo.
+
+    Qualquer alteração no template (ou no modelo/temperatura) muda a versão e invalida o cache.
+    """
+    content = template.pretty_repr() if hasattr(template, "pretty_repr") else str(template)
+    payload = json.dumps({"template": content, "params": params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def build_cache_key(version: str, **inputs: str) -> str:
+    """Monta a chave do cache com as entradas normalizadas e a versão do prompt"""
+    normalized = {name: normalize_input(value) for name, value in sorted(inputs.items())}
+    payload = json.dumps({"version": version, "inputs": normalized}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class StageCache:
+    """
+    Interface do cache por estágio dos workflows. As implementações guardam strings
+    (a saída do agente) e contabilizam hits/misses por estágio.
+    """
+
+    backend = "none"
+
+    def __init__(self):
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, stage: str, hit: bool) -> None:
+        counters = self._counters.setdefault(stage, {"hits": 0, "misses": 0})
+        counters["hits" if hit else "misses"] += 1
+
+    async def get(self, stage: str, key: str) -> Optional[str]:
+        self._count(stage, False)
+        return None
+
+    async def set(self, stage: str, key: str, value: str) -> None:
+        return None
+
+    def size(self) -> int:
+        return 0
+
+    def counters(self) -> Dict[str, Dict[str, int]]:
+        """Contadores de hit/miss por estágio, em memória (não consulta o backend)"""
+        return {stage: dict(counters) for stage, counters in self._counters.items()}
+
+    def stats(self) -> Dict:
+        """Retorna os contadores de hit/miss por estágio e o tamanho do cache"""
+        stages = {}
+        for stage, counters in self.counters().items():
+            total = counters["hits"] + counters["misses"]
+            stages[stage] = {**counters, "hit_ratio": round(counters["hits"] / total, 4) if total else 0.0}
+        return {"backend": self.backend, "entries": self.size(), "stages": stages}
+
+
+class InMemoryStageCache(StageCache):
+    """Cache LRU em memória com expiração por TTL"""
+
+    backend = "memory"
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 86400):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, stage: str, key: str) -> Optional[str]:
+        full_key = f"{stage}:{key}"
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is not None and time.time() - entry[1] > self.ttl_seconds:
+                del self._entries[full_key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(full_key)
+        self._count(stage, entry is not None)
+        return entry[0] if entry is not None else None
+
+    async def set(self, stage: str, key: str, value: str) -> None:
+        full_key = f"{stage}:{key}"
+        with self._lock:
+            self._entries[full_key] = (value, time.time())
+            self._entries.move_to_end(full_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class SqliteStageCache(StageCache):
+    """Cache persistente em SQLite; o acesso ao disco roda em thread para não bloquear o event loop"""
+
+    backend = "sqlite"
+
+    def __init__(self, path: str, ttl_seconds: float = 86400):
+        super().__init__()
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS stage_cache ("
+                "stage TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, created_at REAL NOT NULL, "
+                "PRIMARY KEY (stage, key))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_stage_cache_created_at ON stage_cache (created_at)")
+
+    def _get(self, stage: str, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM stage_cache WHERE stage = ? AND key = ?", (stage, key)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl_seconds:
+            return None
+        return row[0]
+
+    def _set(self, stage: str, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO stage_cache (stage, key, value, created_at) VALUES (?, ?, ?, ?)",
+                (stage, key, value, now)
+            )
+            self._conn.execute("DELETE FROM stage_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+
+    async def get(self, stage: str, key: str) -> Optional[str]:
+        value = await asyncio.to_thread(self._get, stage, key)
+        self._count(stage, value is not None)
+        return value
+
+    async def set(self, stage: str, key: str, value: str) -> None:
+        await asyncio.to_thread(self._set, stage, key, value)
+
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM stage_cache").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _default_cache_path(filename: str) -> str:
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
+    return os.path.join(project_root, "data", "cache", filename)
+
+
+def create_stage_cache() -> StageCache:
+    """
+    Cria o cache de estágios conforme STAGE_CACHE_BACKEND ("memory", "sqlite" ou "none").
+
+    Returns:
+        StageCache: Instância do cache configurado
+    """
+    settings = get_settings()
+    backend = settings.STAGE_CACHE_BACKEND.lower()
+
+    if backend == "memory":
+        return InMemoryStageCache(
+            max_entries=settings.STAGE_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.STAGE_CACHE_TTL_SECONDS
+        )
+    if backend == "sqlite":
+        path = settings.STAGE_CACHE_PATH or _default_cache_path("stage_cache.sqlite3")
+        return SqliteStageCache(path, ttl_seconds=settings.STAGE_CACHE_TTL_SECONDS)
+    if backend == "none":
+        return StageCache()
+    raise ValueError(f"STAGE_CACHE_BACKEND inválido: {settings.STAGE_CACHE_BACKEND}")
+
+
+def create_company_status_cache() -> StageCache:
+    """
+    Cria o cache durável do status do cliente (SQLite), independente de STAGE_CACHE_BACKEND: o status
+    é o estágio mais caro do plano de ação e deve sobreviver a reinícios da API.
+
+    Returns:
+        StageCache: SqliteStageCache, ou o cache nulo se COMPANY_STATUS_CACHE_ENABLED for falso
+    """
+    settings = get_settings()
+    if not settings.COMPANY_STATUS_CACHE_ENABLED:
+        return StageCache()
+    path = settings.COMPANY_STATUS_CACHE_PATH or _default_cache_path("company_status.sqlite3")
+    return SqliteStageCache(path, ttl_seconds=settings.COMPANY_STATUS_CACHE_TTL_SECONDS)
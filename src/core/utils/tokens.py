@@ -0,0 +1,146 @@
+import bisect
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gpt-4o"
+
+# Aproximação usada quando o encoding não pode ser carregado (o tiktoken baixa o BPE na primeira vez)
+CHARS_PER_TOKEN = 4
+# Intervalo até tentar carregar de novo um encoding que falhou (ex.: sem rede no startup)
+ENCODING_RETRY_SECONDS = 300
+
+_encodings: Dict[str, tiktoken.Encoding] = {}
+_encoding_failures: Dict[str, float] = {}
+_encoding_lock = threading.Lock()
+
+
+def get_encoding(model: str = DEFAULT_MODEL) -> Optional[tiktoken.Encoding]:
+    """
+    Retorna o encoding do tiktoken do modelo, ou None se não estiver disponível. Só os encodings
+    carregados com sucesso são memorizados: após uma falha, nova tentativa a cada
+    ENCODING_RETRY_SECONDS, usando a aproximação por caracteres nesse intervalo.
+    """
+    encoding = _encodings.get(model)
+    if encoding is not None:
+        return encoding
+    with _encoding_lock:
+        if model in _encodings:
+            return _encodings[model]
+        failed_at = _encoding_failures.get(model)
+        if failed_at is not None and time.monotonic() - failed_at < ENCODING_RETRY_SECONDS:
+            return None
+        try:
+            try:
+                encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            _encoding_failures[model] = time.monotonic()
+            logger.warning(f"Encoding do tiktoken indisponível para {model} ({e}); usando aproximação por caracteres")
+            return None
+        _encoding_failures.pop(model, None)
+        _encodings[model] = encoding
+        return encoding
+
+
+def count_tokens(text: str, model: str = DEFAULT_MODEL) -> int:
+    """Conta os tokens de um texto com o tokenizer do modelo"""
+    encoding = get_encoding(model)
+    if encoding is None:
+        return len(text) // CHARS_PER_TOKEN
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _token_windows(text: str, max_tokens: int, model: str = DEFAULT_MODEL, limit: Optional[int] = None) -> List[str]:
+    """
+    Divide o texto em partes consecutivas de até `max_tokens` tokens. As partes são fatias do texto
+    original nos limites dos tokens, recuadas até o início de um caractere: decodificar janelas de
+    tokens partiria caracteres multibyte (acentos, emojis) em U+FFFD. `limit` para após as primeiras partes.
+    """
+    encoding = get_encoding(model)
+    if encoding is None:
+        size = max_tokens * CHARS_PER_TOKEN
+        return [text[start:start + size] for start in range(0, len(text), size)][:limit]
+
+    data = text.encode("utf-8")
+    offsets = [0]
+    for token in encoding.encode(text, disallowed_special=()):
+        offsets.append(offsets[-1] + len(encoding.decode_single_token_bytes(token)))
+
+    windows: List[str] = []
+    start = 0
+    while start < len(data) and (limit is None or len(windows) < limit):
+        # Primeiro token que começa a partir de `start`, e o fim da janela `max_tokens` tokens depois
+        first = bisect.bisect_left(offsets, start)
+        end = offsets[min(first + max_tokens, len(offsets) - 1)]
+        # Recua até o início de um caractere UTF-8 (bytes de continuação são 10xxxxxx)
+        while start < end < len(data) and data[end] & 0xC0 == 0x80:
+            end -= 1
+        if end <= start:
+            # A janela inteira cabe dentro de um único caractere: avança até o fim dele
+            end = start + 1
+            while end < len(data) and data[end] & 0xC0 == 0x80:
+                end += 1
+        windows.append(data[start:end].decode("utf-8"))
+        start = end
+    return windows
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = DEFAULT_MODEL) -> str:
+    """Corta o texto para caber em `max_tokens` tokens"""
+    if max_tokens <= 0 or not text:
+        return ""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    return _token_windows(text, max_tokens, model, limit=1)[0]
+
+
+def split_by_tokens(text: str, chunk_tokens: int, overlap_tokens: int = 0, model: str = DEFAULT_MODEL) -> List[str]:
+    """
+    Divide o texto em pedaços de até `chunk_tokens` tokens, respeitando quebras de linha (falas de
+    uma transcrição) sempre que possível. Cada pedaço repete as últimas linhas do anterior, até
+    `overlap_tokens`, para não perder o contexto na fronteira.
+
+    Raises:
+        ValueError: se não vale chunk_tokens > overlap_tokens >= 0
+    """
+    if not chunk_tokens > overlap_tokens >= 0:
+        raise ValueError(
+            f"Tamanho de pedaço inválido: chunk_tokens={chunk_tokens}, overlap_tokens={overlap_tokens} "
+            f"(é preciso chunk_tokens > overlap_tokens >= 0)"
+        )
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for line in text.splitlines():
+        line_tokens = count_tokens(line, model) + 1
+        # Linha maior que o pedaço inteiro: corta em partes do tamanho máximo
+        if line_tokens > chunk_tokens:
+            if current:
+                chunks.append("\n".join(current))
+                current, current_tokens = [], 0
+            # Cada parte vira um pedaço sozinho, sem a quebra de linha: com chunk_tokens=1, um token por parte
+            *heads, line = _token_windows(line, max(chunk_tokens - 1, 1), model)
+            chunks.extend(heads)
+            line_tokens = count_tokens(line, model) + 1
+        if current and current_tokens + line_tokens > chunk_tokens:
+            chunks.append("\n".join(current))
+            overlap: List[str] = []
+            overlap_size = 0
+            for previous in reversed(current):
+                previous_tokens = count_tokens(previous, model) + 1
+                if overlap_size + previous_tokens > overlap_tokens:
+                    break
+                overlap.insert(0, previous)
+                overlap_size += previous_tokens
+            current, current_tokens = overlap, overlap_size
+        current.append(line)
+        current_tokens += line_tokens
+    if current and any(line.strip() for line in current):
+        chunks.append("\n".join(current))
+    return chunks
@@ -1,11 +1,13 @@
-from typing import Dict, Any
+from typing import AsyncIterator, Dict, Any, Optional
 import time
 import uuid
 from langchain_core.language_models import BaseChatModel
 from src.core.agents.prompt_builder_agent import PromptBuilderAgent
 from src.core.agents.variable_suggester_agent import VariableSuggesterAgent
 from src.core.agents.copywriter_agent import CopywriterAgent
+from src.core.agents.copy_fast_agent import CopyFastAgent
 from src.core.utils.langsmith_helper import LangSmithHelper, FeatureType
+from src.core.utils.metrics import StageTimer, instrument_stage
 
 
 class CopyWhatsappWorkflow:
@@ -13,19 +15,24 @@ class CopyWhatsappWorkflow:
     Classe principal que gerencia o workflow de geração de copy para WhatsApp
     """
     
-    def __init__(self, llm: BaseChatModel = None):
-        # Define o projeto LangSmith específico para esta feature
-        LangSmithHelper.set_project_env(FeatureType.COPY_WPP)
-        
-        self.prompt_builder = PromptBuilderAgent()
-        self.variable_suggester = VariableSuggesterAgent()
-        self.copywriter = CopywriterAgent()
+    def __init__(self,
+                 llm: BaseChatModel = None,
+                 prompt_builder: Optional[PromptBuilderAgent] = None,
+                 variable_suggester: Optional[VariableSuggesterAgent] = None,
+                 copywriter: Optional[CopywriterAgent] = None,
+                 fast_agent: Optional[CopyFastAgent] = None):
+        # Os agentes podem ser injetados (instâncias compartilhadas criadas no startup da API)
+        self.prompt_builder = prompt_builder or PromptBuilderAgent()
+        self.variable_suggester = variable_suggester or VariableSuggesterAgent()
+        self.copywriter = copywriter or CopywriterAgent()
+        self.fast_agent = fast_agent or CopyFastAgent()
     
     async def execute(self, 
                      objetivo_copy: str,
                      tom_de_voz: str,
                      publico_alvo: str,
-                     segmento_loja: str) -> Dict[str, Any]:
+                     segmento_loja: str,
+                     modo_rapido: bool = False) -> Dict[str, Any]:
         """
         Executa o workflow completo de geração de copy para WhatsApp
         
@@ -34,43 +41,145 @@ class CopyWhatsappWorkflow:
             tom_de_voz: Tom de voz a ser utilizado (formal, informal, etc)
             publico_alvo: Descrição do público-alvo
             segmento_loja: Segmento da loja (ex: moda, eletrônicos, cosméticos)
+            modo_rapido: Se True, gera as três etapas em uma única chamada estruturada ao LLM
             
         Returns:
-            Dict[str, Any]: Dicionário contendo o run_id, copy final e tempo de execução
+            Dict[str, Any]: Dicionário contendo o run_id, copy final, tempo de execução e modo executado
         """
         # Inicia o timer
         start_time = time.time()
         
         run_id = str(uuid.uuid4())
         
-        prompt_formatado = await self.prompt_builder.generate_prompt(
-            objetivo_copy=objetivo_copy,
-            tom_de_voz=tom_de_voz,
-            publico_alvo=publico_alvo,
-            segmento_loja=segmento_loja
-        )
+        # O projeto do LangSmith vale só para esta requisição (contextvar), sem alterar os.environ
+        with LangSmithHelper.project_context(FeatureType.COPY_WPP), instrument_stage("copy_wpp_workflow"):
+            if modo_rapido:
+                # Modo rápido: prompt, variáveis e copy em uma única chamada ao LLM
+                result = await self.fast_agent.generate_all_stages(
+                    objetivo_copy=objetivo_copy,
+                    tom_de_voz=tom_de_voz,
+                    publico_alvo=publico_alvo,
+                    segmento_loja=segmento_loja
+                )
+                copy_text = result["copy_text"]
+            else:
+                prompt_formatado = await self.prompt_builder.generate_prompt(
+                    objetivo_copy=objetivo_copy,
+                    tom_de_voz=tom_de_voz,
+                    publico_alvo=publico_alvo,
+                    segmento_loja=segmento_loja
+                )
 
-        variaveis_sugeridas = await self.variable_suggester.suggest_variables(
-            prompt_formatado=prompt_formatado,
-            objetivo_copy=objetivo_copy,
-            tom_de_voz=tom_de_voz,
-            publico_alvo=publico_alvo,
-            segmento_loja=segmento_loja
-        )
-        
-        copy_text = await self.copywriter.generate_copy(
-            prompt_formatado=prompt_formatado,
-            variaveis_sugeridas=variaveis_sugeridas
-        )
+                variaveis_sugeridas = await self.variable_suggester.suggest_variables(
+                    prompt_formatado=prompt_formatado,
+                    objetivo_copy=objetivo_copy,
+                    tom_de_voz=tom_de_voz,
+                    publico_alvo=publico_alvo,
+                    segmento_loja=segmento_loja
+                )
+            
+                copy_text = await self.copywriter.generate_copy(
+                    prompt_formatado=prompt_formatado,
+                    variaveis_sugeridas=variaveis_sugeridas
+                )
         
         execution_time = round(time.time() - start_time, 2)
         
-        # Restaura o projeto LangSmith para o valor padrão ao finalizar
-        LangSmithHelper.reset_project_env()
-        
         # Retorna o resultado no formato esperado
         return {
             "run_id": run_id,
             "copy_text": copy_text,
-            "tempo_execucao": f"{execution_time}s"
-        } 
\ No newline at end of file
+            "tempo_execucao": f"{execution_time}s",
+            "modo_execucao": "rapido" if modo_rapido else "padrao"
+        }
+    
+    async def execute_stream(self,
+                             objetivo_copy: str,
+                             tom_de_voz: str,
+                             publico_alvo: str,
+                             segmento_loja: str,
+                             modo_rapido: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Executa o workflow de copy para WhatsApp emitindo um evento ao final de cada etapa
+        e os tokens do copy final à medida que são gerados.
+        
+        No modo rápido a saída estruturada só fica pronta no fim da chamada: os eventos das etapas e
+        o copy completo (um único evento copy_token) são emitidos juntos, sem streaming token a token.
+        
+        Args:
+            objetivo_copy: Objetivo principal da mensagem
+            tom_de_voz: Tom de voz a ser utilizado (formal, informal, etc)
+            publico_alvo: Descrição do público-alvo
+            segmento_loja: Segmento da loja (ex: moda, eletrônicos, cosméticos)
+            modo_rapido: Se True, gera as três etapas em uma única chamada estruturada ao LLM
+            
+        Yields:
+            Dict[str, Any]: Evento com as chaves "event" (inicio, prompt_formatado, variaveis_sugeridas,
+                copy_token, concluido) e "data"
+        """
+        start_time = time.time()
+        run_id = str(uuid.uuid4())
+        modo_execucao = "rapido" if modo_rapido else "padrao"
+        
+        yield {"event": "inicio", "data": {"run_id": run_id, "modo_execucao": modo_execucao}}
+        
+        # O projeto do LangSmith (contextvar) e a medição da etapa valem só durante as chamadas aos
+        # agentes: nenhum contexto fica aberto em um yield, enquanto o cliente consome os eventos
+        timer = StageTimer("copy_wpp_workflow", context=lambda: LangSmithHelper.project_context(FeatureType.COPY_WPP))
+        try:
+            if modo_rapido:
+                with timer.measure():
+                    result = await self.fast_agent.generate_all_stages(
+                        objetivo_copy=objetivo_copy,
+                        tom_de_voz=tom_de_voz,
+                        publico_alvo=publico_alvo,
+                        segmento_loja=segmento_loja
+                    )
+                yield {"event": "prompt_formatado", "data": {"prompt_formatado": result["prompt_formatado"]}}
+                yield {"event": "variaveis_sugeridas", "data": {"variaveis_sugeridas": result["variaveis_sugeridas"]}}
+                yield {"event": "copy_token", "data": {"token": result["copy_text"]}}
+                copy_text = result["copy_text"]
+            else:
+                with timer.measure():
+                    prompt_formatado = await self.prompt_builder.generate_prompt(
+                        objetivo_copy=objetivo_copy,
+                        tom_de_voz=tom_de_voz,
+                        publico_alvo=publico_alvo,
+                        segmento_loja=segmento_loja
+                    )
+                yield {"event": "prompt_formatado", "data": {"prompt_formatado": prompt_formatado}}
+
+                with timer.measure():
+                    variaveis_sugeridas = await self.variable_suggester.suggest_variables(
+                        prompt_formatado=prompt_formatado,
+                        objetivo_copy=objetivo_copy,
+                        tom_de_voz=tom_de_voz,
+                        publico_alvo=publico_alvo,
+                        segmento_loja=segmento_loja
+                    )
+                yield {"event": "variaveis_sugeridas", "data": {"variaveis_sugeridas": variaveis_sugeridas}}
+
+                tokens = []
+                async for token in timer.iterate(self.copywriter.astream_copy(
+                    prompt_formatado=prompt_formatado,
+                    variaveis_sugeridas=variaveis_sugeridas
+                )):
+                    tokens.append(token)
+                    yield {"event": "copy_token", "data": {"token": token}}
+                copy_text = "".join(tokens)
+        except Exception:
+            timer.observe("error")
+            raise
+        timer.observe("ok")
+
+        execution_time = round(time.time() - start_time, 2)
+        
+        yield {
+            "event": "concluido",
+            "data": {
+                "run_id": run_id,
+                "copy_text": copy_text,
+                "tempo_execucao": f"{execution_time}s",
+                "modo_execucao": modo_execucao
+            }
+        }
@@ -1,15 +1,62 @@
-from typing import List, Dict
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Dict, Optional, Tuple
 from src.core.agents.company_status_agent import CompanyStatusAgent
+from src.config.settings import get_settings
 from src.core.agents.plan_action_90d_agent import PlanAction90dAgent
+from src.core.tools.plan_context_retriever import PlanContextRetriever
+from src.core.tools.transcript_normalizer import TranscriptNormalizer
 from src.core.utils.langsmith_helper import LangSmithHelper, FeatureType
+from src.core.utils.metrics import TRANSCRIPT_TOKENS, instrument_stage
+from src.core.utils.stage_cache import StageCache, build_cache_key
+
+logger = logging.getLogger(__name__)
+
 
 class GenerateActionPlanWorkflow:
-    def __init__(self):
-        # Define o projeto LangSmith específico para esta feature
-        LangSmithHelper.set_project_env(FeatureType.PLAN_ACTION_90D)
-        
-        self.company_status_agent = CompanyStatusAgent()
-        self.plan_action_90d_agent = PlanAction90dAgent()
+    # Nome do estágio no cache do status do cliente
+    COMPANY_STATUS_CACHE_STAGE = "company_status"
+
+    def __init__(self,
+                 company_status_agent: Optional[CompanyStatusAgent] = None,
+                 plan_action_90d_agent: Optional[PlanAction90dAgent] = None,
+                 plan_context_retriever: Optional[PlanContextRetriever] = None,
+                 company_status_cache: Optional[StageCache] = None,
+                 transcript_normalizer: Optional[TranscriptNormalizer] = None):
+        # Os agentes podem ser injetados (instâncias compartilhadas criadas no startup da API)
+        self.company_status_agent = company_status_agent or CompanyStatusAgent()
+        self.plan_action_90d_agent = plan_action_90d_agent or PlanAction90dAgent()
+        self.plan_context_retriever = plan_context_retriever or PlanContextRetriever(
+            self.plan_action_90d_agent.knowledge_base
+        )
+        self.company_status_cache = company_status_cache or StageCache()
+        self.transcript_normalizer = transcript_normalizer or TranscriptNormalizer(
+            get_settings().TRANSCRIPT_NORMALIZATION_LEVEL
+        )
+
+    async def _normalize_transcripts(self, transcripts: Dict[str, str]) -> Tuple[Dict[str, str], int]:
+        """
+        Normaliza as transcrições (CPU-bound, em thread) e contabiliza os tokens antes e depois.
+
+        Returns:
+            Tuple[Dict[str, str], int]: Transcrições normalizadas e o total de tokens economizados
+        """
+        level = self.transcript_normalizer.level
+        async with instrument_stage("transcript_normalization"):
+            results = await asyncio.gather(*(
+                asyncio.to_thread(self.transcript_normalizer.normalize_with_report, text)
+                for text in transcripts.values()
+            ))
+        for result in results:
+            TRANSCRIPT_TOKENS.inc(result.tokens_before, level=level, type="raw")
+            TRANSCRIPT_TOKENS.inc(result.tokens_after, level=level, type="normalized")
+        before = sum(result.tokens_before for result in results)
+        saved = sum(result.tokens_saved for result in results)
+        logger.info(
+            f"Normalização das transcrições ({level}): {before} -> {before - saved} tokens "
+            f"({saved} economizados)"
+        )
+        return {key: result.text for key, result in zip(transcripts, results)}, saved
 
     async def execute(self,
                      company_name: str,
@@ -20,7 +67,12 @@ class GenerateActionPlanWorkflow:
                      commercial_meeting: List[Dict[str, str]],
                      onboarding_meeting: List[Dict[str, str]],
                      discovery_meeting: List[Dict[str, str]],
-                     current_date: str) -> Dict[str, str]:
+                     current_date: str,
+                     segment: Optional[str] = None,
+                     sectioned: Optional[bool] = None,
+                     on_stage: Optional[Callable[[str], Awaitable[None]]] = None,
+                     checkpoints: Optional[Dict[str, str]] = None,
+                     on_checkpoint: Optional[Callable[[str, str], Awaitable[None]]] = None) -> Dict[str, str]:
         """
         Executa o fluxo completo de geração do plano de ação para os 90 primeiros dias.
         
@@ -34,36 +86,99 @@ class GenerateActionPlanWorkflow:
             onboarding_meeting: Lista de perguntas e respostas da reunião de onboarding
             discovery_meeting: Lista de perguntas e respostas da reunião de discovery
             current_date: Data atual
+            segment: Segmento da loja (opcional), usado nas consultas da pré-recuperação
+            sectioned: Gera o plano em seções paralelas a partir de um esqueleto (padrão: PLAN_SECTIONED_GENERATION)
+            on_stage: Callback assíncrono opcional chamado no início de cada etapa
+                ("company_status", "retrieval", "action_plan"), usado para reportar progresso
+            checkpoints: Saídas de etapas já concluídas em uma execução anterior, por etapa; essas
+                etapas não são executadas novamente (retomada após falha)
+            on_checkpoint: Callback assíncrono opcional chamado com (etapa, saída) ao concluir cada
+                etapa, usado para persistir os checkpoints
             
         Returns:
             Dict[str, str]: Dicionário contendo:
                 - company_status: Status detalhado do cliente
                 - action_plan: Plano de ação para os 90 primeiros dias
+                - company_status_cache: "hit" se o status veio do cache, "miss" se foi gerado,
+                  "checkpoint" se veio de uma execução anterior retomada
+                - transcript_tokens_saved: Tokens removidos das transcrições pela normalização
         """
-        # 1. Gera o status do cliente usando o CompanyStatusAgent com as transcrições completas
-        company_status = await self.company_status_agent.generate_company_status(
-            company_name=company_name,
-            plan=plan,
-            commercial_transcript=commercial_transcript,
-            onboarding_transcript=onboarding_transcript,
-            discovery_transcript=discovery_transcript
-        )
+        checkpoints = dict(checkpoints or {})
+
+        async def completed(stage: str, value: str) -> None:
+            if on_checkpoint and stage not in checkpoints:
+                await on_checkpoint(stage, value)
+
+        # O projeto do LangSmith vale só para esta requisição (contextvar), sem alterar os.environ
+        with LangSmithHelper.project_context(FeatureType.PLAN_ACTION_90D), instrument_stage("generate_action_plan_workflow"):
+            if on_stage:
+                await on_stage("company_status")
         
-        # 2. Gera o plano de ação usando o PlanAction90dAgent com os dados estruturados
-        action_plan = await self.plan_action_90d_agent.generate_action_plan(
-            company_name=company_name,
-            plan=plan,
-            commercial_meeting=commercial_meeting,
-            onboarding_meeting=onboarding_meeting,
-            discovery_meeting=discovery_meeting,
-            company_status=company_status,
-            current_date=current_date
-        )
+            # 1. Gera o status do cliente usando o CompanyStatusAgent com as transcrições normalizadas;
+            # reexecuções com o mesmo cliente, plano e transcrições reaproveitam o status do cache
+            company_status = checkpoints.get("company_status")
+            company_status_cache = "checkpoint"
+            # Numa retomada, as transcrições normalizadas já foram usadas: a economia vem do checkpoint
+            tokens_saved = int(checkpoints.get("transcript_normalization") or 0)
+            if company_status is None:
+                transcripts, tokens_saved = await self._normalize_transcripts({
+                    "commercial_transcript": commercial_transcript,
+                    "onboarding_transcript": onboarding_transcript,
+                    "discovery_transcript": discovery_transcript
+                })
+                await completed("transcript_normalization", str(tokens_saved))
+                status_inputs = {"company_name": company_name, "plan": plan, **transcripts}
+                cache_key = build_cache_key(self.company_status_agent.prompt_version, **status_inputs)
+                company_status = await self.company_status_cache.get(self.COMPANY_STATUS_CACHE_STAGE, cache_key)
+                company_status_cache = "hit" if company_status is not None else "miss"
+                if company_status is None:
+                    company_status = await self.company_status_agent.generate_company_status(**status_inputs)
+                    await self.company_status_cache.set(self.COMPANY_STATUS_CACHE_STAGE, cache_key, company_status)
+            await completed("company_status", company_status)
+        
+            if on_stage:
+                await on_stage("retrieval")
+
+            # 2. Pré-recuperação: consultas determinísticas à base de conhecimento, em paralelo
+            knowledge_context = checkpoints.get("retrieval")
+            if knowledge_context is None:
+                async with instrument_stage("plan_pre_retrieval") as config:
+                    knowledge_context = await self.plan_context_retriever.retrieve(
+                        company_status=company_status,
+                        plan=plan,
+                        segment=segment,
+                        current_date=current_date,
+                        config=config
+                    )
+            await completed("retrieval", knowledge_context)
+
+            if on_stage:
+                await on_stage("action_plan")
         
-        # Restaura o projeto LangSmith para o valor padrão ao finalizar
-        LangSmithHelper.reset_project_env()
+            # 3. Gera o plano de ação usando o PlanAction90dAgent com os dados estruturados, em uma
+            # única geração (agente com ferramenta) ou em seções redigidas em paralelo
+            if sectioned is None:
+                sectioned = get_settings().PLAN_SECTIONED_GENERATION
+            generate = (self.plan_action_90d_agent.generate_action_plan_sectioned if sectioned
+                        else self.plan_action_90d_agent.generate_action_plan)
+            action_plan = checkpoints.get("action_plan")
+            if action_plan is None:
+                action_plan = await generate(
+                    company_name=company_name,
+                    plan=plan,
+                    commercial_meeting=commercial_meeting,
+                    onboarding_meeting=onboarding_meeting,
+                    discovery_meeting=discovery_meeting,
+                    company_status=company_status,
+                    current_date=current_date,
+                    segment=segment,
+                    knowledge_context=knowledge_context
+                )
+            await completed("action_plan", action_plan)
         
         return {
             "company_status": company_status,
-            "action_plan": action_plan
+            "action_plan": action_plan,
+            "company_status_cache": company_status_cache,
+            "transcript_tokens_saved": str(tokens_saved)
         } 
\ No newline at end of file
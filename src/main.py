@@ -1,13 +1,87 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Match
 from src.api.routes.linkedin_post_controller import router as linkedin_post_router
 from src.api.routes.plan_action_90d_controller import router as plan_action_90d_router
 from src.api.routes.copy_wpp_controller import router as copy_wpp_router
 from src.api.routes.copy_sms_controller import router as copy_sms_router
 from src.config.settings import get_settings
+from src.config.dependencies import AgentRegistry
+from src.core.utils.openai_clients import close_http_clients, get_http_pool_stats
+from src.core.utils.embedding_cache import get_embedding_cache
+from src.core.utils.metrics import HTTP_IN_FLIGHT, REGISTRY, render_metrics
 
 settings = get_settings()
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Constrói agentes e workflows uma única vez e os compartilha entre as requisições"""
+    app.state.registry = AgentRegistry()
+    await app.state.registry.knowledge_base.warm_up()
+    await app.state.registry.plan_action_job_runner.start()
+    yield
+    await app.state.registry.plan_action_job_runner.stop()
+    await close_http_clients()
+
+app = FastAPI(lifespan=lifespan)
+
+def _collect_stage_cache_hits():
+    """
+    Hits/misses do cache de estágios, lidos do registro no momento da coleta. Usa só os contadores
+    em memória: stats() consultaria o tamanho do cache (COUNT(*) no SQLite) a cada scrape.
+    """
+    registry = getattr(app.state, "registry", None)
+    if registry is None:
+        return {}
+    values = {}
+    for cache in (registry.stage_cache, registry.company_status_cache):
+        for stage, counters in cache.counters().items():
+            values[(stage, "hit")] = counters["hits"]
+            values[(stage, "miss")] = counters["misses"]
+    return values
+
+REGISTRY.counter(
+    "zoppy_stage_cache_lookups_total",
+    "Consultas ao cache de estágios (workflows de copy e status do cliente) por resultado",
+    ["stage", "result"],
+    collect=_collect_stage_cache_hits
+)
+
+def _route_template(request: Request) -> str:
+    """
+    Resolve o template da rota (ex.: /api/plan-action-90d/jobs/{job_id}), para que ids nos paths
+    não gerem uma série de métricas por requisição. A rota só é resolvida depois do middleware.
+    """
+    for route in app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+    return "desconhecida"
+
+class InFlightRequestsMiddleware:
+    """
+    Mantém o gauge de requisições em andamento por rota. É um middleware ASGI puro: a chamada ao app
+    só retorna depois do último pedaço do corpo, então respostas em streaming (SSE) contam como em
+    andamento até o fim do stream, e não só até o envio dos headers como no @app.middleware("http").
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route_path = _route_template(Request(scope))
+        HTTP_IN_FLIGHT.inc(method=scope["method"], route=route_path)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            HTTP_IN_FLIGHT.dec(method=scope["method"], route=route_path)
+
+app.add_middleware(InFlightRequestsMiddleware)
 
 app.include_router(linkedin_post_router, prefix="/api")
 app.include_router(plan_action_90d_router, prefix="/api")
@@ -21,4 +95,43 @@ def read_root():
 @app.get("/health")
 async def health_check():
     """Endpoint de verificação de saúde da API"""
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness: a API só está pronta depois de carregar a base de conhecimento da Zoppy"""
+    registry = getattr(app.state, "registry", None)
+    if registry is None:
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    knowledge_base = registry.knowledge_base.stats()
+    status_code = 200 if knowledge_base["loaded"] else 503
+    return JSONResponse(
+        status_code=status_code,
+        content={"status": "ready" if status_code == 200 else "degraded", "knowledge_base": knowledge_base}
+    )
+
+@app.get("/health/http-pool")
+async def http_pool_stats():
+    """Métricas de utilização do pool HTTP compartilhado pelas chamadas à OpenAI"""
+    return get_http_pool_stats()
+
+@app.get("/health/stage-cache")
+async def stage_cache_stats():
+    """Contadores de hit/miss do cache de estágios dos workflows de copy"""
+    # Com o backend SQLite, stats() faz um COUNT(*) no banco: roda em thread, fora do event loop
+    return await asyncio.to_thread(app.state.registry.stage_cache.stats)
+
+@app.get("/health/company-status-cache")
+async def company_status_cache_stats():
+    """Entradas e hits/misses do cache durável do status do cliente"""
+    return await asyncio.to_thread(app.state.registry.company_status_cache.stats)
+
+@app.get("/health/embedding-cache")
+async def embedding_cache_stats():
+    """Entradas e hits/misses do cache de embeddings (memória e disco)"""
+    return await asyncio.to_thread(get_embedding_cache().stats)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Métricas no formato de exposição do Prometheus"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
\ No newline at end of file
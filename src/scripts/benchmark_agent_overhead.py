@@ -0,0 +1,144 @@
+"""
+Microbenchmark do overhead por chamada dos agentes sem ferramentas: AgentExecutor (caminho antigo)
+versus a cadeia direta prompt → modelo → parser usada hoje.
+
+O modelo é substituído por um fake que responde instantaneamente, de modo que o tempo medido é
+apenas o da orquestração do LangChain. Para cada caminho são reportados a latência por chamada
+e a memória alocada (tracemalloc) por chamada.
+
+Uso:
+    python src/scripts/benchmark_agent_overhead.py --calls 500
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from typing import Any, List, Optional
+
+# Configura o path do projeto corretamente
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+sys.path.insert(0, project_root)
+
+from langchain.agents import AgentExecutor, create_tool_calling_agent
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+
+from src.core.agents.copywriter_agent import CopywriterAgent
+from src.core.agents.prompt_builder_agent import PromptBuilderAgent
+from src.core.agents.variable_suggester_agent import VariableSuggesterAgent
+from src.core.prompts.copywriter_prompt import COPYWRITER_TEMPLATE
+from src.core.prompts.prompt_builder_prompt import PROMPT_BUILDER_TEMPLATE
+from src.core.prompts.variable_suggester_prompt import VARIABLE_SUGGESTER_TEMPLATE
+
+
+class FakeChatModel(BaseChatModel):
+    """Modelo que devolve sempre a mesma resposta, sem I/O"""
+    model_name: str = "fake"
+    response: str = "Resposta gerada pelo modelo fake " * 20
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.response))])
+
+    def bind_tools(self, tools: Any, **kwargs: Any):
+        return self
+
+
+CENARIOS = [
+    ("prompt_builder", PromptBuilderAgent, PROMPT_BUILDER_TEMPLATE, {
+        "objetivo_copy": "Recuperar carrinhos abandonados", "tom_de_voz": "informal",
+        "publico_alvo": "clientes recorrentes", "segmento_loja": "moda"
+    }),
+    ("variable_suggester", VariableSuggesterAgent, VARIABLE_SUGGESTER_TEMPLATE, {
+        "prompt_formatado": "Prompt estruturado " * 50, "objetivo_copy": "Recuperar carrinhos abandonados",
+        "tom_de_voz": "informal", "publico_alvo": "clientes recorrentes", "segmento_loja": "moda"
+    }),
+    ("copywriter", CopywriterAgent, COPYWRITER_TEMPLATE, {
+        "prompt_formatado": "Prompt estruturado " * 50, "variaveis_sugeridas": "[first_name], [store_url]"
+    }),
+]
+
+
+def build_executor(llm: BaseChatModel, template: ChatPromptTemplate) -> AgentExecutor:
+    """Reproduz o caminho antigo: agente de tool calling sem ferramentas dentro de um AgentExecutor"""
+    prompt = ChatPromptTemplate.from_messages([
+        *template.messages,
+        MessagesPlaceholder(variable_name="agent_scratchpad")
+    ])
+    return AgentExecutor(
+        agent=create_tool_calling_agent(llm, [], prompt),
+        tools=[],
+        verbose=True,
+        max_iterations=3,
+        early_stopping_method="generate",
+        handle_parsing_errors=True
+    )
+
+
+async def measure(call, calls: int):
+    # Aquecimento
+    for _ in range(10):
+        await call()
+
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        await call()
+        latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    allocated = []
+    for _ in range(min(calls, 100)):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        await call()
+        _, peak = tracemalloc.get_traced_memory()
+        allocated.append(peak - before)
+    tracemalloc.stop()
+
+    return statistics.median(latencies) * 1000, statistics.mean(latencies) * 1000, statistics.mean(allocated) / 1024
+
+
+async def benchmark(calls: int):
+    print(f"{'agente':>18} | {'caminho':>14} | {'p50 (ms)':>8} | {'média (ms)':>10} | {'pico KiB/chamada':>16}")
+    for name, agent_cls, template, inputs in CENARIOS:
+        agent = agent_cls()
+        agent.llm = FakeChatModel()
+        agent.chain = agent._create_chain()
+        executor = build_executor(agent.llm, template)
+
+        paths = (
+            ("agent_executor", lambda: executor.ainvoke(inputs)),
+            ("lcel", lambda: agent.chain.ainvoke(inputs)),
+        )
+        results = {}
+        for label, call in paths:
+            # O AgentExecutor com verbose=True escreve no stdout: o custo é mantido, mas a saída é descartada
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                results[label] = await measure(call, calls)
+            p50, mean, kib = results[label]
+            print(f"{name:>18} | {label:>14} | {p50:8.3f} | {mean:10.3f} | {kib:16.1f}")
+        speedup = results["agent_executor"][0] / results["lcel"][0]
+        print(f"{name:>18} | {'ganho':>14} | {speedup:7.2f}x |")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=500)
+    args = parser.parse_args()
+
+    asyncio.run(benchmark(args.calls))
+
+
+if __name__ == "__main__":
+    main()
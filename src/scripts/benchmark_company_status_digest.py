@@ -0,0 +1,221 @@
+"""
+Benchmark do status do cliente com transcrições longas: chamada única x map-reduce.
+
+Gera três transcrições sintéticas de reuniões de ~2 horas (comercial, onboarding e discovery) com
+alguns fatos do cliente (restrições, ferramentas, números) espalhados no meio da conversa, e mede
+para cada caminho do CompanyStatusAgent a latência, os tokens por modelo e o custo estimado.
+
+Modos:
+- --fake (padrão): as chamadas à OpenAI são substituídas por um stub cuja latência cresce com os
+  tokens de entrada e saída (parâmetros por modelo abaixo) e que reporta o uso de tokens como a API.
+  Mede o ganho de paralelismo e o custo, mas não a qualidade.
+- --real: chama a OpenAI (requer OPENAI_API_KEY) e também verifica quantos fatos plantados
+  aparecem no status final.
+
+Uso:
+    python src/scripts/benchmark_company_status_digest.py
+    python src/scripts/benchmark_company_status_digest.py --minutes 120 --budget 24000 --chunk-tokens 4000
+    python src/scripts/benchmark_company_status_digest.py --real --repeat 1
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+# Configura o path do projeto corretamente
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+sys.path.insert(0, project_root)
+
+# O limitador client-side de RPM/TPM não deve interferir na medição
+os.environ.setdefault("OPENAI_RPM_LIMIT", "100000000")
+os.environ.setdefault("OPENAI_TPM_LIMIT", "100000000000")
+
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_openai import ChatOpenAI
+
+from src.config.settings import get_settings
+from src.core.agents.company_status_agent import CompanyStatusAgent
+from src.core.utils.metrics import LLM_TOKENS
+from src.core.utils.tokens import count_tokens
+
+# Preço em USD por 1M de tokens (entrada, saída)
+PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+# Latência simulada no modo --fake: (fixa em s, s por 1k tokens de entrada, s por token de saída)
+FAKE_LATENCY = {
+    "gpt-4o": (0.5, 0.15, 0.012),
+    "gpt-4o-mini": (0.3, 0.05, 0.006),
+}
+
+# Tokens de saída simulados por tipo de chamada no modo --fake
+FAKE_COMPLETION = {"trecho": 350, "Consolide": 700, "Condense": 1200, "status": 1500}
+
+FALANTES = ["Consultor Zoppy", "Cliente"]
+FRASES = [
+    "então a gente tem uma base grande de clientes que compraram uma vez e nunca mais voltaram",
+    "hoje o time de marketing é pequeno, são duas pessoas cuidando de tudo",
+    "a ideia é conseguir aumentar a recompra sem depender só de desconto",
+    "vocês conseguem mostrar como fica a jornada depois da primeira compra",
+    "no fim de semana o movimento da loja física é bem maior",
+    "a gente já testou algumas ferramentas de disparo mas não teve acompanhamento",
+    "faz sentido, e como vocês medem o resultado das campanhas",
+    "o ticket médio caiu um pouco no último trimestre",
+    "deixa eu compartilhar a tela para mostrar o painel",
+    "certo, e quanto tempo leva para a integração ficar pronta",
+]
+FATOS = [
+    ("O cliente não quer usar a API oficial do WhatsApp de jeito nenhum", ["api oficial"]),
+    ("Não queremos ativar o giftback agora, talvez só no ano que vem", ["giftback"]),
+    ("A loja roda na Nuvemshop e o ERP é o Bling", ["nuvemshop", "bling"]),
+    ("O faturamento mensal está em torno de 480 mil reais", ["480"]),
+    ("Os disparos só podem acontecer depois das 18 horas", ["18"]),
+    ("A meta é reativar 15 por cento da base inativa em 90 dias", ["15"]),
+]
+
+
+def build_transcript(name: str, minutes: int, seed: int) -> str:
+    """Transcrição sintética com ~140 palavras por minuto e fatos distribuídos ao longo da reunião"""
+    rng = random.Random(seed)
+    lines = []
+    words = 0
+    target_words = minutes * 140
+    fact_positions = {int(target_words * (i + 1) / (len(FATOS) + 1)): fact for i, (fact, _) in enumerate(FATOS)}
+    next_facts = sorted(fact_positions)
+    while words < target_words:
+        seconds = int(words / target_words * minutes * 60)
+        if next_facts and words >= next_facts[0]:
+            text = fact_positions[next_facts.pop(0)]
+            speaker = "Cliente"
+        else:
+            text = ", ".join(rng.sample(FRASES, rng.randint(1, 3)))
+            speaker = rng.choice(FALANTES)
+        lines.append(f"[{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}] {speaker}: {text.capitalize()}.")
+        words += len(text.split())
+    return f"{name}\n" + "\n".join(lines)
+
+
+def install_fake_model() -> None:
+    async def fake_agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = "\n".join(str(message.content) for message in messages)
+        prompt_tokens = count_tokens(prompt)
+        kind = next((key for key in FAKE_COMPLETION if key in str(messages[-1].content)[-80:]), "status")
+        completion_tokens = FAKE_COMPLETION[kind]
+        fixed, per_1k_input, per_output = FAKE_LATENCY.get(self.model_name, FAKE_LATENCY["gpt-4o"])
+        await asyncio.sleep(fixed + prompt_tokens / 1000 * per_1k_input + completion_tokens * per_output)
+        message = AIMessage(
+            content="- resumo " * (completion_tokens // 3),
+            usage_metadata={
+                "input_tokens": prompt_tokens,
+                "output_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            },
+            response_metadata={"model_name": self.model_name}
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    # Nenhuma chamada real à OpenAI é feita no modo --fake
+    ChatOpenAI._agenerate = fake_agenerate
+
+
+def token_snapshot() -> dict:
+    """Tokens acumulados por (modelo, tipo) em todos os estágios do status do cliente"""
+    totals = {}
+    for (agent, model, kind), value in list(LLM_TOKENS._values.items()):
+        if agent.startswith("company_status"):
+            totals[(model, kind)] = totals.get((model, kind), 0) + value
+    return totals
+
+
+def cost(tokens: dict) -> float:
+    total = 0.0
+    for (model, kind), value in tokens.items():
+        base_model = "gpt-4o-mini" if model.startswith("gpt-4o-mini") else "gpt-4o"
+        input_price, output_price = PRICES[base_model]
+        if kind == "prompt":
+            total += value * input_price / 1_000_000
+        elif kind == "completion":
+            total += value * output_price / 1_000_000
+    return total
+
+
+async def run(agent: CompanyStatusAgent, transcripts: dict, digest: bool, repeat: int):
+    latencies = []
+    before = token_snapshot()
+    status = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        status = await agent.generate_company_status(
+            company_name="Loja Sintética",
+            plan="Intermediário",
+            digest=digest,
+            **transcripts
+        )
+        latencies.append(time.perf_counter() - start)
+    after = token_snapshot()
+    tokens = {key: (value - before.get(key, 0)) / repeat for key, value in after.items()}
+    return latencies, tokens, status
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=int, default=120, help="Duração simulada de cada reunião")
+    parser.add_argument("--budget", type=int, default=None, help="COMPANY_STATUS_TOKEN_BUDGET")
+    parser.add_argument("--chunk-tokens", type=int, default=None, help="COMPANY_STATUS_CHUNK_TOKENS")
+    parser.add_argument("--concurrency", type=int, default=None, help="COMPANY_STATUS_DIGEST_CONCURRENCY")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--real", action="store_true", help="Usa a OpenAI em vez do modelo simulado")
+    args = parser.parse_args()
+
+    for flag, env in ((args.budget, "COMPANY_STATUS_TOKEN_BUDGET"),
+                      (args.chunk_tokens, "COMPANY_STATUS_CHUNK_TOKENS"),
+                      (args.concurrency, "COMPANY_STATUS_DIGEST_CONCURRENCY")):
+        if flag is not None:
+            os.environ[env] = str(flag)
+    get_settings.cache_clear()
+    if not args.real:
+        install_fake_model()
+
+    transcripts = {
+        "commercial_transcript": build_transcript("Reunião Comercial", args.minutes, 1),
+        "onboarding_transcript": build_transcript("Reunião de Onboarding", args.minutes, 2),
+        "discovery_transcript": build_transcript("Reunião de Discovery", args.minutes, 3),
+    }
+    agent = CompanyStatusAgent()
+    sizes = ", ".join(f"{count_tokens(text)}" for text in transcripts.values())
+    print(
+        f"Transcrições de {args.minutes} min: {sizes} tokens | orçamento {agent.token_budget}, "
+        f"trechos de {agent.chunk_tokens}, {agent.digest_concurrency} em paralelo, "
+        f"modelo barato {agent.digest_llm.model_name} ({'OpenAI' if args.real else 'simulado'})\n"
+    )
+
+    print(f"{'caminho':>12} | {'p50 (s)':>7} | {'entrada':>8} | {'saída':>6} | {'custo (US$)':>11} | fatos")
+    results = {}
+    for label, digest in (("chamada_unica", False), ("map_reduce", True)):
+        latencies, tokens, status = asyncio.run(run(agent, transcripts, digest, args.repeat))
+        results[label] = (statistics.median(latencies), cost(tokens))
+        prompt_tokens = sum(value for (_, kind), value in tokens.items() if kind == "prompt")
+        completion_tokens = sum(value for (_, kind), value in tokens.items() if kind == "completion")
+        if args.real:
+            normalized = status.lower()
+            found = sum(all(term in normalized for term in terms) for _, terms in FATOS)
+            facts = f"{found}/{len(FATOS)}"
+        else:
+            facts = "-"
+        print(
+            f"{label:>12} | {results[label][0]:7.2f} | {prompt_tokens:8.0f} | {completion_tokens:6.0f} | "
+            f"{results[label][1]:11.4f} | {facts}"
+        )
+
+    single, mapped = results["chamada_unica"], results["map_reduce"]
+    print(f"\nLatência: {single[0] / mapped[0]:.2f}x | custo: {mapped[1] / single[1]:.2f}x do caminho de chamada única")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark lado a lado dos modos "padrao" (três chamadas sequenciais) e "rapido" (uma chamada
+estruturada) dos workflows de copy, medindo latência e consumo de tokens.
+
+Faz chamadas reais à OpenAI (requer OPENAI_API_KEY). O cache de estágios é desativado para
+que o modo padrão sempre execute as três etapas.
+
+Uso:
+    python src/scripts/benchmark_copy_modes.py --canal whatsapp --runs 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# Configura o path do projeto corretamente
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+sys.path.insert(0, project_root)
+
+os.environ["STAGE_CACHE_BACKEND"] = "none"
+
+from langchain_community.callbacks import get_openai_callback
+
+from src.core.workflows.copy_wpp_workflow import CopyWhatsappWorkflow
+from src.core.workflows.copy_sms_workflow import CopySmsWorkflow
+
+CENARIOS = [
+    {"objetivo_copy": "Recuperar carrinhos abandonados", "tom_de_voz": "informal",
+     "publico_alvo": "clientes que abandonaram o carrinho nas últimas 24h", "segmento_loja": "moda"},
+    {"objetivo_copy": "Divulgar a coleção de Dia das Mães", "tom_de_voz": "afetuoso",
+     "publico_alvo": "clientes recorrentes", "segmento_loja": "cosméticos"},
+    {"objetivo_copy": "Reativar clientes inativos com cupom", "tom_de_voz": "direto",
+     "publico_alvo": "clientes sem compra há 90 dias", "segmento_loja": "eletrônicos"},
+]
+
+
+async def run_mode(workflow, modo_rapido: bool, runs: int):
+    latencies, prompt_tokens, completion_tokens = [], [], []
+    for i in range(runs):
+        cenario = CENARIOS[i % len(CENARIOS)]
+        with get_openai_callback() as cb:
+            start = time.perf_counter()
+            await workflow.execute(**cenario, modo_rapido=modo_rapido)
+            latencies.append(time.perf_counter() - start)
+        prompt_tokens.append(cb.prompt_tokens)
+        completion_tokens.append(cb.completion_tokens)
+    return latencies, prompt_tokens, completion_tokens
+
+
+async def benchmark(canal: str, runs: int):
+    workflow = CopyWhatsappWorkflow() if canal == "whatsapp" else CopySmsWorkflow()
+
+    print(f"{'modo':>8} | {'p50 (s)':>8} | {'média (s)':>9} | {'prompt tok':>10} | {'compl. tok':>10}")
+    for modo_rapido, label in ((False, "padrao"), (True, "rapido")):
+        latencies, prompt_tokens, completion_tokens = await run_mode(workflow, modo_rapido, runs)
+        print(
+            f"{label:>8} | {statistics.median(latencies):8.2f} | {statistics.mean(latencies):9.2f} | "
+            f"{statistics.mean(prompt_tokens):10.0f} | {statistics.mean(completion_tokens):10.0f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--canal", choices=["whatsapp", "sms"], default="whatsapp")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    asyncio.run(benchmark(args.canal, args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Benchmark de requisições/segundo dos endpoints de copy antes e depois do registro de agentes.
+
+Compara dois modos, com as chamadas à OpenAI substituídas por um stub (latência configurável):
+- por_requisicao: comportamento antigo, cada requisição cria um ChatOpenAI avulso, o workflow e os três agentes
+  na construção original (ChatOpenAI próprio + agente de tool calling sem ferramentas executado por um
+  AgentExecutor), a mesma reproduzida em benchmark_agent_overhead.py
+- registro: workflows e agentes criados uma única vez no startup (AgentRegistry) e injetados via Depends
+
+O app do benchmark é mínimo: só a rota de copy para WhatsApp e um lifespan que constrói o
+AgentRegistry com a base de conhecimento (Chroma) e o runner de jobs do plano substituídos por
+stubs, sem warm-up de embeddings nem workers em background durante a medição.
+
+Uso:
+    python src/scripts/benchmark_copy_registry.py --requests 500 --concurrency 20 --latency-ms 0
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from contextlib import redirect_stdout
+
+# Configura o path do projeto corretamente
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+sys.path.insert(0, project_root)
+
+# O limitador client-side de RPM/TPM não deve interferir na medição do overhead de setup
+os.environ.setdefault("OPENAI_RPM_LIMIT", "100000000")
+os.environ.setdefault("OPENAI_TPM_LIMIT", "100000000000")
+# Sem cache de estágios, para que os dois modos executem os três agentes em toda requisição
+os.environ.setdefault("STAGE_CACHE_BACKEND", "none")
+
+from contextlib import asynccontextmanager
+
+import httpx
+from fastapi import FastAPI
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_openai import ChatOpenAI
+
+from src.api.routes.copy_wpp_controller import router as copy_wpp_router
+from src.config import dependencies
+from src.config.auth import get_current_user
+from src.config.dependencies import AgentRegistry, get_copy_wpp_workflow
+from src.config.settings import Settings
+from src.core.prompts.copywriter_prompt import COPYWRITER_TEMPLATE
+from src.core.prompts.prompt_builder_prompt import PROMPT_BUILDER_TEMPLATE
+from src.core.prompts.variable_suggester_prompt import VARIABLE_SUGGESTER_TEMPLATE
+from src.core.utils.openai_clients import close_http_clients
+from src.scripts.benchmark_agent_overhead import build_executor
+
+PAYLOAD = {
+    "objetivo_copy": "Recuperar carrinhos abandonados",
+    "tom_de_voz": "informal",
+    "publico_alvo": "clientes recorrentes",
+    "segmento_loja": "moda"
+}
+
+
+class StubKnowledgeBase:
+    """Base de conhecimento vazia: o benchmark não carrega o Chroma nem chama a API de embeddings"""
+    loaded = False
+    tools = []
+    retriever = None
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def load(self) -> "StubKnowledgeBase":
+        return self
+
+
+class StubJobStore:
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+class StubJobRunner:
+    """Runner de jobs do plano sem workers nem banco: a rota de copy não o utiliza"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+# O AgentRegistry é o mesmo da API, mas sem as dependências do plano de ação que fazem I/O no startup
+dependencies.ZoppyKnowledgeBase = StubKnowledgeBase
+dependencies.PlanActionJobStore = StubJobStore
+dependencies.PlanActionJobRunner = StubJobRunner
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.registry = AgentRegistry()
+    yield
+    await close_http_clients()
+
+
+app = FastAPI(lifespan=lifespan)
+app.include_router(copy_wpp_router, prefix="/api")
+
+
+class BaselineAgent:
+    """Agente antigo: Settings e ChatOpenAI próprios e um AgentExecutor novo a cada chamada"""
+
+    def __init__(self, template):
+        settings = Settings()
+        self.llm = ChatOpenAI(model="gpt-4o", temperature=0.2, api_key=settings.OPENAI_API_KEY, seed=settings.SEED)
+        self.template = template
+
+    async def run(self, **inputs) -> str:
+        result = await build_executor(self.llm, self.template).ainvoke(inputs)
+        return result["output"]
+
+
+class BaselineCopyWhatsappWorkflow:
+    """CopyWhatsappWorkflow antigo: os três agentes são criados junto com o workflow e executados em sequência"""
+
+    def __init__(self, llm=None):
+        self.prompt_builder = BaselineAgent(PROMPT_BUILDER_TEMPLATE)
+        self.variable_suggester = BaselineAgent(VARIABLE_SUGGESTER_TEMPLATE)
+        self.copywriter = BaselineAgent(COPYWRITER_TEMPLATE)
+
+    async def execute(self, objetivo_copy: str, tom_de_voz: str, publico_alvo: str, segmento_loja: str,
+                      modo_rapido: bool = False) -> dict:
+        start_time = time.time()
+        run_id = str(uuid.uuid4())
+        prompt_formatado = await self.prompt_builder.run(
+            objetivo_copy=objetivo_copy, tom_de_voz=tom_de_voz, publico_alvo=publico_alvo, segmento_loja=segmento_loja
+        )
+        variaveis_sugeridas = await self.variable_suggester.run(
+            prompt_formatado=prompt_formatado, objetivo_copy=objetivo_copy, tom_de_voz=tom_de_voz,
+            publico_alvo=publico_alvo, segmento_loja=segmento_loja
+        )
+        copy_text = await self.copywriter.run(prompt_formatado=prompt_formatado, variaveis_sugeridas=variaveis_sugeridas)
+        return {
+            "run_id": run_id,
+            "copy_text": copy_text,
+            "tempo_execucao": f"{round(time.time() - start_time, 2)}s",
+            "modo_execucao": "padrao"
+        }
+
+
+def build_workflow_per_request() -> BaselineCopyWhatsappWorkflow:
+    """Reproduz o caminho antigo do controller: LLM avulso e workflow com os agentes antigos a cada requisição"""
+    settings = Settings()
+    llm = ChatOpenAI(model=settings.OPENAI_MODEL_NAME, temperature=0.7)
+    return BaselineCopyWhatsappWorkflow(llm=llm)
+
+
+async def run_mode(mode: str, total: int, concurrency: int) -> float:
+    if mode == "por_requisicao":
+        app.dependency_overrides[get_copy_wpp_workflow] = build_workflow_per_request
+    else:
+        app.dependency_overrides.pop(get_copy_wpp_workflow, None)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def one_request():
+                async with semaphore:
+                    response = await client.post("/api/generate/copy/whatsapp", json=PAYLOAD)
+                    response.raise_for_status()
+
+            # Aquecimento
+            await asyncio.gather(*[one_request() for _ in range(min(concurrency, total))])
+
+            start = time.perf_counter()
+            await asyncio.gather(*[one_request() for _ in range(total)])
+            elapsed = time.perf_counter() - start
+
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latência simulada de cada chamada ao LLM")
+    args = parser.parse_args()
+
+    async def fake_agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(args.latency_ms / 1000)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="ok"))])
+
+    async def fake_astream(self, messages, stop=None, run_manager=None, **kwargs):
+        # O AgentExecutor antigo chama o modelo em modo streaming
+        await asyncio.sleep(args.latency_ms / 1000)
+        yield ChatGenerationChunk(message=AIMessageChunk(content="ok"))
+
+    # Nenhuma chamada real à OpenAI é feita durante o benchmark
+    ChatOpenAI._agenerate = fake_agenerate
+    ChatOpenAI._astream = fake_astream
+    app.dependency_overrides[get_current_user] = lambda: {"role": "bench", "email": "bench@zoppy.com.br"}
+
+    results = {}
+    for mode in ("por_requisicao", "registro"):
+        # O AgentExecutor antigo (verbose=True) e o controller escrevem no stdout: o custo é mantido, a saída descartada
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            results[mode] = asyncio.run(run_mode(mode, args.requests, args.concurrency))
+        print(f"{mode:>15}: {results[mode]:8.1f} req/s")
+
+    print(f"{'ganho':>15}: {results['registro'] / results['por_requisicao']:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Benchmark da busca híbrida da base de conhecimento da Zoppy: vetorial x BM25 x híbrida (RRF).
+
+Usa um conjunto fixo de consultas com termos exatos (integrações, planos, datas comemorativas).
+Um chunk é considerado relevante para a consulta quando contém todos os termos esperados
+(comparação sem acentos e sem diferenciar maiúsculas). Para cada modo mede recall@k, MRR e a
+latência do ranking; também mede a latência ponta a ponta do retriever do agente (rerank local)
+com e sem BM25.
+
+Requer o banco vetorial e o índice BM25 gerados por src/scripts/index_docs.py. As consultas usam
+a API de embeddings (apenas na primeira execução, depois vêm do cache de embeddings).
+
+Uso:
+    python src/scripts/benchmark_hybrid_retrieval.py
+    python src/scripts/benchmark_hybrid_retrieval.py --k 3 5 10 --fetch-k 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# Configura o path do projeto corretamente
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+sys.path.insert(0, project_root)
+
+from src.core.tools.bm25_index import tokenize
+from src.core.tools.local_reranker import LocalRerankRetriever, reciprocal_rank_fusion
+from src.core.tools.zoppy_knowledge_base import ZoppyKnowledgeBase
+
+# (consulta, termos que um chunk relevante precisa conter)
+CONSULTAS = [
+    ("Quais as diferenças entre os planos Básico, Intermediário e Avançado?", ["intermediario"]),
+    ("O que está incluso no plano Avançado?", ["avancado"]),
+    ("Como integrar a Zoppy com a Nuvemshop?", ["nuvemshop"]),
+    ("Integração com VTEX", ["vtex"]),
+    ("A Zoppy integra com Shopify?", ["shopify"]),
+    ("Integração com a Tray", ["tray"]),
+    ("Como funciona o giftback?", ["giftback"]),
+    ("Como funciona o cashback para o cliente final?", ["cashback"]),
+    ("Campanhas para o Dia das Mães", ["dia das maes"]),
+    ("Ações para Black Friday", ["black friday"]),
+    ("Dia dos Namorados no varejo de moda", ["namorados"]),
+    ("Campanhas de Natal e fim de ano", ["natal"]),
+    ("Recuperação de carrinho abandonado", ["carrinho abandonado"]),
+    ("Mensagens de aniversário para clientes", ["aniversario"]),
+]
+
+
+def _normalized(text: str) -> str:
+    return " " + " ".join(tokenize(text)) + " "
+
+
+def relevant_ids(documents: dict, terms: list) -> set:
+    normalized_terms = [_normalized(term) for term in terms]
+    return {
+        doc_id for doc_id, (text, _) in documents.items()
+        if all(term in _normalized(text) for term in normalized_terms)
+    }
+
+
+def evaluate(rankings: dict, relevants: dict, ks: list) -> dict:
+    """recall@k (relevantes recuperados / min(k, relevantes)) e MRR de cada modo"""
+    results = {}
+    for mode, per_query in rankings.items():
+        recalls = {k: [] for k in ks}
+        reciprocal_ranks = []
+        for query, ranking in per_query.items():
+            relevant = relevants[query]
+            if not relevant:
+                continue
+            for k in ks:
+                recalls[k].append(len(relevant & set(ranking[:k])) / min(k, len(relevant)))
+            first_hit = next((i for i, doc_id in enumerate(ranking, start=1) if doc_id in relevant), None)
+            reciprocal_ranks.append(1 / first_hit if first_hit else 0.0)
+        results[mode] = {
+            "recall": {k: statistics.mean(values) if values else 0.0 for k, values in recalls.items()},
+            "mrr": statistics.mean(reciprocal_ranks) if reciprocal_ranks else 0.0,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da busca híbrida (BM25 + vetorial)")
+    parser.add_argument("--k", type=int, nargs="+", default=[3, 5, 10], help="Valores de k do recall@k")
+    parser.add_argument("--fetch-k", type=int, default=20, help="Candidatos buscados por modo antes da fusão")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetições para medir a latência")
+    args = parser.parse_args()
+
+    base = ZoppyKnowledgeBase().load()
+    if not base.loaded or base.bm25 is None:
+        print("Banco vetorial ou índice BM25 indisponível. Execute src/scripts/index_docs.py antes.")
+        sys.exit(1)
+    collection = base.vectordb._collection
+    embeddings = base.vectordb.embeddings
+    fetch_k = max(args.fetch_k, max(args.k))
+    print(f"Chunks: {base.document_count} no Chroma, {len(base.bm25)} no BM25\n")
+
+    relevants = {query: relevant_ids(base.bm25.documents, terms) for query, terms in CONSULTAS}
+    sem_relevantes = [query for query, relevant in relevants.items() if not relevant]
+    if sem_relevantes:
+        print(f"Consultas sem chunks relevantes no corpus (ignoradas no recall): {len(sem_relevantes)}")
+
+    query_embeddings = {query: embeddings.embed_query(query) for query, _ in CONSULTAS}
+
+    def vector_ranking(query):
+        result = collection.query(query_embeddings=[query_embeddings[query]], n_results=fetch_k, include=[])
+        return result["ids"][0]
+
+    def bm25_ranking(query):
+        return [doc_id for doc_id, _ in base.bm25.search(query, k=fetch_k)]
+
+    def hybrid_ranking(query):
+        return [doc_id for doc_id, _ in reciprocal_rank_fusion([vector_ranking(query), bm25_ranking(query)])]
+
+    modes = {"vetorial": vector_ranking, "bm25": bm25_ranking, "hibrida": hybrid_ranking}
+    rankings, latencies = {}, {}
+    for mode, rank in modes.items():
+        rankings[mode] = {query: rank(query) for query, _ in CONSULTAS}
+        samples = []
+        for _ in range(args.repeat):
+            for query, _ in CONSULTAS:
+                start = time.perf_counter()
+                rank(query)
+                samples.append(time.perf_counter() - start)
+        latencies[mode] = samples
+
+    metrics = evaluate(rankings, relevants, args.k)
+    header = " | ".join(f"{f'recall@{k}':>9}" for k in args.k)
+    print(f"{'modo':>8} | {header} | {'MRR':>5} | {'p50 (ms)':>8} | {'p95 (ms)':>8}")
+    for mode in modes:
+        recalls = " | ".join(f"{metrics[mode]['recall'][k]:9.1%}" for k in args.k)
+        samples = sorted(latencies[mode])
+        p95 = samples[int(len(samples) * 0.95) - 1]
+        print(
+            f"{mode:>8} | {recalls} | {metrics[mode]['mrr']:5.2f} | "
+            f"{statistics.median(samples) * 1000:8.2f} | {p95 * 1000:8.2f}"
+        )
+
+    # Latência ponta a ponta do retriever entregue ao agente (embedding da consulta vem do cache)
+    print(f"\n{'retriever':>10} | {'p50 (ms)':>8}")
+    for label, bm25 in (("local", None), ("hibrido", base.bm25)):
+        retriever = LocalRerankRetriever(
+            vectordb=base.vectordb,
+            bm25=bm25,
+            rrf_k=base.settings.KB_RRF_K,
+            fetch_k=base.settings.KB_FETCH_K,
+            top_n=base.settings.KB_TOP_N,
+            min_similarity=base.settings.KB_MIN_SIMILARITY,
+            redundancy_threshold=base.settings.KB_REDUNDANCY_THRESHOLD,
+            max_tokens=base.settings.KB_CONTEXT_MAX_TOKENS
+        )
+        samples = []
+        for query, _ in CONSULTAS:
+            start = time.perf_counter()
+            retriever.invoke(query)
+            samples.append(time.perf_counter() - start)
+        print(f"{label:>10} | {statistics.median(samples) * 1000:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
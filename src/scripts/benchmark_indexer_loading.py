@@ -0,0 +1,135 @@
+"""
+Benchmark do carregamento e divisão paralelos da indexação (ZoppyDocsIndexer.iter_load_and_split).
+
+Gera um corpus sintético de PDFs e DOCX num diretório temporário e mede o tempo total de
+carregar e dividir todos os arquivos com diferentes números de processos no pool. Não cria o
+banco vetorial nem chama a OpenAI.
+
+Requer os pacotes dos loaders (pypdf para PDF, docx2txt para DOCX).
+
+Uso:
+    python src/scripts/benchmark_indexer_loading.py
+    python src/scripts/benchmark_indexer_loading.py --pdfs 300 --docx 300 --pages 8 --workers 1 2 4 8
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Configura o path do projeto corretamente
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+sys.path.insert(0, project_root)
+
+from docx import Document as DocxDocument
+
+from src.core.tools.index_zoppy_docs import ZoppyDocsIndexer
+
+PALAVRAS = (
+    "cashback cliente campanha whatsapp loja varejo recompra ticket medio segmentacao cupom "
+    "integracao plataforma carrinho abandonado fidelidade aniversario reativacao conversao "
+    "faturamento estrategia jornada mensagem envio automacao relatorio"
+).split()
+
+
+def _paragrafo(rng: random.Random, palavras: int = 60) -> str:
+    return " ".join(rng.choice(PALAVRAS) for _ in range(palavras)).capitalize() + "."
+
+
+def write_pdf(path: str, pages: int, rng: random.Random) -> None:
+    """Escreve um PDF mínimo (texto em Helvetica) sem depender de bibliotecas de geração de PDF"""
+    objects = []
+    page_ids = [3 + 2 * i for i in range(pages)]
+    font_id = 3 + 2 * pages
+    objects.append("<< /Type /Catalog /Pages 2 0 R >>")
+    objects.append(f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {pages} >>")
+    for page_id in page_ids:
+        lines = []
+        for _ in range(40):
+            text = " ".join(rng.choice(PALAVRAS) for _ in range(12))
+            lines.append(f"({text}) Tj T*")
+        stream = "BT /F1 10 Tf 12 TL 40 800 Td " + " ".join(lines) + " ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {page_id + 1} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref_offset = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for offset in offsets:
+        output += f"{offset:010d} 00000 n \n".encode("latin-1")
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("latin-1")
+    with open(path, "wb") as f:
+        f.write(output)
+
+
+def write_docx(path: str, paragraphs: int, rng: random.Random) -> None:
+    document = DocxDocument()
+    for i in range(paragraphs):
+        if i % 10 == 0:
+            document.add_heading(f"Seção {i // 10 + 1}", level=2)
+        document.add_paragraph(_paragrafo(rng))
+    document.save(path)
+
+
+def build_corpus(directory: str, pdfs: int, docx: int, pages: int) -> None:
+    rng = random.Random(42)
+    for i in range(pdfs):
+        write_pdf(os.path.join(directory, f"doc_{i:04d}.pdf"), pages, rng)
+    for i in range(docx):
+        write_docx(os.path.join(directory, f"doc_{i:04d}.docx"), pages * 10, rng)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do carregamento paralelo da indexação")
+    parser.add_argument("--pdfs", type=int, default=200, help="Quantidade de PDFs sintéticos")
+    parser.add_argument("--docx", type=int, default=200, help="Quantidade de DOCX sintéticos")
+    parser.add_argument("--pages", type=int, default=5, help="Páginas por PDF (DOCX com 10 parágrafos por página)")
+    parser.add_argument("--workers", type=int, nargs="+", default=None, help="Números de processos a comparar")
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    workers_list = args.workers or sorted({1, 2, 4, cpus})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        docs_dir = os.path.join(tmp, "docs")
+        os.makedirs(docs_dir)
+        start = time.perf_counter()
+        build_corpus(docs_dir, args.pdfs, args.docx, args.pages)
+        print(f"Corpus: {args.pdfs} PDFs + {args.docx} DOCX gerados em {time.perf_counter() - start:.1f}s ({cpus} CPUs)\n")
+
+        print(f"{'workers':>7} | {'tempo (s)':>9} | {'arquivos/s':>10} | {'chunks':>7} | {'erros':>5} | {'speedup':>7}")
+        baseline = None
+        for workers in workers_list:
+            indexer = ZoppyDocsIndexer(vector_store_path=os.path.join(tmp, "vectorstorage"), workers=workers)
+            indexer.docs_directories = [docs_dir]
+            files = indexer.discover_files()
+
+            start = time.perf_counter()
+            chunks = errors = 0
+            first_error = None
+            for file_key, file_chunks, error in indexer.iter_load_and_split(files):
+                chunks += len(file_chunks)
+                if error is not None:
+                    errors += 1
+                    first_error = first_error or f"{file_key}: {error}"
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(
+                f"{workers:>7} | {elapsed:9.2f} | {len(files) / elapsed:10.1f} | {chunks:>7} | "
+                f"{errors:>5} | {baseline / elapsed:6.2f}x"
+            )
+            if first_error:
+                print(f"        primeiro erro: {first_error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark dos compressores da base de conhecimento da Zoppy: "llm" (LLMChainExtractor, uma chamada
+ao GPT-4o por documento recuperado) versus "local" (rerank por embeddings, sem chamadas ao LLM).
+
+Para cada consulta mede a latência da recuperação, os tokens gastos com o LLM, o tamanho do
+contexto devolvido ao agente e a sobreposição (palavras) entre os contextos dos dois modos.
+Com --plan-request, também gera o plano de ação completo com cada compressor.
+
+Faz chamadas reais à OpenAI (requer OPENAI_API_KEY e o banco vetorial indexado).
+
+Uso:
+    python src/scripts/benchmark_kb_compressor.py
+    python src/scripts/benchmark_kb_compressor.py --plan-request payload_plano.json
+"""
+import argparse
+import asyncio
+import datetime as dt
+import json
+import os
+import re
+import statistics
+import sys
+import time
+
+# Configura o path do projeto corretamente
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+sys.path.insert(0, project_root)
+
+from langchain_community.callbacks import get_openai_callback
+
+from src.core.agents.plan_action_90d_agent import PlanAction90dAgent
+from src.core.tools.zoppy_knowledge_base import ZoppyKnowledgeBase
+from src.core.utils.tokens import count_tokens
+from src.core.workflows.generate_action_plan_workflow import GenerateActionPlanWorkflow
+
+CONSULTAS = [
+    "Como funciona o cashback da Zoppy?",
+    "Integrações disponíveis com plataformas de e-commerce",
+    "Boas práticas de campanhas de WhatsApp para varejo de moda",
+    "Datas comemorativas relevantes para o segundo semestre",
+    "Como configurar a recuperação de carrinho abandonado",
+    "Segmentação de clientes inativos e reativação",
+]
+
+
+def _words(text: str) -> set:
+    return set(re.findall(r"\w{3,}", text.lower()))
+
+
+async def benchmark_retrieval(bases: dict):
+    contexts = {mode: [] for mode in bases}
+    print(f"{'modo':>6} | {'p50 (s)':>8} | {'média (s)':>9} | {'tokens LLM':>10} | {'tokens contexto':>15}")
+    for mode, base in bases.items():
+        latencies, llm_tokens, context_tokens = [], [], []
+        for consulta in CONSULTAS:
+            with get_openai_callback() as cb:
+                start = time.perf_counter()
+                documents = await base.retriever.ainvoke(consulta)
+                latencies.append(time.perf_counter() - start)
+            context = "\n\n".join(doc.page_content for doc in documents)
+            contexts[mode].append(context)
+            llm_tokens.append(cb.total_tokens)
+            context_tokens.append(count_tokens(context))
+        print(
+            f"{mode:>6} | {statistics.median(latencies):8.2f} | {statistics.mean(latencies):9.2f} | "
+            f"{statistics.mean(llm_tokens):10.0f} | {statistics.mean(context_tokens):15.0f}"
+        )
+
+    # Quanto do que o extrator LLM considerou relevante também aparece no contexto local
+    coberturas, jaccards = [], []
+    for llm_context, local_context in zip(contexts["llm"], contexts["local"]):
+        llm_words, local_words = _words(llm_context), _words(local_context)
+        if llm_words:
+            coberturas.append(len(llm_words & local_words) / len(llm_words))
+        if llm_words | local_words:
+            jaccards.append(len(llm_words & local_words) / len(llm_words | local_words))
+    if coberturas:
+        print(f"\nCobertura do contexto LLM pelo local: {statistics.mean(coberturas):.1%}")
+    if jaccards:
+        print(f"Jaccard médio entre os contextos:     {statistics.mean(jaccards):.1%}")
+
+
+async def benchmark_plan(bases: dict, payload_path: str):
+    with open(payload_path, encoding="utf-8") as f:
+        payload = json.load(f)
+    payload["current_date"] = dt.datetime.now().strftime("%d/%m/%Y")
+
+    print(f"\n{'modo':>6} | {'plano (s)':>9} | {'tokens prompt':>13} | {'tokens compl.':>13}")
+    for mode, base in bases.items():
+        workflow = GenerateActionPlanWorkflow(plan_action_90d_agent=PlanAction90dAgent(knowledge_base=base))
+        with get_openai_callback() as cb:
+            start = time.perf_counter()
+            await workflow.execute(**payload)
+            elapsed = time.perf_counter() - start
+        print(f"{mode:>6} | {elapsed:9.1f} | {cb.prompt_tokens:13d} | {cb.completion_tokens:13d}")
+
+
+async def main_async(plan_request: str):
+    bases = {mode: ZoppyKnowledgeBase(compressor=mode).load() for mode in ("llm", "local")}
+    for mode, base in bases.items():
+        if not base.loaded or base.document_count == 0:
+            print(f"Base de conhecimento indisponível ou vazia ({mode}): {base.stats()}")
+            return
+
+    await benchmark_retrieval(bases)
+    if plan_request:
+        await benchmark_plan(bases, plan_request)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plan-request", default="", help="JSON no formato do PlanAction90dRequest")
+    args = parser.parse_args()
+
+    asyncio.run(main_async(args.plan_request))
+
+
+if __name__ == "__main__":
+    main()
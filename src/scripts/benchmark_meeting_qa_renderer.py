@@ -0,0 +1,128 @@
+"""
+Relatório de tokens das perguntas e respostas estruturadas das reuniões no prompt do plano de ação.
+
+Compara, em payloads de exemplo (pequeno, típico e extenso), os tokens (tiktoken) de cada reunião
+no formato antigo — o repr da lista de MeetingTranscriptQA interpolado direto no prompt — com o
+formato compacto do MeetingQARenderer, sem limite e com o limite por reunião. Não chama a OpenAI.
+
+Uso:
+    python src/scripts/benchmark_meeting_qa_renderer.py
+    python src/scripts/benchmark_meeting_qa_renderer.py --budget 800 --show tipico
+"""
+import argparse
+import os
+import random
+import sys
+
+# Configura o path do projeto corretamente
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+sys.path.insert(0, project_root)
+
+from src.api.requests.plan_action_90d_request import MeetingTranscriptQA
+from src.config.settings import get_settings
+from src.core.tools.meeting_qa_renderer import MEETING_SECTIONS, MeetingQARenderer
+from src.core.utils.tokens import count_tokens
+
+# Perguntas do roteiro e respostas possíveis; parte delas é feita de novo nas reuniões seguintes
+ROTEIRO = [
+    ("Qual a plataforma de e-commerce da loja?", ["Nuvemshop", "Shopify, migrando para a VTEX no ano que vem"]),
+    ("Qual o ERP utilizado?", ["Bling", "Tiny, integrado à Nuvemshop"]),
+    ("Qual o faturamento mensal médio?", ["Em torno de R$ 480 mil", "Entre R$ 150 e 200 mil, com pico em novembro"]),
+    ("Quantos clientes há na base?", ["Cerca de 35 mil clientes, 60% com telefone válido"]),
+    ("Quem cuida do marketing hoje?", ["Duas pessoas no time interno, sem agência", "Uma agência externa e a sócia"]),
+    ("Vocês usam a API oficial do WhatsApp?", [
+        "Não. O cliente disse \"não quero a API oficial de jeito nenhum\", prefere o número atual da loja",
+        "Ainda não, mas está aberto a migrar se o custo por conversa compensar"
+    ]),
+    ("Quais canais de venda além do site?", ["Loja física em Curitiba e marketplace (Mercado Livre)"]),
+    ("Qual o ticket médio?", ["R$ 189", "R$ 240 no site e R$ 310 na loja física"]),
+    ("Qual a taxa de recompra?", ["Não sabem medir hoje; estimam 'uns 20%'"]),
+    ("Já usaram ferramentas de automação?", [
+        "Testaram RD Station e uma ferramenta de disparo em massa, mas cancelaram por falta de acompanhamento\n"
+        "e porque os disparos caíam em bloqueio no WhatsApp"
+    ]),
+    ("Há restrições de horário para os disparos?", ["Somente depois das 18h e nunca aos domingos"]),
+    ("Qual o principal objetivo para os próximos 90 dias?", [
+        "Reativar 15% da base inativa e aumentar a recompra sem depender de desconto agressivo"
+    ]),
+    ("Pretendem ativar o giftback?", ["Não agora; talvez no ano que vem", "Sim, com 10% de crédito e validade de 30 dias"]),
+    ("Quais as datas mais importantes para a loja?", ["Dia das Mães, Black Friday e Natal"]),
+    ("Como é a política de trocas?", ["Troca em até 30 dias, frete grátis na primeira troca"]),
+]
+DETALHES = [
+    "Comentou que a equipe é pequena e que qualquer processo novo precisa ser simples de operar no dia a dia.",
+    "Reforçou que a prioridade é não desgastar a base com excesso de mensagens promocionais.",
+    "Mencionou que o painel atual não mostra o resultado por campanha, só o faturamento total.",
+    "Disse que a sócia aprova todas as comunicações antes do envio, o que atrasa as campanhas.",
+]
+
+
+def build_payload(questions: int, detail: int, seed: int) -> dict:
+    """
+    Payload de exemplo: cada reunião repete parte das perguntas das anteriores (algumas com a
+    mesma resposta, outras com a resposta atualizada) e adiciona `detail` frases às respostas.
+    """
+    rng = random.Random(seed)
+    payload = {}
+    previous = []
+    for section in MEETING_SECTIONS:
+        items = []
+        repeated = rng.sample(previous, min(len(previous), questions // 3))
+        for question, answer in repeated:
+            if rng.random() < 0.3:
+                answer = rng.choice(dict(ROTEIRO)[question])
+            items.append((question, answer))
+        for question, answers in rng.sample(ROTEIRO * 3, questions - len(items)):
+            answer = rng.choice(answers)
+            if detail:
+                answer += " " + " ".join(rng.sample(DETALHES, min(detail, len(DETALHES))))
+            items.append((question, answer))
+        previous = items
+        payload[section] = [
+            MeetingTranscriptQA(question=f"{number}. {question}", answer=answer)
+            for number, (question, answer) in enumerate(items, start=1)
+        ]
+    return payload
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Relatório de tokens das perguntas e respostas das reuniões")
+    parser.add_argument("--budget", type=int, default=None, help="PLAN_MEETING_QA_TOKEN_BUDGET por reunião")
+    parser.add_argument("--show", default=None, help="Imprime o texto compacto de um payload (pequeno, tipico, extenso)")
+    args = parser.parse_args()
+
+    budget = args.budget if args.budget is not None else get_settings().PLAN_MEETING_QA_TOKEN_BUDGET
+    payloads = {
+        "pequeno": build_payload(questions=5, detail=0, seed=1),
+        "tipico": build_payload(questions=15, detail=1, seed=2),
+        "extenso": build_payload(questions=40, detail=4, seed=3),
+    }
+    unlimited = MeetingQARenderer(0)
+    limited = MeetingQARenderer(budget)
+
+    print(f"Tokens por reunião: repr da lista x compacto x compacto com limite de {budget} tokens\n")
+    print(f"{'payload':>8} | {'reunião':>18} | {'itens':>5} | {'repr':>6} | {'compacto':>8} | {'limite':>6} | redução")
+    for name, payload in payloads.items():
+        compact = unlimited.render(payload)
+        bounded = limited.render(payload)
+        totals = [0, 0, 0]
+        for section, items in payload.items():
+            # O prompt interpolava a lista diretamente, ou seja, o str() da lista de modelos pydantic
+            row = [count_tokens(str(items)), count_tokens(compact[section]), count_tokens(bounded[section])]
+            totals = [total + value for total, value in zip(totals, row)]
+            print(
+                f"{name:>8} | {MEETING_SECTIONS[section]:>18} | {len(items):5} | {row[0]:6} | {row[1]:8} | "
+                f"{row[2]:6} | {1 - row[2] / row[0]:7.1%}"
+            )
+        print(
+            f"{name:>8} | {'total':>18} | {'':5} | {totals[0]:6} | {totals[1]:8} | {totals[2]:6} | "
+            f"{1 - totals[2] / totals[0]:7.1%}"
+        )
+
+    if args.show in payloads:
+        for section, text in limited.render(payloads[args.show]).items():
+            print(f"\n## {MEETING_SECTIONS[section]}\n{text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Benchmark da normalização das transcrições (TranscriptNormalizer) por nível de agressividade.
+
+Gera transcrições sintéticas no formato dos gravadores de reunião (marcas de tempo, nomes dos
+falantes, vícios de linguagem, saudações repetidas, respostas curtas e linhas duplicadas) e mede,
+para cada nível, a vazão em MB/s, os tokens antes e depois (tiktoken) e se os fatos plantados no
+meio da conversa continuam presentes no texto normalizado. Não chama a OpenAI.
+
+Uso:
+    python src/scripts/benchmark_transcript_normalizer.py
+    python src/scripts/benchmark_transcript_normalizer.py --minutes 120 --transcripts 6 --format vtt
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+# Configura o path do projeto corretamente
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+sys.path.insert(0, project_root)
+
+from src.core.tools.transcript_normalizer import LEVELS, TranscriptNormalizer
+from src.core.utils.tokens import count_tokens
+
+FALANTES = ["Consultor de Sucesso Zoppy", "Mariana Albuquerque (Loja Sintética)"]
+FRASES = [
+    "então a gente tem uma base grande de clientes que compraram uma vez e nunca mais voltaram",
+    "hoje o time de marketing é pequeno, são duas pessoas cuidando de tudo",
+    "a ideia é conseguir aumentar a recompra sem depender só de desconto",
+    "vocês conseguem mostrar como fica a jornada depois da primeira compra?",
+    "no fim de semana o movimento da loja física é bem maior",
+    "a gente já testou algumas ferramentas de disparo mas não teve acompanhamento",
+    "e como vocês medem o resultado das campanhas?",
+    "o ticket médio caiu um pouco no último trimestre",
+    "deixa eu compartilhar a tela para mostrar o painel",
+    "quanto tempo leva para a integração ficar pronta?",
+]
+VICIOS = ["né", "ahn", "tipo assim", "então assim", "hum", "éé"]
+SAUDACOES = ["Bom dia, tudo bem?", "Oi, tudo bom?", "Boa tarde, pessoal!", "Obrigado!", "Valeu, tchau"]
+CURTAS = ["Ok", "Uhum", "Certo", "Entendi", "Sim", "Tá bom"]
+# (fato, termos que precisam continuar no texto normalizado)
+FATOS = [
+    ("não quero usar a API oficial do WhatsApp de jeito nenhum", ["api oficial"]),
+    ("não queremos ativar o giftback agora", ["giftback"]),
+    ("a loja roda na Nuvemshop e o ERP é o Bling", ["nuvemshop", "bling"]),
+    ("o faturamento mensal está em torno de 480 mil reais", ["480 mil"]),
+    ("os disparos só podem acontecer depois das 18 horas", ["18 horas"]),
+]
+
+
+def _com_vicios(rng: random.Random, frase: str) -> str:
+    palavras = frase.split()
+    for _ in range(rng.randint(0, 2)):
+        palavras.insert(rng.randrange(len(palavras) + 1), rng.choice(VICIOS) + ",")
+    if rng.random() < 0.2:
+        i = rng.randrange(len(palavras))
+        palavras.insert(i, palavras[i])
+    return " ".join(palavras).capitalize()
+
+
+def build_transcript(minutes: int, seed: int, formato: str) -> str:
+    """Transcrição sintética com ~140 palavras por minuto no formato de gravador escolhido"""
+    rng = random.Random(seed)
+    falas = [(FALANTES[0], SAUDACOES[0]), (FALANTES[1], SAUDACOES[1])]
+    palavras = 0
+    alvo = minutes * 140
+    posicoes_fatos = {int(alvo * (i + 1) / (len(FATOS) + 1)): fato for i, (fato, _) in enumerate(FATOS)}
+    proximos = sorted(posicoes_fatos)
+    while palavras < alvo:
+        sorteio = rng.random()
+        if proximos and palavras >= proximos[0]:
+            falas.append((FALANTES[1], posicoes_fatos[proximos.pop(0)].capitalize()))
+        elif sorteio < 0.15:
+            falas.append((rng.choice(FALANTES), rng.choice(CURTAS)))
+        elif sorteio < 0.18:
+            falas.append((rng.choice(FALANTES), rng.choice(SAUDACOES)))
+        else:
+            # Combina frases e números para que as falas repetidas venham só do gravador
+            frase = ", ".join(rng.sample(FRASES, rng.randint(1, 3)))
+            if rng.random() < 0.5:
+                frase += f", uns {rng.randint(2, 900)} {rng.choice(['pedidos', 'clientes', 'disparos'])} por semana"
+            falas.append((rng.choice(FALANTES), _com_vicios(rng, frase)))
+        # O gravador às vezes repete a mesma linha
+        if rng.random() < 0.05:
+            falas.append(falas[-1])
+        palavras += len(falas[-1][1].split())
+
+    linhas = ["WEBVTT", ""] if formato == "vtt" else []
+    segundos = 0.0
+    for i, (falante, texto) in enumerate(falas, start=1):
+        inicio = segundos
+        segundos += len(texto.split()) / 140 * 60
+        carimbo = f"{int(inicio) // 3600:02d}:{int(inicio) // 60 % 60:02d}:{int(inicio) % 60:02d}"
+        if formato == "vtt":
+            fim = f"{int(segundos) // 3600:02d}:{int(segundos) // 60 % 60:02d}:{int(segundos) % 60:02d}"
+            linhas += [str(i), f"{carimbo}.000 --> {fim}.000", f"{falante}: {texto}", ""]
+        elif formato == "header":
+            linhas += [f"{falante}  {carimbo}", texto, ""]
+        else:
+            linhas.append(f"[{carimbo}] {falante}: {texto}")
+    return "\n".join(linhas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da normalização das transcrições")
+    parser.add_argument("--minutes", type=int, default=120, help="Duração simulada de cada reunião")
+    parser.add_argument("--transcripts", type=int, default=3, help="Quantidade de transcrições")
+    parser.add_argument("--format", choices=["bracket", "vtt", "header"], default="bracket",
+                        help="Formato do gravador: [00:01:02] Nome: fala, WebVTT ou cabeçalho por falante")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetições para medir a vazão")
+    args = parser.parse_args()
+
+    transcripts = [build_transcript(args.minutes, seed, args.format) for seed in range(args.transcripts)]
+    total_bytes = sum(len(text.encode("utf-8")) for text in transcripts)
+    tokens_raw = sum(count_tokens(text) for text in transcripts)
+    print(
+        f"{args.transcripts} transcrições de {args.minutes} min ({args.format}): "
+        f"{total_bytes / 1e6:.2f} MB, {tokens_raw} tokens\n"
+    )
+
+    print(f"{'nível':>10} | {'MB/s':>7} | {'tokens':>8} | {'redução':>7} | fatos")
+    for level in LEVELS:
+        normalizer = TranscriptNormalizer(level)
+        samples = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            outputs = [normalizer.normalize(text) for text in transcripts]
+            samples.append(time.perf_counter() - start)
+        elapsed = statistics.median(samples)
+        tokens = sum(count_tokens(text) for text in outputs)
+        found = sum(
+            all(term in output.casefold() for term in terms) for output in outputs for _, terms in FATOS
+        )
+        throughput = total_bytes / 1e6 / elapsed if elapsed else float("inf")
+        print(
+            f"{level:>10} | {throughput:7.1f} | {tokens:8} | {1 - tokens / tokens_raw:7.1%} | "
+            f"{found}/{len(FATOS) * len(transcripts)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
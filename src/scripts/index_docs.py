@@ -3,6 +3,7 @@ Script para indexar documentos da Zoppy e varejo para uso pelo agente de plano d
 Execute este script antes de iniciar a aplicação para garantir que o banco de dados vetorial
 esteja atualizado.
 """
+import argparse
 import logging
 import sys
 import os
@@ -24,6 +25,13 @@ logger = logging.getLogger(__name__)
 
 def main():
     """Função principal para indexar documentos"""
+    parser = argparse.ArgumentParser(description="Indexação incremental dos documentos da Zoppy")
+    parser.add_argument("--rebuild", action="store_true", help="Apaga o banco vetorial e reindexa todos os arquivos")
+    parser.add_argument("--workers", type=int, default=None, help="Processos para carregar e dividir arquivos")
+    parser.add_argument("--batch-size", type=int, default=None, help="Chunks por lote de embeddings")
+    parser.add_argument("--concurrency", type=int, default=None, help="Lotes de embeddings enviados em paralelo")
+    args = parser.parse_args()
+
     logger.info("Iniciando indexação de documentos da Zoppy e varejo...")
     
     try:
@@ -33,14 +41,23 @@ def main():
         # Garante que o diretório existe
         os.makedirs(vector_store_path, exist_ok=True)
         
-        indexer = ZoppyDocsIndexer(vector_store_path=vector_store_path)
-        indexer.index_documents()
+        indexer = ZoppyDocsIndexer(
+            vector_store_path=vector_store_path,
+            workers=args.workers,
+            embed_batch_size=args.batch_size,
+            embed_concurrency=args.concurrency
+        )
+        diff = indexer.index_documents(rebuild=args.rebuild)
         logger.info("Indexação concluída com sucesso!")
+        print(f"Resumo: {diff.summary()}")
+        for label, files in (("+", diff.added), ("~", diff.changed), ("-", diff.removed), ("!", diff.failed)):
+            for file_key in files:
+                print(f"  {label} {file_key}")
     except Exception as e:
         logger.error(f"Erro durante a indexação: {str(e)}")
         sys.exit(1)
     
-    logger.info("Banco de dados vetorial criado e pronto para uso.")
+    logger.info("Banco de dados vetorial atualizado e pronto para uso.")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
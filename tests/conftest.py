@@ -0,0 +1,12 @@
+import os
+
+# Variáveis obrigatórias do Settings: os testes não chamam a OpenAI, a Tavily nem o banco vetorial
+for name, value in {
+    "OPENAI_API_KEY": "test",
+    "TAVILY_API_KEY": "test",
+    "OPENAI_MODEL_NAME": "gpt-4o",
+    "JWT_SECRET_KEY": "test",
+    "JWT_SECRET_KEY_ALGORITHM": "HS256",
+    "VECTOR_DB_PATH": "/tmp/zoppy-tests-vectorstorage",
+}.items():
+    os.environ.setdefault(name, value)
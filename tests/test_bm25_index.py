@@ -0,0 +1,64 @@
+import pytest
+from langchain_core.documents import Document
+from src.core.tools.bm25_index import BM25Index, tokenize
+from src.core.tools.local_reranker import reciprocal_rank_fusion
+
+
+@pytest.fixture
+def index():
+    index = BM25Index()
+    index.add("cashback", "Cashback Zoppy: devolva parte da compra como crédito para a próxima compra.")
+    index.add("whatsapp", "Campanhas de WhatsApp com cupom de desconto e cashback para clientes inativos.")
+    index.add("planos", "O plano Intermediário inclui automações de WhatsApp e relatórios de vendas.")
+    return index
+
+
+def test_tokenize_remove_acentos_caixa_e_stopwords():
+    assert tokenize("O Plano Intermediário é para você") == ["plano", "intermediario"]
+
+
+def test_busca_ordena_pelo_score_bm25(index):
+    results = index.search("cashback da compra")
+    assert [doc_id for doc_id, _ in results] == ["cashback", "whatsapp"]
+    assert results[0][1] > results[1][1] > 0
+
+
+def test_termo_raro_pesa_mais_que_termo_comum(index):
+    # "whatsapp" aparece em dois chunks e "relatorios" em um só: o chunk com o termo raro vence
+    results = index.search("whatsapp relatórios")
+    assert results[0][0] == "planos"
+
+
+def test_busca_sem_termos_conhecidos_ou_indice_vazio():
+    assert BM25Index().search("cashback") == []
+    index = BM25Index()
+    index.add("a", "cashback")
+    assert index.search("de para") == []
+
+
+def test_remove_e_reindexa_de_forma_incremental(index):
+    index.remove("cashback")
+    assert len(index) == 2
+    assert [doc_id for doc_id, _ in index.search("crédito")] == []
+    index.add("whatsapp", "Crédito de cashback")
+    assert len(index) == 2
+    assert index.search("crédito")[0][0] == "whatsapp"
+    assert "cupom" not in index.postings
+
+
+def test_save_e_load_preservam_o_ranking(index, tmp_path):
+    path = str(tmp_path / "bm25_index.json")
+    index.save(path)
+    loaded = BM25Index.load(path)
+    assert loaded.search("cashback whatsapp") == index.search("cashback whatsapp")
+    assert loaded.get_document("planos") == Document(page_content=index.documents["planos"][0], metadata={})
+    assert BM25Index.load(str(tmp_path / "inexistente.json")) is None
+
+
+def test_rrf_favorece_documentos_bem_posicionados_nas_duas_buscas():
+    vector = ["a", "b", "c"]
+    lexical = ["b", "d", "a"]
+    fused = reciprocal_rank_fusion([vector, lexical], k=60)
+    assert [doc_id for doc_id, _ in fused] == ["b", "a", "d", "c"]
+    assert fused[0][1] == pytest.approx(1 / 62 + 1 / 61)
+    assert fused[2][1] == pytest.approx(1 / 62)
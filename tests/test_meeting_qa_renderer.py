@@ -0,0 +1,67 @@
+import pytest
+from src.api.requests.plan_action_90d_request import MeetingTranscriptQA
+from src.core.tools.meeting_qa_renderer import EMPTY_SECTION, MeetingQARenderer
+from src.core.utils.tokens import count_tokens
+
+
+def qa(question, answer):
+    return MeetingTranscriptQA(question=question, answer=answer)
+
+
+def test_formato_compacto_sem_numeracao_e_sem_perguntas_vazias():
+    rendered = MeetingQARenderer().render({
+        "commercial_meeting": [
+            qa("1. Qual a plataforma?", "Nuvemshop"),
+            qa("2) Qual o faturamento?", ""),
+            {"question": "3 - Usa WhatsApp API?", "answer": "Sim,   pela   Zoppy"},
+        ],
+        "onboarding_meeting": None,
+    })
+    assert rendered == {
+        "commercial_meeting": "P: Qual a plataforma?\nR: Nuvemshop\nP: Usa WhatsApp API?\nR: Sim, pela Zoppy",
+        "onboarding_meeting": EMPTY_SECTION,
+    }
+
+
+def test_remove_perguntas_repetidas_com_a_mesma_resposta():
+    rendered = MeetingQARenderer().render({
+        "commercial_meeting": [qa("Qual a plataforma?", "Nuvemshop"), qa("Qual o ticket médio?", "R$ 180")],
+        "onboarding_meeting": [qa("2. qual a plataforma", "nuvemshop."), qa("Qual o ticket médio?", "R$ 210")],
+        "discovery_meeting": [qa("Qual a plataforma?", "Nuvemshop")],
+    })
+    # A resposta que mudou entre as reuniões é mantida; a repetida vira só uma nota
+    assert rendered["onboarding_meeting"] == (
+        "P: Qual o ticket médio?\nR: R$ 210\n"
+        "(1 pergunta(s) com a mesma resposta de antes omitida(s))"
+    )
+    assert rendered["discovery_meeting"] == "(1 pergunta(s) com a mesma resposta de antes omitida(s))"
+
+
+def test_sem_limite_de_tokens_mantem_tudo():
+    answer = "resposta longa " * 200
+    rendered = MeetingQARenderer(token_budget=0).render({"commercial_meeting": [qa("Pergunta?", answer)]})
+    assert rendered["commercial_meeting"] == f"P: Pergunta?\nR: {answer.strip()}"
+
+
+@pytest.mark.parametrize("budget", [150, 300, 600])
+def test_respeita_o_orcamento_cortando_as_respostas_longas(budget):
+    short = "Nuvemshop com Bling"
+    pairs = [
+        qa("Qual a plataforma?", short),
+        qa("Como é a operação?", "Detalhes da operação da loja e dos canais de venda. " * 40),
+        qa("Quais os objetivos?", "Aumentar a recompra e reativar clientes inativos. " * 40),
+    ]
+    section = MeetingQARenderer(token_budget=budget).render({"commercial_meeting": pairs})["commercial_meeting"]
+    assert count_tokens(section) <= budget
+    # A resposta curta cabe na sua parte do orçamento e segue inteira; as longas são cortadas
+    assert f"R: {short}\n" in section
+    assert section.count("…") == 2
+
+
+def test_omite_as_ultimas_perguntas_quando_nem_as_respostas_minimas_cabem():
+    pairs = [qa(f"Pergunta número {i} sobre a operação da loja?", "Resposta detalhada. " * 30) for i in range(10)]
+    section = MeetingQARenderer(token_budget=200).render({"commercial_meeting": pairs})["commercial_meeting"]
+    assert count_tokens(section) <= 200
+    assert "P: Pergunta número 0 " in section
+    assert "P: Pergunta número 9 " not in section
+    assert section.endswith("pergunta(s) omitida(s) pelo limite de tokens da seção)")
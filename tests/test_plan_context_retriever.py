@@ -0,0 +1,69 @@
+import datetime as dt
+import pytest
+from src.core.tools.plan_context_retriever import (
+    build_queries,
+    commemorative_dates,
+    dates_in_window,
+    parse_current_date,
+)
+
+
+@pytest.mark.parametrize("year, carnival, easter, mothers_day, fathers_day, black_friday", [
+    (2025, dt.date(2025, 3, 4), dt.date(2025, 4, 20), dt.date(2025, 5, 11), dt.date(2025, 8, 10), dt.date(2025, 11, 28)),
+    (2026, dt.date(2026, 2, 17), dt.date(2026, 4, 5), dt.date(2026, 5, 10), dt.date(2026, 8, 9), dt.date(2026, 11, 27)),
+    (2027, dt.date(2027, 2, 9), dt.date(2027, 3, 28), dt.date(2027, 5, 9), dt.date(2027, 8, 8), dt.date(2027, 11, 26)),
+])
+def test_datas_moveis(year, carnival, easter, mothers_day, fathers_day, black_friday):
+    dates = {name: date for date, name in commemorative_dates(year)}
+    assert dates["Carnaval"] == carnival
+    assert dates["Páscoa"] == easter
+    assert dates["Dia das Mães"] == mothers_day
+    assert dates["Dia dos Pais"] == fathers_day
+    assert dates["Black Friday"] == black_friday
+
+
+def test_janela_de_90_dias_atravessa_o_ano():
+    window = dates_in_window(dt.date(2026, 10, 18))
+    assert window == [
+        (dt.date(2026, 11, 27), "Black Friday"),
+        (dt.date(2026, 12, 25), "Natal"),
+        (dt.date(2027, 1, 1), "Ano Novo"),
+    ]
+
+
+def test_parse_current_date_usa_hoje_se_invalida():
+    assert parse_current_date("18/10/2026") == dt.date(2026, 10, 18)
+    assert parse_current_date("2026-10-18") == dt.date.today()
+    assert parse_current_date(None) == dt.date.today()
+
+
+def test_build_queries_ordem_e_funcionalidades_do_status():
+    status = "A loja usa Nuvemshop, quer ativar o Giftback e fazer pós-venda pelo WhatsApp."
+    queries = build_queries(status, "Intermediário", " Moda ", "18/10/2026", max_queries=20)
+    assert queries == [
+        "Funcionalidades, limites e prioridades do plano Intermediário da Zoppy",
+        "Configuração inicial da Zoppy: integrações e canais de comunicação (WhatsApp API, e-mail, SMS)",
+        "Boas práticas e campanhas da Zoppy para o segmento Moda",
+        "Campanhas de Black Friday (27/11) para o segmento Moda",
+        "Campanhas de Natal (25/12) para o segmento Moda",
+        "Campanhas de Ano Novo (01/01) para o segmento Moda",
+        "Giftback: configuração, reativação e boas práticas",
+        "Configuração da API oficial do WhatsApp e campanhas por WhatsApp",
+        "Fluxos de pós-venda na Zoppy",
+        "Integração da Zoppy com Nuvemshop",
+    ]
+
+
+def test_build_queries_sem_segmento_e_com_limite():
+    queries = build_queries("Cliente usa cashback e cashback de novo", "Básico", "", "10/05/2026", max_queries=3)
+    assert queries == [
+        "Funcionalidades, limites e prioridades do plano Básico da Zoppy",
+        "Configuração inicial da Zoppy: integrações e canais de comunicação (WhatsApp API, e-mail, SMS)",
+        "Campanhas de Dia das Mães (10/05) para o segmento varejo",
+    ]
+
+
+def test_build_queries_nao_casa_termo_dentro_de_outra_palavra():
+    queries = build_queries("Atendimento via smsgateway e emailing", "Pro", None, "01/07/2026", max_queries=20)
+    assert "Campanhas de SMS na Zoppy" not in queries
+    assert "Campanhas e templates de e-mail na Zoppy" not in queries
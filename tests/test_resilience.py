@@ -0,0 +1,59 @@
+import httpx
+import pytest
+from openai import APIConnectionError, RateLimitError
+from src.config.settings import get_settings
+from src.core.utils.resilience import compute_retry_delay, parse_reset_duration
+
+
+def rate_limit_error(headers):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, headers=headers, request=request)
+    return RateLimitError("rate limited", response=response, body=None)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("20ms", 0.02),
+    ("1s", 1.0),
+    ("6m0s", 360.0),
+    ("1h2m3.5s", 3723.5),
+    ("2.5", 2.5),
+    ("", None),
+    (None, None),
+    ("agora", None),
+])
+def test_parse_reset_duration(value, expected):
+    result = parse_reset_duration(value)
+    if expected is None:
+        assert result is None
+    else:
+        assert result == pytest.approx(expected)
+
+
+def test_retry_after_ms_tem_prioridade():
+    error = rate_limit_error({"retry-after-ms": "1500", "retry-after": "30", "x-ratelimit-reset-tokens": "1m"})
+    assert compute_retry_delay(error, attempt=0) == pytest.approx(1.5)
+
+
+def test_retry_after_em_segundos_ou_duracao():
+    assert compute_retry_delay(rate_limit_error({"retry-after": "7"}), attempt=0) == pytest.approx(7)
+    assert compute_retry_delay(rate_limit_error({"retry-after": "1m30s"}), attempt=0) == pytest.approx(90)
+
+
+def test_retry_after_ms_invalido_cai_no_retry_after():
+    error = rate_limit_error({"retry-after-ms": "abc", "retry-after": "3"})
+    assert compute_retry_delay(error, attempt=0) == pytest.approx(3)
+
+
+def test_rate_limit_usa_o_maior_reset_mais_jitter():
+    base_delay = get_settings().OPENAI_RETRY_BASE_DELAY
+    error = rate_limit_error({"x-ratelimit-reset-requests": "2s", "x-ratelimit-reset-tokens": "6m0s"})
+    for _ in range(20):
+        assert 360 <= compute_retry_delay(error, attempt=0) <= 360 + base_delay
+
+
+def test_sem_headers_usa_backoff_exponencial_limitado():
+    settings = get_settings()
+    error = APIConnectionError(request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+    for attempt in range(12):
+        ceiling = min(settings.OPENAI_RETRY_MAX_DELAY, settings.OPENAI_RETRY_BASE_DELAY * 2 ** attempt)
+        assert 0 <= compute_retry_delay(error, attempt) <= ceiling
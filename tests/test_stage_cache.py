@@ -0,0 +1,74 @@
+import asyncio
+from src.core.utils import stage_cache
+from src.core.utils.stage_cache import InMemoryStageCache, SqliteStageCache, build_cache_key, normalize_input
+
+
+def test_normalize_input_ignora_espacos_caixa_e_forma_unicode():
+    assert normalize_input("  Loja   da\tMaria\n") == "loja da maria"
+    # "é" composto (NFC) e decomposto (e + acento combinante) geram a mesma entrada
+    assert normalize_input("Café") == normalize_input("Café") == "café"
+
+
+def test_build_cache_key_normaliza_entradas_e_ignora_ordem():
+    key = build_cache_key("v1", company="Loja  X", plan="Pro")
+    assert key == build_cache_key("v1", plan="pro", company=" loja x ")
+    assert key != build_cache_key("v2", company="Loja X", plan="Pro")
+    assert key != build_cache_key("v1", company="Loja Y", plan="Pro")
+
+
+def test_memoria_expira_entradas_pelo_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(stage_cache.time, "time", lambda: now[0])
+    cache = InMemoryStageCache(max_entries=10, ttl_seconds=60)
+
+    async def run():
+        await cache.set("prompt", "k", "saida")
+        now[0] += 59
+        assert await cache.get("prompt", "k") == "saida"
+        now[0] += 2
+        assert await cache.get("prompt", "k") is None
+
+    asyncio.run(run())
+    assert cache.size() == 0
+    assert cache.counters() == {"prompt": {"hits": 1, "misses": 1}}
+
+
+def test_memoria_descarta_a_entrada_menos_usada():
+    cache = InMemoryStageCache(max_entries=2, ttl_seconds=60)
+
+    async def run():
+        await cache.set("prompt", "a", "A")
+        await cache.set("prompt", "b", "B")
+        # Ler "a" a torna a mais recente: a próxima inserção descarta "b"
+        assert await cache.get("prompt", "a") == "A"
+        await cache.set("prompt", "c", "C")
+        return [await cache.get("prompt", key) for key in ("a", "b", "c")]
+
+    assert asyncio.run(run()) == ["A", None, "C"]
+    assert cache.size() == 2
+
+
+def test_sqlite_persiste_entre_instancias_e_respeita_ttl(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(stage_cache.time, "time", lambda: now[0])
+    path = str(tmp_path / "cache" / "stage_cache.sqlite3")
+
+    async def run():
+        cache = SqliteStageCache(path, ttl_seconds=60)
+        await cache.set("status", "k", "saida")
+        cache.close()
+
+        reopened = SqliteStageCache(path, ttl_seconds=60)
+        try:
+            assert await reopened.get("status", "k") == "saida"
+            assert await reopened.get("outro", "k") is None
+            now[0] += 61
+            assert await reopened.get("status", "k") is None
+            stats = reopened.stats()
+        finally:
+            reopened.close()
+        return stats
+
+    stats = asyncio.run(run())
+    assert stats["backend"] == "sqlite"
+    assert stats["stages"]["status"] == {"hits": 1, "misses": 1, "hit_ratio": 0.5}
@@ -0,0 +1,121 @@
+import pytest
+from src.core.tools.transcript_normalizer import (
+    LEVEL_AGGRESSIVE,
+    LEVEL_LIGHT,
+    LEVEL_NONE,
+    LEVEL_STANDARD,
+    LEVELS,
+    TranscriptNormalizer,
+    parse_turns,
+)
+
+VTT = """WEBVTT
+
+1
+00:00:01.000 --> 00:00:03.000
+Ana (Zoppy): Bom dia, tudo bem?
+
+2
+00:00:03.500 --> 00:00:05.000
+Carlos: Bom dia!
+
+3
+00:00:05.000 --> 00:00:09.000
+Ana (Zoppy): Então assim, né, qual é o faturamento mensal da loja hoje?
+
+4
+00:00:09.000 --> 00:00:14.000
+Carlos: Hoje a gente a gente fatura uns R$ 450 mil por mês, né, com ticket médio de R$ 180.
+
+5
+00:00:14.000 --> 00:00:16.000
+Carlos: Hoje a gente a gente fatura uns R$ 450 mil por mês, né, com ticket médio de R$ 180.
+
+6
+00:00:16.000 --> 00:00:18.000
+Ana (Zoppy): Ok
+
+7
+00:00:18.000 --> 00:00:24.000
+Ana (Zoppy): Vocês já usam a Nuvemshop com o Bling?
+
+8
+00:00:24.000 --> 00:00:26.000
+Carlos: Sim
+
+9
+00:00:26.000 --> 00:00:31.000
+Carlos: E a taxa de recompra caiu pra 12% desde março, queremos ativar o Giftback até 15/11.
+
+10
+00:00:31.000 --> 00:00:33.000
+Ana (Zoppy): Obrigada, tchau!
+"""
+
+# Fatos de negócio que nenhum nível pode perder
+FACTS = ["R$ 450 mil", "R$ 180", "Nuvemshop", "Bling", "12%", "março", "Giftback", "15/11", "faturamento mensal"]
+
+
+def test_parse_turns_remove_cabecalho_tempos_e_indices():
+    turns = parse_turns(VTT)
+    assert turns[0] == ("Ana (Zoppy)", "Bom dia, tudo bem?")
+    assert turns[1] == ("Carlos", "Bom dia!")
+    assert all("-->" not in text and text != "WEBVTT" and not text.isdigit() for _, text in turns)
+
+
+def test_parse_turns_herda_o_falante_do_cabecalho():
+    text = "Ana  00:01:02\nQual é o plano?\nCarlos  00:01:05\nO Intermediário."
+    assert parse_turns(text) == [("Ana", "Qual é o plano?"), ("Carlos", "O Intermediário.")]
+
+
+@pytest.mark.parametrize("level", LEVELS)
+def test_nenhum_nivel_perde_fatos(level):
+    normalized = TranscriptNormalizer(level).normalize(VTT)
+    for fact in FACTS:
+        assert fact in normalized, f"{fact!r} perdido no nível {level}"
+    # Resposta a uma pergunta é mantida mesmo no nível agressivo
+    assert "Sim" in normalized
+
+
+def test_none_nao_altera_a_transcricao():
+    assert TranscriptNormalizer(LEVEL_NONE).normalize(VTT) == VTT
+
+
+def test_light_remove_tempos_e_linhas_repetidas_em_sequencia():
+    normalized = TranscriptNormalizer(LEVEL_LIGHT).normalize(VTT)
+    assert "-->" not in normalized and "WEBVTT" not in normalized
+    assert normalized.count("R$ 450 mil") == 1
+    # Vícios de linguagem só saem a partir do standard
+    assert "Então assim, né" in normalized
+
+
+def test_standard_remove_vicios_e_junta_falas_do_mesmo_falante():
+    normalized = TranscriptNormalizer(LEVEL_STANDARD).normalize(VTT)
+    assert " né" not in normalized and "a gente a gente" not in normalized
+    assert "Carlos: Hoje a gente fatura uns R$ 450 mil por mês" in normalized
+    # Cada falante mantém a própria saudação
+    assert "Ana (Zoppy): Bom dia, tudo bem?" in normalized
+    assert "Carlos: Bom dia!" in normalized
+    assert "Carlos: Sim. E a taxa de recompra caiu pra 12% desde março" in normalized
+
+
+def test_aggressive_abrevia_falantes_e_remove_saudacoes_e_respostas_curtas():
+    normalized = TranscriptNormalizer(LEVEL_AGGRESSIVE).normalize(VTT)
+    lines = normalized.splitlines()
+    assert lines[0] == "Participantes: S1 = Ana (Zoppy); S2 = Carlos"
+    assert "Bom dia" not in normalized and "tchau" not in normalized
+    assert "Ok" not in normalized
+    assert all(line.startswith(("S1: ", "S2: ")) for line in lines[1:])
+
+
+def test_reducao_cresce_com_o_nivel():
+    reports = [TranscriptNormalizer(level).normalize_with_report(VTT) for level in LEVELS]
+    assert reports[0].tokens_saved == 0
+    saved = [report.tokens_saved for report in reports]
+    assert saved == sorted(saved) and saved[-1] > 0
+    assert 0 < reports[-1].reduction < 1
+
+
+def test_nivel_invalido():
+    with pytest.raises(ValueError):
+        TranscriptNormalizer("maximo")